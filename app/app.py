@@ -3,15 +3,22 @@ from contextlib import asynccontextmanager
 from db import disconnect_db
 from fastapi import FastAPI
 from routers import api_router
+from utils.crud import entity_change_listener
+from utils.report import report_executor, report_job_worker
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # До загрузки приложения
+    report_job_worker.start()
+    entity_change_listener.start()
 
     yield
 
     # После выключения
+    await entity_change_listener.stop()
+    await report_job_worker.stop()
+    report_executor.shutdown()
     await disconnect_db()
 
 
@@ -1,6 +1,8 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from .database import DatabaseConfiguration
+from .entity_cache import EntityCacheConfiguration
+from .reports import ReportsConfiguration
 
 
 class Projectonfiguration(BaseSettings):
@@ -8,6 +10,8 @@ class Projectonfiguration(BaseSettings):
 
     # * Вложенные группы настроек
     database: DatabaseConfiguration = DatabaseConfiguration()
+    reports: ReportsConfiguration = ReportsConfiguration()
+    entity_cache: EntityCacheConfiguration = EntityCacheConfiguration()
 
     # * Опциональные переменные
     DEBUG_MODE: bool = True
@@ -0,0 +1,12 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class EntityCacheConfiguration(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="BOOKSHELF_ENTITY_CACHE_")
+
+    # * Опциональные переменные
+    ENABLED: bool = True
+    MAX_ENTRIES: int = 10_000
+    TTL: float = 30.0
+    NOTIFY: bool = True
+    RECONNECT_INTERVAL: float = 5.0
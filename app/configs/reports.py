@@ -0,0 +1,18 @@
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ReportsConfiguration(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="BOOKSHELF_REPORTS_")
+
+    # * Опциональные переменные
+    POOL_KIND: Literal["thread", "process"] = "thread"
+    POOL_SIZE: int = 2
+    QUEUE_DEPTH: int = 4
+    JOB_WORKERS: int = 1
+    JOB_POLL_INTERVAL: float = 5.0
+    JOB_TIMEOUT: int = 600
+    JOB_RETENTION: int = 7 * 24 * 60 * 60
+    CACHE_SIZE: int = 64 * 1024 * 1024
+    SHEET_MAX_ROWS: int = 1_000_000
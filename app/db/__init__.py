@@ -1,3 +1,13 @@
-from .engine import BaseORM, disconnect_db, engine, get_db
+from .engine import BaseORM, LocalAsyncSession, disconnect_db, engine, export_session, get_db, use_custom_plans
+from .expressions import Explain
 
-__all__ = ("BaseORM", "disconnect_db", "engine", "get_db")
+__all__ = (
+    "BaseORM",
+    "Explain",
+    "LocalAsyncSession",
+    "disconnect_db",
+    "engine",
+    "export_session",
+    "get_db",
+    "use_custom_plans",
+)
@@ -1,4 +1,5 @@
 from configs import configs
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine, AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
@@ -16,15 +17,49 @@ LocalAsyncSession: AsyncSession = sessionmaker(
 )
 
 
+# Ключ `session.info` с транзакцией, в которой включено построение планов под параметры
+CUSTOM_PLANS_KEY = "custom_plans_transaction"
+
+
 class BaseORM(AsyncAttrs, DeclarativeBase):
     pass
 
 
+async def use_custom_plans(session: AsyncSession) -> None:
+    """Отключает обобщенные планы подготовленных выражений до конца текущей транзакции.
+    Избирательность условий поиска сильно зависит от значения параметра, а обобщенный план
+    его не учитывает и может не использовать подходящий индекс. Остальные запросы
+    соединения продолжают использовать обобщенные планы.
+    Повторный вызов в той же транзакции не обращается к БД.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия работы с БД.
+    """
+    await session.connection()
+    transaction = session.sync_session.get_transaction()
+    if session.info.get(CUSTOM_PLANS_KEY) is transaction:
+        return
+
+    await session.execute(text("SET LOCAL plan_cache_mode = force_custom_plan"))
+    session.info[CUSTOM_PLANS_KEY] = transaction
+
+
 async def disconnect_db():
     """Закрывает подключение к БД, освобождает ресурсы."""
     await engine.dispose()
 
 
+def export_session() -> AsyncSession:
+    """Создает сессию для генератора тела потокового ответа: `async with export_session() as db`.
+    Сессия зависимости get_db закрывается до отправки тела ответа, поэтому тело,
+    читающее из БД по мере отправки, работает в собственной сессии.
+
+    Returns:
+        AsyncSession: Асинхронная сессия работы с БД.
+    """
+    return LocalAsyncSession()
+
+
 async def get_db():
     """Функция возвращает асинхронную сессию взаимодействия с БД
     вместе с контролем интерпретатору.
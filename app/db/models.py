@@ -1,8 +1,11 @@
 import uuid
+from enum import Enum
 
 from sqlalchemy import (
     DECIMAL,
     Column,
+    DateTime,
+    LargeBinary,
     ForeignKey,
     Index,
     Integer,
@@ -12,9 +15,10 @@ from sqlalchemy import (
     CheckConstraint,
     Date,
     UniqueConstraint,
+    func,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 
 from .engine import BaseORM
 from datetime import date, timedelta
@@ -26,12 +30,31 @@ class Publisher(BaseORM):
     code = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, unique=True, nullable=False)
     city = Column(String(60), default=None)
+    # Время последнего изменения записи. Используется для условных запросов (ETag, Last-Modified)
+    updated_at = deferred(
+        Column(
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.clock_timestamp(),
+            onupdate=func.clock_timestamp(),
+        )
+    )
 
     books = relationship("Book", back_populates="publisher", cascade="all, delete")
 
     __table_args__ = (
         Index("publisher_code_idx", code, postgresql_using="hash"),
         Index("publishers_name_idx", name, postgresql_using="hash"),
+        # Индексы для постраничного листинга с сортировкой (поле, код)
+        Index("publisher_name_code_idx", name, code),
+        Index("publisher_city_code_idx", city, code),
+        # Триграммный индекс для поиска по подстроке (ILIKE)
+        Index(
+            "publisher_name_trgm_idx",
+            name,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
 
 
@@ -40,12 +63,30 @@ class Author(BaseORM):
 
     code = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, unique=True, nullable=False)
+    # Время последнего изменения записи. Используется для условных запросов (ETag, Last-Modified)
+    updated_at = deferred(
+        Column(
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.clock_timestamp(),
+            onupdate=func.clock_timestamp(),
+        )
+    )
 
     books = relationship("Book", back_populates="author", cascade="all, delete")
 
     __table_args__ = (
         Index("author_code_idx", code, postgresql_using="hash"),
         Index("author_name_idx", name, postgresql_using="hash"),
+        # Индексы для постраничного листинга с сортировкой (поле, код)
+        Index("author_name_code_idx", name, code),
+        # Триграммный индекс для поиска по подстроке (ILIKE)
+        Index(
+            "author_name_trgm_idx",
+            name,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
 
 
@@ -67,6 +108,17 @@ class Book(BaseORM):
     publishing_year = Column(SmallInteger)
     price = Column(DECIMAL(10, 2), nullable=False, default=0.0)
     amount = Column(Integer, nullable=False, default=1)
+    # Поисковый вектор по названию, автору и издательству. Заполняется триггерами БД
+    search_vector = deferred(Column(TSVECTOR, default=None))
+    # Время последнего изменения записи. Используется для условных запросов (ETag, Last-Modified)
+    updated_at = deferred(
+        Column(
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.clock_timestamp(),
+            onupdate=func.clock_timestamp(),
+        )
+    )
 
     publisher = relationship("Publisher", back_populates="books")
     author = relationship("Author", back_populates="books")
@@ -75,9 +127,20 @@ class Book(BaseORM):
     __table_args__ = (
         Index("books_code_idx", code, postgresql_using="hash"),
         Index("book_title_idx", title, postgresql_using="hash"),
-        Index("book_publishing_year_idx", publishing_year),
-        Index("book_price_idx", price),
-        Index("book_amount_idx", amount),
+        # Индексы для постраничного листинга с сортировкой (поле, код)
+        Index("book_title_code_idx", title, code),
+        Index("book_publishing_year_idx", publishing_year, code),
+        Index("book_price_idx", price, code),
+        Index("book_amount_idx", amount, code),
+        # Триграммный индекс для поиска по подстроке (ILIKE)
+        Index(
+            "book_title_trgm_idx",
+            title,
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        # Индекс полнотекстового поиска по каталогу
+        Index("book_search_vector_idx", "search_vector", postgresql_using="gin"),
         CheckConstraint(price >= 0.0, name="check_price_non_negative"),
         CheckConstraint(amount >= 0, name="check_amount_non_negative"),
         CheckConstraint(
@@ -94,6 +157,15 @@ class Reader(BaseORM):
     full_name = Column(String(255), nullable=False)
     phone = Column(String(20), nullable=False, unique=True)
     address = Column(Text, default=None)
+    # Время последнего изменения записи. Используется для условных запросов (ETag, Last-Modified)
+    updated_at = deferred(
+        Column(
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.clock_timestamp(),
+            onupdate=func.clock_timestamp(),
+        )
+    )
 
     issuances = relationship("Issuance", back_populates="reader", cascade="all, delete")
 
@@ -101,6 +173,16 @@ class Reader(BaseORM):
         Index("reader_code_idx", code, postgresql_using="hash"),
         Index("reader_full_name_idx", full_name, postgresql_using="hash"),
         Index("reader_phone_idx", phone, postgresql_using="hash"),
+        # Индексы для постраничного листинга с сортировкой (поле, код)
+        Index("reader_full_name_code_idx", full_name, code),
+        Index("reader_address_code_idx", address, code),
+        # Триграммный индекс для поиска по подстроке (ILIKE)
+        Index(
+            "reader_full_name_trgm_idx",
+            full_name,
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
         CheckConstraint(
             r"phone ~ '^\+\d{1,3}\(\d{1,4}\)\d{3}-\d{2}-\d{2}$'", name="check_phone_format"
         ),
@@ -123,12 +205,54 @@ class Issuance(BaseORM):
     )
     issuanced_at = Column(Date, nullable=False, default=date.today)
     expires_at = Column(Date, nullable=False, default=lambda: date.today() + timedelta(days=21))
+    # Время последнего изменения записи. Используется для условных запросов (ETag, Last-Modified)
+    updated_at = deferred(
+        Column(
+            DateTime(timezone=True),
+            nullable=False,
+            server_default=func.clock_timestamp(),
+            onupdate=func.clock_timestamp(),
+        )
+    )
 
     reader = relationship("Reader", back_populates="issuances")
     book = relationship("Book", back_populates="issuances")
 
     __table_args__ = (
-        Index("issuance_date_idx", issuanced_at),
-        Index("issuance_expiration_date_idx", expires_at),
+        # Индексы для постраничного листинга с сортировкой (поле, код)
+        Index("issuance_date_idx", issuanced_at, code),
+        Index("issuance_expiration_date_idx", expires_at, code),
         Index("issuances_code_idx", code, postgresql_using="hash"),
     )
+
+
+class ReportJobStatus(str, Enum):
+    """Перечисление состояний задачи построения отчета."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ReportJob(BaseORM):
+    __tablename__ = "report_jobs"
+
+    code = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    report_date = Column(Date, nullable=False)
+    status = Column(String(10), nullable=False, default=ReportJobStatus.PENDING.value)
+    # Номер захвата задачи обработчиком. Результат сохраняется только текущим захватом
+    attempt = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, default=None)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at = Column(DateTime(timezone=True), default=None)
+    finished_at = Column(DateTime(timezone=True), default=None)
+    # Готовый файл отчета. Загружается только при скачивании
+    content = deferred(Column(LargeBinary, default=None))
+
+    __table_args__ = (
+        Index("report_job_status_idx", status, created_at),
+        CheckConstraint(
+            "status IN ('pending', 'running', 'done', 'failed')", name="check_report_job_status"
+        ),
+    )
@@ -0,0 +1,34 @@
+"""entity_updated_at
+
+Revision ID: 1fe914300cca
+Revises: fbb1e4e8df92
+Create Date: 2026-10-18 04:30:17.009937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1fe914300cca'
+down_revision: Union[str, None] = 'fbb1e4e8df92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Таблицы сущностей, получающие время последнего изменения
+TABLES = ('authors', 'books', 'issuances', 'publishers', 'readers')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # * Значение по умолчанию now() стабильно в транзакции и не требует перезаписи таблицы:
+        # * существующие записи получают время миграции. Затем оно заменяется на clock_timestamp()
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+        op.alter_column(table, 'updated_at', server_default=sa.text('clock_timestamp()'))
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,65 @@
+"""listing keyset indexes
+
+Revision ID: 3cc958136ee0
+Revises: 29c4de35e648
+Create Date: 2026-10-18 03:41:44.455780
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3cc958136ee0'
+down_revision: Union[str, None] = '29c4de35e648'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Индексы, дополненные кодом сущности: (название, таблица, старые колонки, новые колонки)
+REPLACED_INDEXES = (
+    ('book_amount_idx', 'books', ['amount'], ['amount', 'code']),
+    ('book_price_idx', 'books', ['price'], ['price', 'code']),
+    ('book_publishing_year_idx', 'books', ['publishing_year'], ['publishing_year', 'code']),
+    ('issuance_date_idx', 'issuances', ['issuanced_at'], ['issuanced_at', 'code']),
+    ('issuance_expiration_date_idx', 'issuances', ['expires_at'], ['expires_at', 'code']),
+)
+
+# Новые индексы: (название, таблица, колонки)
+INDEXES = (
+    ('author_name_code_idx', 'authors', ['name', 'code']),
+    ('book_title_code_idx', 'books', ['title', 'code']),
+    ('publisher_city_code_idx', 'publishers', ['city', 'code']),
+    ('publisher_name_code_idx', 'publishers', ['name', 'code']),
+    ('reader_address_code_idx', 'readers', ['address', 'code']),
+    ('reader_full_name_code_idx', 'readers', ['full_name', 'code']),
+)
+
+
+def replace_index(name: str, table: str, columns: list) -> None:
+    """Заменяет индекс индексом по другим колонкам с тем же названием.
+    Новый индекс строится под временным названием до удаления старого,
+    поэтому запросы не остаются без индекса.
+    """
+    op.create_index(f'{name}_new', table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+    op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.execute(f'ALTER INDEX {name}_new RENAME TO {name}')
+
+
+def upgrade() -> None:
+    # * Индексы строятся без блокировки записи в таблицы. CONCURRENTLY недоступен в транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _, columns in REPLACED_INDEXES:
+            replace_index(name, table, columns)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, _ in reversed(REPLACED_INDEXES):
+            replace_index(name, table, columns)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
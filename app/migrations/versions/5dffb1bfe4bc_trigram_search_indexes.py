@@ -0,0 +1,44 @@
+"""trigram search indexes
+
+Revision ID: 5dffb1bfe4bc
+Revises: 3cc958136ee0
+Create Date: 2026-10-18 03:46:23.753911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5dffb1bfe4bc'
+down_revision: Union[str, None] = '3cc958136ee0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Триграммные индексы: (название, таблица, колонка)
+INDEXES = (
+    ('author_name_trgm_idx', 'authors', 'name'),
+    ('book_title_trgm_idx', 'books', 'title'),
+    ('publisher_name_trgm_idx', 'publishers', 'name'),
+    ('reader_full_name_trgm_idx', 'readers', 'full_name'),
+)
+
+
+def upgrade() -> None:
+    # Операторы gin_trgm_ops предоставляются расширением pg_trgm
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # * Индексы строятся без блокировки записи в таблицы. CONCURRENTLY недоступен в транзакции
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(name, table, [column], unique=False, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    # ! Расширение pg_trgm остается: им могут пользоваться другие обьекты БД
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
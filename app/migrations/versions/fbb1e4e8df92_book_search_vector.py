@@ -0,0 +1,128 @@
+"""book search vector
+
+Revision ID: fbb1e4e8df92
+Revises: 5dffb1bfe4bc
+Create Date: 2026-10-18 04:10:22.733562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'fbb1e4e8df92'
+down_revision: Union[str, None] = '5dffb1bfe4bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Поисковый вектор книги: название (вес A), ФИО автора (вес B), название издательства (вес C)
+BOOK_SEARCH_VECTOR_FUNCTION = """
+CREATE FUNCTION book_search_vector(book_title text, book_author uuid, book_publisher uuid)
+RETURNS tsvector LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(book_title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce((SELECT name FROM authors WHERE code = book_author), '')), 'B')
+        || setweight(to_tsvector('simple', coalesce((SELECT name FROM publishers WHERE code = book_publisher), '')), 'C')
+$$
+"""
+
+# Пересчет вектора книги при ее создании или изменении полей, входящих в вектор
+BOOKS_TRIGGER = """
+CREATE FUNCTION books_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := book_search_vector(NEW.title, NEW.author_code, NEW.publisher_code);
+    RETURN NEW;
+END
+$$;
+
+CREATE TRIGGER books_search_vector_update
+BEFORE INSERT OR UPDATE OF title, author_code, publisher_code ON books
+FOR EACH ROW EXECUTE FUNCTION books_search_vector_trigger();
+"""
+
+# Пересчет векторов книг при переименовании автора или издательства
+RELATED_TRIGGER = """
+CREATE FUNCTION {table}_search_vector_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE books
+    SET search_vector = book_search_vector(title, author_code, publisher_code)
+    WHERE {column} = NEW.code;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER {table}_search_vector_update
+AFTER UPDATE OF name ON {table}
+FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+EXECUTE FUNCTION {table}_search_vector_trigger();
+"""
+
+# Кол-во книг, векторы которых заполняются одной транзакцией
+BACKFILL_BATCH_SIZE = 10000
+
+# Заполнение векторов очередной пачки книг по возрастанию кода
+BACKFILL_BATCH = """
+WITH batch AS (
+    SELECT code FROM books
+    WHERE CAST(:last_code AS uuid) IS NULL OR code > CAST(:last_code AS uuid)
+    ORDER BY code
+    LIMIT :batch_size
+)
+UPDATE books
+SET search_vector = book_search_vector(title, author_code, publisher_code)
+FROM batch
+WHERE books.code = batch.code
+RETURNING books.code
+"""
+
+
+def backfill_search_vectors() -> None:
+    """Заполняет векторы существующих книг пачками. Каждая пачка фиксируется
+    отдельно, поэтому таблица не блокируется на время пересчета всех книг.
+    Книги, записанные во время заполнения, получают вектор от триггера.
+    """
+    bind = op.get_bind()
+    last_code = None
+    while True:
+        codes = bind.execute(
+            sa.text(BACKFILL_BATCH),
+            {"last_code": last_code, "batch_size": BACKFILL_BATCH_SIZE},
+        ).scalars().all()
+        if not codes:
+            break
+        last_code = max(codes)
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('books', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    # ### end Alembic commands ###
+
+    op.execute(BOOK_SEARCH_VECTOR_FUNCTION)
+    op.execute(BOOKS_TRIGGER)
+    op.execute(RELATED_TRIGGER.format(table="authors", column="author_code"))
+    op.execute(RELATED_TRIGGER.format(table="publishers", column="publisher_code"))
+
+    # * Колонка и триггеры фиксируются до заполнения: ACCESS EXCLUSIVE блокировка
+    # * таблицы снимается сразу, а векторы заполняются вне транзакции миграции.
+    # * Индекс строится без блокировки записи в таблицу. CONCURRENTLY недоступен в транзакции
+    with op.get_context().autocommit_block():
+        backfill_search_vectors()
+        op.create_index('book_search_vector_idx', 'books', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS publishers_search_vector_update ON publishers")
+    op.execute("DROP TRIGGER IF EXISTS authors_search_vector_update ON authors")
+    op.execute("DROP TRIGGER IF EXISTS books_search_vector_update ON books")
+    op.execute("DROP FUNCTION IF EXISTS publishers_search_vector_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS authors_search_vector_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS books_search_vector_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS book_search_vector(text, uuid, uuid)")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('book_search_vector_idx', table_name='books', postgresql_using='gin')
+    op.drop_column('books', 'search_vector')
+    # ### end Alembic commands ###
@@ -7,6 +7,7 @@ from .issuances import router as issuances_router
 from .publishers import router as publishers_router
 from .readers import router as readers_router
 from .reports import router as reports_router
+from .search import router as search_router
 
 api_router = APIRouter(prefix="/api")
 
@@ -17,5 +18,6 @@ api_router.include_router(readers_router)
 api_router.include_router(books_router)
 api_router.include_router(issuances_router)
 api_router.include_router(reports_router)
+api_router.include_router(search_router)
 
 __all__ = ("api_router",)
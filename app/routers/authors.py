@@ -3,14 +3,24 @@ from typing import List
 from uuid import UUID
 
 from db import get_db
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request, Response, Query
+from schemas.batch import MAX_BULK_SIZE, BatchRequest, BatchResponse, BulkError, BulkResponse
 from schemas.authors import (
     AuthorResponse,
     CreateAuthor,
     UpdateAuthor,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from utils import ListingPagination, ListingSort, ListingSearch
+from utils import (
+    ExportFormat,
+    ListingFields,
+    ListingPagination,
+    ListingSort,
+    ListingSearch,
+    conditional_response,
+    export_response,
+    parameterized_listing_response,
+)
 from utils.crud import author
 
 router = APIRouter(prefix="/authors")
@@ -26,26 +36,71 @@ class SearchFields(str, Enum):
 
 @router.get("", summary="Get all Authors", tags=["Listing", "Authors"])
 async def get_authors(
+    request: Request,
+    response: Response,
     search: ListingSearch[SearchFields] = Depends(),
     sort: ListingSort[SortFields] = Depends(),
     pagination: ListingPagination = Depends(),
+    fields: ListingFields[AuthorResponse] = Depends(),
     db: AsyncSession = Depends(get_db),
 ) -> List[AuthorResponse]:
-    """Возвращает список всех авторов с возможностью поиска, сортировки и пагинации."""
-    result = await author.get_all(db, search, sort, pagination)
-    return [AuthorResponse.model_validate(author) for author in result]
+    """Возвращает список всех авторов с возможностью поиска, сортировки и пагинации.
+    Курсор следующей страницы и общее кол-во записей возвращаются в заголовках.
+    Параметр fields ограничивает набор возвращаемых полей.
+    """
+    return await parameterized_listing_response(
+        author, db, request, response, AuthorResponse, search, sort, pagination, fields
+    )
+
+
+@router.get("/export", summary="Export all Authors", tags=["Export", "Authors"])
+async def export_authors(
+    search: ListingSearch[SearchFields] = Depends(),
+    sort: ListingSort[SortFields] = Depends(),
+    fields: ListingFields[AuthorResponse] = Depends(),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="Export format"),
+):
+    """Выгружает всех авторов одним потоковым ответом в формате NDJSON (один JSON обьект на строку) или CSV.
+    Поиск, сортировка и выбор полей работают так же, как в листинге.
+    """
+    selected_fields = fields.get_fields()
+
+    # * Запрос строится до начала ответа: ошибки параметров возвращаются с кодом 400
+    query = author.get_rows_query(search, sort, fields=selected_fields)
+    return export_response(author, query, AuthorResponse, "authors", selected_fields, export_format)
 
 
 @router.get("/{code}", summary="Get specific Author", tags=["Detail", "Authors"])
 async def get_publisher(
     code: UUID,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ) -> AuthorResponse:
     """Возвращает данные конкретного автора по его коду."""
-    result = await author.get(db, code)
+    # * Запись и ее версия читаются из кэша сущностей
+    result = await author.get_cached(db, code)
+    if not_modified := conditional_response(request, response, result["updated_at"]):
+        return not_modified
+
     return AuthorResponse.model_validate(result)
 
 
+@router.post("/batch", summary="Get Authors by codes", tags=["Batch", "Authors"])
+async def get_authors_batch(
+    data: BatchRequest = Body(),
+    db: AsyncSession = Depends(get_db),
+) -> BatchResponse[AuthorResponse]:
+    """Возвращает авторов по списку кодов одним запросом.
+    Записи возвращаются в порядке запрошенных кодов, отсутствующие коды перечисляются отдельно.
+    """
+    items, missing = await author.get_many(db, data.codes)
+    return BatchResponse[AuthorResponse](
+        items=[AuthorResponse.model_validate(db_obj) for db_obj in items],
+        missing=missing,
+    )
+
+
 @router.post("", summary="Create new Author", tags=["Create", "Authors"])
 async def create_publisher(
     data: CreateAuthor = Body(),
@@ -56,6 +111,22 @@ async def create_publisher(
     return AuthorResponse.model_validate(result)
 
 
+@router.post("/bulk", summary="Create Authors in bulk", tags=["Create", "Authors"])
+async def create_authors_bulk(
+    data: List[CreateAuthor] = Body(min_length=1, max_length=MAX_BULK_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> BulkResponse[AuthorResponse]:
+    """Создает авторов по списку данных в одной транзакции.
+    Записи, которые невозможно создать, пропускаются и перечисляются в ошибках
+    с индексом записи в переданном списке.
+    """
+    items, errors = await author.bulk_create(db, [item.model_dump() for item in data])
+    return BulkResponse[AuthorResponse](
+        items=[AuthorResponse.model_validate(item) for item in items],
+        errors=[BulkError(index=index, detail=detail) for index, detail in errors],
+    )
+
+
 @router.delete("/{code}", summary="Delete specific Author", tags=["Delete", "Authors"])
 async def delete_publisher(
     code: UUID,
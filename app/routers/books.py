@@ -3,14 +3,27 @@ from typing import List
 from uuid import UUID
 
 from db import get_db
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request, Response, Query
+from schemas.batch import MAX_BULK_SIZE, BatchRequest, BatchResponse, BulkError, BulkResponse
 from schemas.books import (
+    BookExpandedResponse,
     BookResponse,
     CreateBook,
     UpdateBook,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from utils import ListingPagination, ListingSort, ListingSearch
+from utils import (
+    ExportFormat,
+    ListingFields,
+    ListingPagination,
+    ListingSort,
+    ListingSearch,
+    RelatedInclude,
+    conditional_response,
+    export_response,
+    item_response,
+    parameterized_listing_response,
+)
 from utils.crud import book
 
 router = APIRouter(prefix="/books")
@@ -32,26 +45,91 @@ class SearchFields(str, Enum):
     AMOUNT = "amount"
 
 
+class IncludeFields(str, Enum):
+    AUTHOR = "author"
+    PUBLISHER = "publisher"
+
+
 @router.get("", summary="Get all Books", tags=["Listing", "Books"])
 async def get_books(
+    request: Request,
+    response: Response,
     search: ListingSearch[SearchFields] = Depends(),
     sort: ListingSort[SortFields] = Depends(),
     pagination: ListingPagination = Depends(),
+    fields: ListingFields[BookResponse] = Depends(),
+    include: RelatedInclude[IncludeFields] = Depends(),
     db: AsyncSession = Depends(get_db),
-) -> List[BookResponse]:
-    """Возвращает список всех кнги с возможностью поиска, сортировки и пагинации."""
-    result = await book.get_all(db, search, sort, pagination)
-    return [BookResponse.model_validate(publisher) for publisher in result]
+) -> List[BookExpandedResponse]:
+    """Возвращает список всех кнги с возможностью поиска, сортировки и пагинации.
+    Курсор следующей страницы и общее кол-во записей возвращаются в заголовках.
+    Параметр fields ограничивает набор возвращаемых полей,
+    параметр include встраивает в записи связанные сущности.
+    """
+    return await parameterized_listing_response(
+        book, db, request, response, BookExpandedResponse, search, sort, pagination, fields, include
+    )
+
+
+@router.get("/export", summary="Export all Books", tags=["Export", "Books"])
+async def export_books(
+    search: ListingSearch[SearchFields] = Depends(),
+    sort: ListingSort[SortFields] = Depends(),
+    fields: ListingFields[BookResponse] = Depends(),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="Export format"),
+):
+    """Выгружает все книги одним потоковым ответом в формате NDJSON (один JSON обьект на строку) или CSV.
+    Поиск, сортировка и выбор полей работают так же, как в листинге.
+    """
+    selected_fields = fields.get_fields()
+
+    # * Запрос строится до начала ответа: ошибки параметров возвращаются с кодом 400
+    query = book.get_rows_query(search, sort, fields=selected_fields)
+    return export_response(book, query, BookResponse, "books", selected_fields, export_format)
 
 
 @router.get("/{code}", summary="Get specific Book", tags=["Detail", "Books"])
 async def get_book(
     code: UUID,
+    request: Request,
+    response: Response,
+    include: RelatedInclude[IncludeFields] = Depends(),
     db: AsyncSession = Depends(get_db),
-) -> BookResponse:
-    """Возвращает данные конкретной книге по ее коду."""
-    result = await book.get(db, code)
-    return BookResponse.model_validate(result)
+) -> BookExpandedResponse:
+    """Возвращает данные конкретной книге по ее коду.
+    Параметр include встраивает связанные сущности.
+    """
+    relations = include.get_relations()
+
+    # * Запись без связанных сущностей и ее версия читаются из кэша сущностей,
+    # * иначе версия проверяется без загрузки и сериализации данных
+    if relations:
+        version = await book.get_version(db, code, relations)
+    else:
+        result = await book.get_cached(db, code)
+        version = result["updated_at"]
+
+    if not_modified := conditional_response(request, response, version):
+        return not_modified
+
+    if relations:
+        result = await book.get(db, code, include=relations)
+    return item_response(BookExpandedResponse, result, response, include.get_response_fields(BookResponse))
+
+
+@router.post("/batch", summary="Get Books by codes", tags=["Batch", "Books"])
+async def get_books_batch(
+    data: BatchRequest = Body(),
+    db: AsyncSession = Depends(get_db),
+) -> BatchResponse[BookResponse]:
+    """Возвращает книги по списку кодов одним запросом.
+    Записи возвращаются в порядке запрошенных кодов, отсутствующие коды перечисляются отдельно.
+    """
+    items, missing = await book.get_many(db, data.codes)
+    return BatchResponse[BookResponse](
+        items=[BookResponse.model_validate(db_obj) for db_obj in items],
+        missing=missing,
+    )
 
 
 @router.post("", summary="Create new Book", tags=["Create", "Books"])
@@ -66,6 +144,22 @@ async def create_book(
     return BookResponse.model_validate(result)
 
 
+@router.post("/bulk", summary="Create Books in bulk", tags=["Create", "Books"])
+async def create_books_bulk(
+    data: List[CreateBook] = Body(min_length=1, max_length=MAX_BULK_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> BulkResponse[BookResponse]:
+    """Создает книги по списку данных в одной транзакции.
+    Записи, которые невозможно создать, пропускаются и перечисляются в ошибках
+    с индексом записи в переданном списке.
+    """
+    items, errors = await book.bulk_create(db, [item.model_dump() for item in data])
+    return BulkResponse[BookResponse](
+        items=[BookResponse.model_validate(item) for item in items],
+        errors=[BulkError(index=index, detail=detail) for index, detail in errors],
+    )
+
+
 @router.delete("/{code}", summary="Delete specific Book", tags=["Delete", "Books"])
 async def delete_book(
     code: UUID,
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
+from utils.cache import entity_caches
 import platform
 import socket
 import datetime
@@ -25,3 +26,11 @@ async def health_check() -> JSONResponse:
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
+
+
+@router.get(path="/health/cache", summary="Entity Cache Statistics", tags=["Health"])
+async def entity_cache_stats() -> JSONResponse:
+    """Возвращает статистику кэшей сущностей по таблицам: кол-во записей, попадания,
+    промахи и вытеснения.
+    """
+    return JSONResponse(content={table: cache.stats() for table, cache in entity_caches.items()})
@@ -3,14 +3,27 @@ from typing import List
 from uuid import UUID
 
 from db import get_db
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request, Response, Query
+from schemas.batch import MAX_BULK_SIZE, BatchRequest, BatchResponse, BulkError, BulkResponse
 from schemas.issuances import (
     CreateIssuance,
+    IssuanceExpandedResponse,
     IssuanceResponse,
     UpdateIssuance,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from utils import ListingPagination, ListingSort, ListingSearch
+from utils import (
+    ExportFormat,
+    ListingFields,
+    ListingPagination,
+    ListingSort,
+    ListingSearch,
+    RelatedInclude,
+    conditional_response,
+    export_response,
+    item_response,
+    parameterized_listing_response,
+)
 from utils.crud import issuance
 
 router = APIRouter(prefix="/issuances")
@@ -28,26 +41,91 @@ class SearchFields(str, Enum):
     BOOK = "book_code"
 
 
+class IncludeFields(str, Enum):
+    READER = "reader"
+    BOOK = "book"
+
+
 @router.get("", summary="Get all Issuances", tags=["Listing", "Issuances"])
 async def get_issuances(
+    request: Request,
+    response: Response,
     search: ListingSearch[SearchFields] = Depends(),
     sort: ListingSort[SortFields] = Depends(),
     pagination: ListingPagination = Depends(),
+    fields: ListingFields[IssuanceResponse] = Depends(),
+    include: RelatedInclude[IncludeFields] = Depends(),
     db: AsyncSession = Depends(get_db),
-) -> List[IssuanceResponse]:
-    """Возвращает список всех выдач с возможностью поиска, сортировки и пагинации."""
-    result = await issuance.get_all(db, search, sort, pagination)
-    return [IssuanceResponse.model_validate(publisher) for publisher in result]
+) -> List[IssuanceExpandedResponse]:
+    """Возвращает список всех выдач с возможностью поиска, сортировки и пагинации.
+    Курсор следующей страницы и общее кол-во записей возвращаются в заголовках.
+    Параметр fields ограничивает набор возвращаемых полей,
+    параметр include встраивает в записи связанные сущности.
+    """
+    return await parameterized_listing_response(
+        issuance, db, request, response, IssuanceExpandedResponse, search, sort, pagination, fields, include
+    )
+
+
+@router.get("/export", summary="Export all Issuances", tags=["Export", "Issuances"])
+async def export_issuances(
+    search: ListingSearch[SearchFields] = Depends(),
+    sort: ListingSort[SortFields] = Depends(),
+    fields: ListingFields[IssuanceResponse] = Depends(),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="Export format"),
+):
+    """Выгружает все выдачи одним потоковым ответом в формате NDJSON (один JSON обьект на строку) или CSV.
+    Поиск, сортировка и выбор полей работают так же, как в листинге.
+    """
+    selected_fields = fields.get_fields()
+
+    # * Запрос строится до начала ответа: ошибки параметров возвращаются с кодом 400
+    query = issuance.get_rows_query(search, sort, fields=selected_fields)
+    return export_response(issuance, query, IssuanceResponse, "issuances", selected_fields, export_format)
 
 
 @router.get("/{code}", summary="Get specific Issuance", tags=["Detail", "Issuances"])
 async def get_issuance(
     code: UUID,
+    request: Request,
+    response: Response,
+    include: RelatedInclude[IncludeFields] = Depends(),
     db: AsyncSession = Depends(get_db),
-) -> IssuanceResponse:
-    """Возвращает данные конкретной выдачи по ее коду."""
-    result = await issuance.get(db, code)
-    return IssuanceResponse.model_validate(result)
+) -> IssuanceExpandedResponse:
+    """Возвращает данные конкретной выдачи по ее коду.
+    Параметр include встраивает связанные сущности.
+    """
+    relations = include.get_relations()
+
+    # * Запись без связанных сущностей и ее версия читаются из кэша сущностей,
+    # * иначе версия проверяется без загрузки и сериализации данных
+    if relations:
+        version = await issuance.get_version(db, code, relations)
+    else:
+        result = await issuance.get_cached(db, code)
+        version = result["updated_at"]
+
+    if not_modified := conditional_response(request, response, version):
+        return not_modified
+
+    if relations:
+        result = await issuance.get(db, code, include=relations)
+    return item_response(IssuanceExpandedResponse, result, response, include.get_response_fields(IssuanceResponse))
+
+
+@router.post("/batch", summary="Get Issuances by codes", tags=["Batch", "Issuances"])
+async def get_issuances_batch(
+    data: BatchRequest = Body(),
+    db: AsyncSession = Depends(get_db),
+) -> BatchResponse[IssuanceResponse]:
+    """Возвращает выдачи по списку кодов одним запросом.
+    Записи возвращаются в порядке запрошенных кодов, отсутствующие коды перечисляются отдельно.
+    """
+    items, missing = await issuance.get_many(db, data.codes)
+    return BatchResponse[IssuanceResponse](
+        items=[IssuanceResponse.model_validate(db_obj) for db_obj in items],
+        missing=missing,
+    )
 
 
 @router.post("", summary="Create new Issuance", tags=["Create", "Issuances"])
@@ -64,6 +142,24 @@ async def create_issuance(
     return IssuanceResponse.model_validate(result)
 
 
+@router.post("/bulk", summary="Create Issuances in bulk", tags=["Create", "Issuances"])
+async def create_issuances_bulk(
+    data: List[CreateIssuance] = Body(min_length=1, max_length=MAX_BULK_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> BulkResponse[IssuanceResponse]:
+    """Создает выдачи по списку данных в одной транзакции.
+    Записи, которые невозможно создать, пропускаются и перечисляются в ошибках
+    с индексом записи в переданном списке.
+    Выдачи распределяются по порядку списка: ограничения по кол-ву выдач читателя и
+    наличию книг учитывают выдачи из этого же запроса.
+    """
+    items, errors = await issuance.bulk_create(db, [item.model_dump() for item in data])
+    return BulkResponse[IssuanceResponse](
+        items=[IssuanceResponse.model_validate(item) for item in items],
+        errors=[BulkError(index=index, detail=detail) for index, detail in errors],
+    )
+
+
 @router.delete("/{code}", summary="Delete specific Issuance", tags=["Delete", "Issuances"])
 async def delete_issuance(
     code: UUID,
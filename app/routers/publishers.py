@@ -3,14 +3,24 @@ from typing import List
 from uuid import UUID
 
 from db import get_db
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request, Response, Query
+from schemas.batch import MAX_BULK_SIZE, BatchRequest, BatchResponse, BulkError, BulkResponse
 from schemas.publishers import (
     CreatePublisher,
     PublisherResponse,
     UpdatePublisher,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from utils import ListingPagination, ListingSort, ListingSearch
+from utils import (
+    ExportFormat,
+    ListingFields,
+    ListingPagination,
+    ListingSort,
+    ListingSearch,
+    conditional_response,
+    export_response,
+    parameterized_listing_response,
+)
 from utils.crud import publisher
 
 router = APIRouter(prefix="/publishers")
@@ -28,26 +38,71 @@ class SearchFields(str, Enum):
 
 @router.get("", summary="Get all Publishers", tags=["Listing", "Publishers"])
 async def get_publishers(
+    request: Request,
+    response: Response,
     search: ListingSearch[SearchFields] = Depends(),
     sort: ListingSort[SortFields] = Depends(),
     pagination: ListingPagination = Depends(),
+    fields: ListingFields[PublisherResponse] = Depends(),
     db: AsyncSession = Depends(get_db),
 ) -> List[PublisherResponse]:
-    """Возвращает список всех издателей с возможностью поиска, сортировки и пагинации."""
-    result = await publisher.get_all(db, search, sort, pagination)
-    return [PublisherResponse.model_validate(publisher) for publisher in result]
+    """Возвращает список всех издателей с возможностью поиска, сортировки и пагинации.
+    Курсор следующей страницы и общее кол-во записей возвращаются в заголовках.
+    Параметр fields ограничивает набор возвращаемых полей.
+    """
+    return await parameterized_listing_response(
+        publisher, db, request, response, PublisherResponse, search, sort, pagination, fields
+    )
+
+
+@router.get("/export", summary="Export all Publishers", tags=["Export", "Publishers"])
+async def export_publishers(
+    search: ListingSearch[SearchFields] = Depends(),
+    sort: ListingSort[SortFields] = Depends(),
+    fields: ListingFields[PublisherResponse] = Depends(),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="Export format"),
+):
+    """Выгружает всех издателей одним потоковым ответом в формате NDJSON (один JSON обьект на строку) или CSV.
+    Поиск, сортировка и выбор полей работают так же, как в листинге.
+    """
+    selected_fields = fields.get_fields()
+
+    # * Запрос строится до начала ответа: ошибки параметров возвращаются с кодом 400
+    query = publisher.get_rows_query(search, sort, fields=selected_fields)
+    return export_response(publisher, query, PublisherResponse, "publishers", selected_fields, export_format)
 
 
 @router.get("/{code}", summary="Get specific Publisher", tags=["Detail", "Publishers"])
 async def get_publisher(
     code: UUID,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ) -> PublisherResponse:
     """Возвращает данные конкретного издателя по его коду."""
-    result = await publisher.get(db, code)
+    # * Запись и ее версия читаются из кэша сущностей
+    result = await publisher.get_cached(db, code)
+    if not_modified := conditional_response(request, response, result["updated_at"]):
+        return not_modified
+
     return PublisherResponse.model_validate(result)
 
 
+@router.post("/batch", summary="Get Publishers by codes", tags=["Batch", "Publishers"])
+async def get_publishers_batch(
+    data: BatchRequest = Body(),
+    db: AsyncSession = Depends(get_db),
+) -> BatchResponse[PublisherResponse]:
+    """Возвращает издательства по списку кодов одним запросом.
+    Записи возвращаются в порядке запрошенных кодов, отсутствующие коды перечисляются отдельно.
+    """
+    items, missing = await publisher.get_many(db, data.codes)
+    return BatchResponse[PublisherResponse](
+        items=[PublisherResponse.model_validate(db_obj) for db_obj in items],
+        missing=missing,
+    )
+
+
 @router.post("", summary="Create new Publisher", tags=["Create", "Publishers"])
 async def create_publisher(
     data: CreatePublisher = Body(),
@@ -58,6 +113,22 @@ async def create_publisher(
     return PublisherResponse.model_validate(result)
 
 
+@router.post("/bulk", summary="Create Publishers in bulk", tags=["Create", "Publishers"])
+async def create_publishers_bulk(
+    data: List[CreatePublisher] = Body(min_length=1, max_length=MAX_BULK_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> BulkResponse[PublisherResponse]:
+    """Создает издателей по списку данных в одной транзакции.
+    Записи, которые невозможно создать, пропускаются и перечисляются в ошибках
+    с индексом записи в переданном списке.
+    """
+    items, errors = await publisher.bulk_create(db, [item.model_dump() for item in data])
+    return BulkResponse[PublisherResponse](
+        items=[PublisherResponse.model_validate(item) for item in items],
+        errors=[BulkError(index=index, detail=detail) for index, detail in errors],
+    )
+
+
 @router.delete("/{code}", summary="Delete specific Publisher", tags=["Delete", "Publishers"])
 async def delete_publisher(
     code: UUID,
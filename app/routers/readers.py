@@ -3,14 +3,24 @@ from typing import List
 from uuid import UUID
 
 from db import get_db
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request, Response, Query
+from schemas.batch import MAX_BULK_SIZE, BatchRequest, BatchResponse, BulkError, BulkResponse
 from schemas.readers import (
     CreateReader,
     ReaderResponse,
     UpdateReader,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from utils import ListingPagination, ListingSort, ListingSearch
+from utils import (
+    ExportFormat,
+    ListingFields,
+    ListingPagination,
+    ListingSort,
+    ListingSearch,
+    conditional_response,
+    export_response,
+    parameterized_listing_response,
+)
 from utils.crud import reader
 
 router = APIRouter(prefix="/readers")
@@ -29,26 +39,71 @@ class SearchFields(str, Enum):
 
 @router.get("", summary="Get all Readers", tags=["Listing", "Readers"])
 async def get_readers(
+    request: Request,
+    response: Response,
     search: ListingSearch[SearchFields] = Depends(),
     sort: ListingSort[SortFields] = Depends(),
     pagination: ListingPagination = Depends(),
+    fields: ListingFields[ReaderResponse] = Depends(),
     db: AsyncSession = Depends(get_db),
 ) -> List[ReaderResponse]:
-    """Возвращает список всех читателей с возможностью поиска, сортировки и пагинации."""
-    result = await reader.get_all(db, search, sort, pagination)
-    return [ReaderResponse.model_validate(reader) for reader in result]
+    """Возвращает список всех читателей с возможностью поиска, сортировки и пагинации.
+    Курсор следующей страницы и общее кол-во записей возвращаются в заголовках.
+    Параметр fields ограничивает набор возвращаемых полей.
+    """
+    return await parameterized_listing_response(
+        reader, db, request, response, ReaderResponse, search, sort, pagination, fields
+    )
+
+
+@router.get("/export", summary="Export all Readers", tags=["Export", "Readers"])
+async def export_readers(
+    search: ListingSearch[SearchFields] = Depends(),
+    sort: ListingSort[SortFields] = Depends(),
+    fields: ListingFields[ReaderResponse] = Depends(),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="Export format"),
+):
+    """Выгружает всех читателей одним потоковым ответом в формате NDJSON (один JSON обьект на строку) или CSV.
+    Поиск, сортировка и выбор полей работают так же, как в листинге.
+    """
+    selected_fields = fields.get_fields()
+
+    # * Запрос строится до начала ответа: ошибки параметров возвращаются с кодом 400
+    query = reader.get_rows_query(search, sort, fields=selected_fields)
+    return export_response(reader, query, ReaderResponse, "readers", selected_fields, export_format)
 
 
 @router.get("/{code}", summary="Get specific Publisher", tags=["Detail", "Readers"])
 async def get_reader(
     code: UUID,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ) -> ReaderResponse:
     """Возвращает данные конкретного читателя по его коду."""
-    result = await reader.get(db, code)
+    # * Запись и ее версия читаются из кэша сущностей
+    result = await reader.get_cached(db, code)
+    if not_modified := conditional_response(request, response, result["updated_at"]):
+        return not_modified
+
     return ReaderResponse.model_validate(result)
 
 
+@router.post("/batch", summary="Get Readers by codes", tags=["Batch", "Readers"])
+async def get_readers_batch(
+    data: BatchRequest = Body(),
+    db: AsyncSession = Depends(get_db),
+) -> BatchResponse[ReaderResponse]:
+    """Возвращает читателей по списку кодов одним запросом.
+    Записи возвращаются в порядке запрошенных кодов, отсутствующие коды перечисляются отдельно.
+    """
+    items, missing = await reader.get_many(db, data.codes)
+    return BatchResponse[ReaderResponse](
+        items=[ReaderResponse.model_validate(db_obj) for db_obj in items],
+        missing=missing,
+    )
+
+
 @router.post("", summary="Create new Reader", tags=["Create", "Readers"])
 async def create_reader(
     data: CreateReader = Body(),
@@ -59,6 +114,22 @@ async def create_reader(
     return ReaderResponse.model_validate(result)
 
 
+@router.post("/bulk", summary="Create Readers in bulk", tags=["Create", "Readers"])
+async def create_readers_bulk(
+    data: List[CreateReader] = Body(min_length=1, max_length=MAX_BULK_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> BulkResponse[ReaderResponse]:
+    """Создает читателей по списку данных в одной транзакции.
+    Записи, которые невозможно создать, пропускаются и перечисляются в ошибках
+    с индексом записи в переданном списке.
+    """
+    items, errors = await reader.bulk_create(db, [item.model_dump() for item in data])
+    return BulkResponse[ReaderResponse](
+        items=[ReaderResponse.model_validate(item) for item in items],
+        errors=[BulkError(index=index, detail=detail) for index, detail in errors],
+    )
+
+
 @router.delete("/{code}", summary="Delete specific Reader", tags=["Delete", "Readers"])
 async def delete_reader(
     code: UUID,
@@ -1,60 +1,151 @@
-from datetime import datetime
+from datetime import date, datetime
+from uuid import UUID
 
-from db import get_db
-from fastapi import APIRouter, Depends
+from db import export_session, get_db
+from db.models import ReportJobStatus
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from schemas.reports import CreateReportJob, ReportJobResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from utils import DateSearch, ListingSearch
-from utils.report import ExpiredIssuancesReport
-from utils.crud import issuance
+from utils import DateSearch
+from utils.cache import report_cache, report_data_version
+from utils.report import ReportFormat, iter_csv, iter_ndjson, report_executor, report_job_worker
+from utils.crud import issuance, report_job
 
 router = APIRouter(prefix="/reports")
 
+XLSX_MEDIA_TYPE = ReportFormat.XLSX.media_type
+
 
 @router.get("", summary="Get a library report", tags=["Reports"])
 async def get_readers(
     search: DateSearch = Depends(),
+    report_format: ReportFormat = Query(ReportFormat.XLSX, alias="format"),
     db: AsyncSession = Depends(get_db),
 ):
     """Создает отчет об удержаных книгах по каждому читателю и по библиотеке в целом.
     Отправляет отчет в виде стрима флайла формата xslx. (Загрузка файла Excel)
+    Повторные запросы отчета на ту же дату при неизменных данных отдаются из кэша.
+    Форматы csv и ndjson отдаются построчно, без построения книги Excel.
+
+    Файл xlsx отдается чанками по мере сохранения книги, но не с первой строки выборки:
+    строки читаются целиком (`get_expired_report_rows`), так как разбиение читателей по листам
+    зависит от общего кол-ва строк. Первый байт ответа ждет выборку, построение листов
+    и начало записи zip-контейнера (openpyxl собирает его только при сохранении).
+    Построчно из курсора БД (`stream_expired_report_rows`) отдаются только csv и ndjson.
     """
-    report_date = datetime.strptime(search.date, "%Y-%m-%d")
-    expired_issuances = await issuance.get_all(
-        db,
-        search=ListingSearch[str](
-            search_by="expires_at",
-            search_mode="less_than_or_equal",
-            search_value=report_date,
-        ),
-    )
+    report_date = datetime.strptime(search.date, "%Y-%m-%d").date()
+    headers = {"Content-Disposition": f"attachment; filename=report_{report_date}.{report_format.value}"}
+
+    # * Плоские форматы строятся напрямую из курсора БД
+    if report_format != ReportFormat.XLSX:
+        return StreamingResponse(
+            stream_flat_report(report_date, report_format),
+            media_type=report_format.media_type,
+            headers=headers,
+        )
+
+    # * Версия фиксируется до выборки: изменения во время построения сделают запись неактуальной
+    cache_key = (report_date, report_data_version.value)
+
+    # * Если отчет на эту дату уже построен по актуальным данным
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return Response(cached, media_type=XLSX_MEDIA_TYPE, headers=headers)
+
+    # * Место в пуле занимается при приеме запроса: проверка заполненности без
+    # * резервирования пропускает любое кол-во параллельных запросов
+    slot = report_executor.reserve()
+
+    # * Если пул рендеринга отчетов перегружен
+    if slot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many reports are being generated. Try again later.",
+        )
 
-    # * Предаггрегация данных
-    data = {}
-    for expired_issuance in expired_issuances:
-        reader = await expired_issuance.awaitable_attrs.reader
-        if not data.get(reader.code):
-            data[reader.code] = {"name": reader.full_name, "books": []}
-
-        book = await expired_issuance.awaitable_attrs.book
-        author = await book.awaitable_attrs.author
-
-        issuance_data = [
-            reader.phone,
-            author.name,
-            book.title,
-            float(round(book.price / 1000, 3)),
-            expired_issuance.issuanced_at.strftime("%d.%m.%Y"),
-        ]
-        data[reader.code]["books"].append(issuance_data)
-
-    # * Создание отчета
-    report = ExpiredIssuancesReport(report_date)
-    report.construct_report(data)
-
-    # * Стриминг файла в качестве ответа (Загрузка )
+    try:
+        # * Данные отчета одним запросом (выдачи -> читатели -> книги -> авторы)
+        rows = await issuance.get_expired_report_rows(db, report_date)
+    except BaseException:
+        slot.release()
+        raise
+
+    # * Построение отчета в пуле и стриминг файла в качестве ответа (Загрузка ).
+    # * Место освобождается потоком, а если тело ответа так и не было прочитано - фоновой задачей
     return StreamingResponse(
-        report.get_filestream(),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=report_{report_date.date()}.xlsx"},
+        report_cache.tee(cache_key, report_executor.stream(report_date, rows, slot)),
+        media_type=XLSX_MEDIA_TYPE,
+        headers=headers,
+        background=BackgroundTask(slot.release),
+    )
+
+
+async def stream_flat_report(report_date: date, report_format: ReportFormat):
+    """Построчно отдает отчет в формате csv или ndjson.
+
+    Args:
+        report_date (date): Дата отчета.
+        report_format (ReportFormat): Формат отчета.
+
+    Yields:
+        bytes: Очередной чанк файла отчета.
+    """
+    async with export_session() as db:
+        rows = issuance.stream_expired_report_rows(db, report_date)
+        iter_format = iter_csv if report_format == ReportFormat.CSV else iter_ndjson
+        async for chunk in iter_format(rows):
+            yield chunk
+
+
+@router.post(
+    "/jobs",
+    summary="Create a library report job",
+    tags=["Reports"],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_report_job(
+    data: CreateReportJob = Body(),
+    db: AsyncSession = Depends(get_db),
+) -> ReportJobResponse:
+    """Ставит в очередь построение отчета об удержаных книгах на указанную дату.
+    Отчет строится в фоне, состояние задачи доступно по ее коду.
+    """
+    result = await report_job.create(db, data.model_dump())
+    report_job_worker.wake()
+    return ReportJobResponse.model_validate(result)
+
+
+@router.get("/jobs/{code}", summary="Get specific library report job", tags=["Reports"])
+async def get_report_job(
+    code: UUID,
+    db: AsyncSession = Depends(get_db),
+) -> ReportJobResponse:
+    """Возвращает состояние задачи построения отчета по ее коду."""
+    result = await report_job.get(db, code)
+    return ReportJobResponse.model_validate(result)
+
+
+@router.get("/jobs/{code}/file", summary="Download library report job result", tags=["Reports"])
+async def get_report_job_file(
+    code: UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """Отправляет готовый отчет задачи в виде файла формата xslx. (Загрузка файла Excel)
+    Если отчет еще не готов - возвращает 409.
+    """
+    result = await report_job.get_content(db, code)
+
+    # * Если отчет еще не построен или построение завершилось ошибкой
+    if result.status != ReportJobStatus.DONE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report is not ready. Job status: {result.status}.",
+        )
+
+    return Response(
+        result.content,
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename=report_{result.report_date}.xlsx"},
     )
@@ -0,0 +1,24 @@
+from typing import List
+
+from db import get_db
+from fastapi import APIRouter, Depends, Query
+from schemas.books import BookResponse, BookSearchResult
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.crud import book
+
+router = APIRouter(prefix="/search")
+
+
+@router.get("", summary="Search Books", tags=["Search", "Books"])
+async def search_books(
+    q: str = Query(..., min_length=1, max_length=255, description="Search query"),
+    limit: int = Query(20, ge=1, le=100, description="Results limit"),
+    skip: int = Query(0, ge=0, description="Results offset"),
+    db: AsyncSession = Depends(get_db),
+) -> List[BookSearchResult]:
+    """Выполняет полнотекстовый поиск по каталогу: названию книги, ФИО автора
+    и названию издательства одновременно. Результаты упорядочены по релевантности.
+    Запрос поддерживает синтаксис поисковых систем: "фраза", OR, -исключение.
+    """
+    result = await book.search(db, q, limit, skip)
+    return [BookSearchResult(book=BookResponse.model_validate(obj), rank=rank) for obj, rank in result]
@@ -0,0 +1,32 @@
+from typing import Annotated, Generic, List, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+# Максимальное кол-во кодов в одном запросе
+MAX_BATCH_SIZE = 200
+
+# Максимальное кол-во записей в одном запросе массового создания
+MAX_BULK_SIZE = 10_000
+
+# ResponseSchema
+_RS = TypeVar("_RS", bound=BaseModel)
+
+
+class BatchRequest(BaseModel):
+    codes: Annotated[List[UUID], Field(..., min_length=1, max_length=MAX_BATCH_SIZE)]
+
+
+class BatchResponse(BaseModel, Generic[_RS]):
+    items: Annotated[List[_RS], Field(...)]
+    missing: Annotated[List[UUID], Field(...)]
+
+
+class BulkError(BaseModel):
+    index: Annotated[int, Field(...)]
+    detail: Annotated[str, Field(...)]
+
+
+class BulkResponse(BaseModel, Generic[_RS]):
+    items: Annotated[List[_RS], Field(...)]
+    errors: Annotated[List[BulkError], Field(...)]
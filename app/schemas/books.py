@@ -3,6 +3,9 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from .authors import AuthorResponse
+from .publishers import PublisherResponse
+
 
 class BookResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -16,6 +19,11 @@ class BookResponse(BaseModel):
     amount: Annotated[int, Field(1, ge=0)]
 
 
+class BookExpandedResponse(BookResponse):
+    author: Annotated[Optional[AuthorResponse], Field(None)]
+    publisher: Annotated[Optional[PublisherResponse], Field(None)]
+
+
 class CreateBook(BaseModel):
     publisher_code: Annotated[UUID, Field(...)]
     author_code: Annotated[UUID, Field(...)]
@@ -32,3 +40,8 @@ class UpdateBook(BaseModel):
     publishing_year: Annotated[Optional[int], Field(None, le=10000, ge=0)]
     price: Annotated[Optional[float], Field(None, ge=0.0)]
     amount: Annotated[Optional[int], Field(None, ge=0)]
+
+
+class BookSearchResult(BaseModel):
+    book: Annotated[BookResponse, Field(...)]
+    rank: Annotated[float, Field(...)]
@@ -4,6 +4,9 @@ from uuid import UUID
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import date
 
+from .books import BookResponse
+from .readers import ReaderResponse
+
 
 class IssuanceResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -15,6 +18,11 @@ class IssuanceResponse(BaseModel):
     expires_at: Annotated[date, Field(...)]
 
 
+class IssuanceExpandedResponse(IssuanceResponse):
+    reader: Annotated[Optional[ReaderResponse], Field(None)]
+    book: Annotated[Optional[BookResponse], Field(None)]
+
+
 class CreateIssuance(BaseModel):
     book_code: Annotated[UUID, Field(...)]
     reader_code: Annotated[UUID, Field(...)]
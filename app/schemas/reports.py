@@ -0,0 +1,21 @@
+from datetime import date, datetime
+from typing import Annotated, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ReportJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    code: Annotated[UUID, Field(...)]
+    report_date: Annotated[date, Field(...)]
+    status: Annotated[str, Field(...)]
+    error: Annotated[Optional[str], Field(None)]
+    created_at: Annotated[datetime, Field(...)]
+    started_at: Annotated[Optional[datetime], Field(None)]
+    finished_at: Annotated[Optional[datetime], Field(None)]
+
+
+class CreateReportJob(BaseModel):
+    report_date: Annotated[date, Field(default_factory=date.today)]
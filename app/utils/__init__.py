@@ -1,3 +1,30 @@
-from .query_params import DateSearch, ListingPagination, ListingSearch, ListingSort
+from .headers import conditional_response, listing_conditional_response, set_listing_headers
+from .query_params import (
+    CountMode,
+    DateSearch,
+    ExportFormat,
+    ListingFields,
+    ListingPagination,
+    ListingSearch,
+    ListingSort,
+    RelatedInclude,
+)
+from .responses import export_response, item_response, listing_response, parameterized_listing_response
 
-__all__ = ("ListingPagination", "DateSearch", "ListingSort", "ListingSearch")
+__all__ = (
+    "CountMode",
+    "ListingFields",
+    "ListingPagination",
+    "DateSearch",
+    "ExportFormat",
+    "ListingSort",
+    "ListingSearch",
+    "RelatedInclude",
+    "conditional_response",
+    "export_response",
+    "item_response",
+    "listing_conditional_response",
+    "listing_response",
+    "parameterized_listing_response",
+    "set_listing_headers",
+)
@@ -0,0 +1,200 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, AsyncIterator, Dict, Hashable, Optional, Tuple
+
+from configs import configs
+
+
+class SizedLRUCache:
+    """LRU кэш байтовых значений, ограниченный суммарным размером значений.
+    При превышении размера вытесняются давно не использованные записи.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Возвращает значение по ключу или None, отмечая запись как использованную.
+
+        Args:
+            key (Hashable): Ключ записи.
+
+        Returns:
+            Optional[bytes]: Значение записи.
+        """
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: bytes) -> None:
+        """Сохраняет значение, вытесняя старые записи при нехватке места.
+        Значения больше размера кэша не сохраняются.
+
+        Args:
+            key (Hashable): Ключ записи.
+            value (bytes): Значение записи.
+        """
+        if len(value) > self.max_size:
+            return
+
+        self.pop(key)
+        self._entries[key] = value
+        self.size += len(value)
+
+        while self.size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def pop(self, key: Hashable) -> None:
+        """Удаляет запись по ключу, если она есть.
+
+        Args:
+            key (Hashable): Ключ записи.
+        """
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self.size -= len(value)
+
+    def clear(self) -> None:
+        """Удаляет все записи."""
+        self._entries.clear()
+        self.size = 0
+
+    async def tee(self, key: Hashable, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Пропускает поток через себя, сохраняя его в кэш после успешного окончания.
+        Если поток оказывается больше размера кэша - он не сохраняется.
+
+        Args:
+            key (Hashable): Ключ записи.
+            stream (AsyncIterator[bytes]): Поток чанков.
+
+        Yields:
+            bytes: Очередной чанк потока.
+        """
+        chunks, size = [], 0
+        async for chunk in stream:
+            if chunks is not None:
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.max_size:
+                    chunks = None
+            yield chunk
+
+        if chunks is not None:
+            self.set(key, b"".join(chunks))
+
+
+class TTLCache:
+    """LRU кэш, ограниченный кол-вом записей. Записи устаревают по истечении времени жизни.
+    Ведет счетчики попаданий, промахов и вытеснений.
+
+    Каждое удаление записи повышает поколение кэша. Значение, прочитанное из источника
+    до удаления, не сохраняется после него (см. `set`), поэтому чтение, выполнявшееся
+    параллельно с изменением данных, не возвращает в кэш устаревшую запись.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Возвращает значение по ключу или None, отмечая запись как использованную.
+        Устаревшая запись удаляется.
+
+        Args:
+            key (Hashable): Ключ записи.
+
+        Returns:
+            Optional[Any]: Значение записи.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """Сохраняет значение, вытесняя давно не использованные записи при переполнении.
+
+        Args:
+            key (Hashable): Ключ записи.
+            value (Any): Значение записи.
+            generation (Optional[int], optional): Поколение кэша на момент начала чтения значения
+                из источника. Если с тех пор записи удалялись - значение не сохраняется. Defaults to None.
+        """
+        if generation is not None and generation != self.generation:
+            return
+
+        self._entries[key] = (monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """Удаляет запись по ключу, если она есть.
+
+        Args:
+            key (Hashable): Ключ записи.
+        """
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Удаляет все записи."""
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Возвращает статистику кэша.
+
+        Returns:
+            Dict[str, Any]: Кол-во записей, ограничения кэша и счетчики обращений.
+        """
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / requests if requests else None,
+        }
+
+
+class DataVersion:
+    """Счетчик версии данных. Повышается при каждом изменении отслеживаемых данных,
+    что делает недействительными все записи кэша, построенные на прошлой версии.
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def bump(self) -> None:
+        """Повышает версию данных."""
+        self.value += 1
+
+
+# Кэш готовых файлов отчетов. Ключ - (дата отчета, версия данных)
+report_cache = SizedLRUCache(configs.reports.CACHE_SIZE)
+
+# Версия данных, из которых строятся отчеты
+report_data_version = DataVersion()
+
+# Кэши сущностей, читаемых по коду. Ключ - название таблицы сущности
+entity_caches: Dict[str, TTLCache] = {}
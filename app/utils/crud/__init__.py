@@ -3,5 +3,7 @@ from .books import book
 from .publishers import publisher
 from .readers import reader
 from .issuances import issuance
+from .report_jobs import report_job
+from .notifications import entity_change_listener
 
-__all__ = ("publisher", "author", "reader", "book", "issuance")
+__all__ = ("publisher", "author", "reader", "book", "issuance", "report_job", "entity_change_listener")
@@ -13,7 +13,8 @@ class AuthorCRUD(WithParameterizedListing[Author], WithHTTPExceptions[Author]):
       которые возникают при исполнении CRUD операций.
     """
 
-    pass
+    affects_reports = True
+    cache_entities = True
 
 
 author = AuthorCRUD(Author)
@@ -1,13 +1,49 @@
-from datetime import date
-from typing import Generic, Optional, Protocol, Type, TypeVar, Union, List
-from uuid import UUID
-
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    List,
+)
+from uuid import UUID, uuid4
+
+from configs import configs
+from db import Explain, use_custom_plans
 from fastapi import HTTPException, status
-from sqlalchemy import Column, String, asc, desc, select
+from sqlalchemy import (
+    Column,
+    Select,
+    UniqueConstraint,
+    and_,
+    any_,
+    bindparam,
+    event,
+    func,
+    inspect,
+    literal,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import MANYTOONE, Load, RelationshipProperty, Session, selectinload
 
-from ..query_params import ListingPagination, ListingSearch, ListingSort, SortOrder
+from ..cache import TTLCache, entity_caches, report_data_version
+from ..query_params import CountMode, ListingPagination, ListingSearch, ListingSort
+from .export import WithExport
+from .keyset import WithKeysetPagination
+from .search import WithListingSearch
+from .versions import WithListingVersion
 
 
 class Codable(Protocol):
@@ -21,14 +57,104 @@ class Codable(Protocol):
 # AlchemyModel
 _AM = TypeVar("_AM", bound=Codable)
 
+# CRUD сущностей, изменения которых отслеживаются: для кэша сущностей или данных отчетов.
+# Ключ - название таблицы сущности
+tracked_entities: Dict[str, "BaseCRUD"] = {}
+
+# Кол-во записей в одном многострочном INSERT массового создания.
+# Ограничено кол-вом параметров запроса: не более 32767 на запрос
+BULK_CHUNK_SIZE = 1000
+
+# Ключ `session.info` с сущностями, записанными в обход ORM (см. `track_bulk_writes`)
+BULK_WRITES_KEY = "bulk_written_entities"
+
 
 class BaseCRUD(Generic[_AM]):
     """Базовый класс для реализации операций CRUD для моделей SQLAlchemy,
     которые имеют поле code (UUID) в качестве свеого PrimaryKey.
     """
 
+    # Влияют ли изменения сущности на данные отчетов
+    affects_reports: bool = False
+
+    # Кэшировать ли снимки сущностей, читаемых по коду (`get_cached`)
+    cache_entities: bool = False
+
     def __init__(self, model: Type[_AM]):
         self.model = model
+        self.cache: Optional[TTLCache] = None
+
+        # * Кэш регистрируется по таблице модели: из него удаляются сущности,
+        # * измененные или удаленные любой сессией (см. `_collect_cache_evictions`)
+        if self.cache_entities and configs.entity_cache.ENABLED:
+            self.cache = TTLCache(configs.entity_cache.MAX_ENTRIES, configs.entity_cache.TTL)
+            entity_caches[model.__tablename__] = self.cache
+
+        if self.cache_entities or self.affects_reports:
+            tracked_entities[model.__tablename__] = self
+
+    def _after_write(self) -> None:
+        """Вызывается после успешного изменения данных сущности в БД."""
+        if self.affects_reports:
+            report_data_version.bump()
+
+    def _get_relationships(self, include: Sequence[str]) -> List[RelationshipProperty]:
+        """Возвращает связи модели по их названиям.
+
+        Args:
+            include (Sequence[str]): Названия связей модели.
+
+        Raises:
+            HTTPException: 400. Связь отсутствует у модели.
+
+        Returns:
+            List[RelationshipProperty]: Связи модели.
+        """
+        relationships = inspect(self.model).relationships
+        unknown = [name for name in include if name not in relationships]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown relations: {', '.join(unknown)}",
+            )
+        return [relationships[name] for name in include]
+
+    def _get_load_options(self, include: Sequence[str]) -> List[Load]:
+        """Возвращает опции подгрузки связанных сущностей. Каждая связь
+        подгружается одним дополнительным запросом сразу для всех записей выборки.
+
+        Args:
+            include (Sequence[str]): Названия связей модели.
+
+        Raises:
+            HTTPException: 400. Связь отсутствует у модели.
+
+        Returns:
+            List[Load]: Опции запроса.
+        """
+        return [selectinload(related.class_attribute) for related in self._get_relationships(include)]
+
+    def _get_version_query(self, include: Sequence[str] = ()) -> Select:
+        """Возвращает запрос кодов и версий записей. Версия записи - время последнего
+        изменения самой записи или встраиваемых в нее связанных сущностей.
+
+        Args:
+            include (Sequence[str], optional): Встраиваемые связанные сущности. Defaults to ().
+
+        Raises:
+            HTTPException: 400. Связь отсутствует у модели.
+
+        Returns:
+            Select: Запрос с колонками code и version.
+        """
+        relationships = self._get_relationships(include)
+        versions = [self.model.updated_at, *(related.mapper.class_.updated_at for related in relationships)]
+        version = func.greatest(*versions) if len(versions) > 1 else versions[0]
+
+        query = select(self.model.code, version.label("version")).select_from(self.model)
+        for related in relationships:
+            query = query.outerjoin(related.class_attribute)
+        return query
 
     async def get_all(self, db: AsyncSession) -> List[_AM]:
         """Возвращает листинг сущностей в БД.
@@ -42,20 +168,104 @@ class BaseCRUD(Generic[_AM]):
         result = await db.execute(select(self.model))
         return result.scalars().all()
 
-    async def get(self, db: AsyncSession, code: Union[str, UUID]) -> _AM:
+    async def get(self, db: AsyncSession, code: Union[str, UUID], include: Sequence[str] = ()) -> _AM:
         """Возвращает сущность по ее коду (code).
 
         Args:
             db (AsyncSession): Асинхронная сессия БД.
             code (Union[str, UUID]): UUID (код) сущности.
+            include (Sequence[str], optional): Подгружаемые связанные сущности. Defaults to ().
 
         Returns:
             _AM: Инстанс модели SLQAlchemy.
         """
-        result = await db.execute(select(self.model).filter(self.model.code == code))
+        query = select(self.model).filter(self.model.code == code).options(*self._get_load_options(include))
+        result = await db.execute(query)
         db_obj = result.scalar_one_or_none()
         return db_obj
 
+    async def get_cached(self, db: AsyncSession, code: Union[str, UUID]) -> Optional[Dict[str, Any]]:
+        """Возвращает снимок сущности по ее коду: значения неотложенных колонок
+        и время последнего изменения (`updated_at`).
+
+        Снимок берется из кэша сущностей, а при промахе читается из БД без создания
+        инстанса модели. Для изменения сущности или работы со связями используйте `get`.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            code (Union[str, UUID]): UUID (код) сущности.
+
+        Returns:
+            Optional[Dict[str, Any]]: Снимок сущности или None, если она отсутствует.
+        """
+        code = UUID(str(code))
+        if self.cache is not None:
+            snapshot = self.cache.get(code)
+            if snapshot is not None:
+                return dict(snapshot)
+            generation = self.cache.generation
+
+        result = await db.execute(select(*self._get_snapshot_columns()).where(self.model.code == code))
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+
+        snapshot = dict(row)
+        if self.cache is not None:
+            self.cache.set(code, snapshot, generation)
+        return dict(snapshot)
+
+    def _get_snapshot_columns(self) -> List[Column]:
+        """Возвращает колонки снимка сущности: неотложенные колонки и время последнего изменения."""
+        props = inspect(self.model).column_attrs
+        return [getattr(self.model, prop.key) for prop in props if not prop.deferred or prop.key == "updated_at"]
+
+    async def get_version(
+        self,
+        db: AsyncSession,
+        code: Union[str, UUID],
+        include: Sequence[str] = (),
+    ) -> Optional[datetime]:
+        """Возвращает версию сущности без загрузки ее данных.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            code (Union[str, UUID]): UUID (код) сущности.
+            include (Sequence[str], optional): Встраиваемые связанные сущности. Defaults to ().
+
+        Raises:
+            HTTPException: 400. Связь отсутствует у модели.
+
+        Returns:
+            Optional[datetime]: Время последнего изменения сущности или None, если она отсутствует.
+        """
+        result = await db.execute(self._get_version_query(include).where(self.model.code == code))
+        row = result.one_or_none()
+        return row.version if row else None
+
+    async def get_many(self, db: AsyncSession, codes: Sequence[Union[str, UUID]]) -> Tuple[List[_AM], List[UUID]]:
+        """Возвращает сущности по списку кодов одним запросом.
+        Повторяющиеся коды учитываются один раз.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            codes (Sequence[Union[str, UUID]]): UUID (коды) сущностей.
+
+        Returns:
+            Tuple[List[_AM], List[UUID]]: Найденные инстансы моделей SLQAlchemy и коды
+                отсутствующих сущностей, в порядке запрошенных кодов.
+        """
+        codes = list(dict.fromkeys(UUID(str(code)) for code in codes))
+
+        # * Коды передаются одним параметром-массивом: текст запроса не зависит от их кол-ва
+        codes_param = bindparam("codes", codes, type_=ARRAY(PG_UUID(as_uuid=True)))
+        result = await db.execute(select(self.model).where(self.model.code == any_(codes_param)))
+        found = {db_obj.code: db_obj for db_obj in result.scalars()}
+
+        items = [found[code] for code in codes if code in found]
+        missing = [code for code in codes if code not in found]
+        return items, missing
+
     async def create(self, db: AsyncSession, obj_in: dict) -> _AM:
         """Создает сущность и возвращает ее инстанс.
 
@@ -70,8 +280,182 @@ class BaseCRUD(Generic[_AM]):
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        self._after_write()
         return db_obj
 
+    async def bulk_create(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[dict],
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+        """Создает сущности в одной транзакции многострочными запросами
+        `INSERT ... ON CONFLICT DO NOTHING RETURNING` по BULK_CHUNK_SIZE записей.
+        Записи, которые невозможно создать, пропускаются и не прерывают создание остальных.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            objs_in (Sequence[dict]): Данные для создания сущностей.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]: Созданные записи (значения
+                неотложенных колонок) в порядке переданных данных и ошибки вида
+                (индекс записи в переданных данных, описание).
+        """
+        errors = await self._check_bulk_items(db, objs_in)
+
+        # * Коды задаются заранее: по ним записи из RETURNING сопоставляются с переданными
+        pending = [(index, {"code": uuid4(), **obj_in}) for index, obj_in in enumerate(objs_in) if index not in errors]
+        table_columns = self.model.__table__.columns
+        columns = [table_columns[prop.key] for prop in inspect(self.model).column_attrs if not prop.deferred]
+
+        created: Dict[UUID, Dict[str, Any]] = {}
+        for start in range(0, len(pending), BULK_CHUNK_SIZE):
+            chunk = pending[start : start + BULK_CHUNK_SIZE]
+            try:
+                # * Точка сохранения откатывает только эту пачку
+                async with db.begin_nested():
+                    result = await db.execute(self.__create_bulk_query([row for _, row in chunk], columns))
+                created.update((row["code"], dict(row)) for row in result.mappings())
+                continue
+            except IntegrityError:
+                pass
+
+            # ! Ограничение, которое не покрывает ON CONFLICT (внешний ключ на удаленную после
+            # ! проверки сущность, CHECK), нарушено - пачка вставляется по одной записи
+            for index, row in chunk:
+                try:
+                    async with db.begin_nested():
+                        result = await db.execute(self.__create_bulk_query([row], columns))
+                    created.update((row["code"], dict(row)) for row in result.mappings())
+                except IntegrityError:
+                    errors[index] = f"{self.model.__name__} data violates integrity constraints."
+
+        # * Записи, не вернувшиеся из RETURNING, нарушили ограничение уникальности
+        items = []
+        for index, row in pending:
+            if row["code"] in created:
+                items.append(created[row["code"]])
+            elif index not in errors:
+                errors[index] = f"{self.model.__name__} with this data already exists."
+
+        if items:
+            await self._after_bulk_create(db, items)
+            track_bulk_writes(db.sync_session, self.model.__tablename__, created.keys())
+        await db.commit()
+
+        if items:
+            self._after_write()
+        return items, sorted(errors.items())
+
+    def __create_bulk_query(self, rows: List[Dict[str, Any]], columns: List[Column]):
+        """Возвращает запрос вставки пачки записей, пропускающий нарушения уникальности."""
+        return pg_insert(self.model.__table__).values(rows).on_conflict_do_nothing().returning(*columns)
+
+    def _get_references(self) -> Dict[str, Type[Any]]:
+        """Возвращает колонки внешних ключей сущности и модели сущностей, на которые они ссылаются."""
+        return {
+            column.key: relationship.mapper.class_
+            for relationship in inspect(self.model).relationships
+            if relationship.direction is MANYTOONE
+            for column in relationship.local_columns
+        }
+
+    async def _check_bulk_items(self, db: AsyncSession, objs_in: Sequence[dict]) -> Dict[int, str]:
+        """Проверяет данные массового создания до вставки: существование связанных сущностей.
+        Коды всех связей проверяются одним запросом.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            objs_in (Sequence[dict]): Данные для создания сущностей.
+
+        Returns:
+            Dict[int, str]: Ошибки по индексам записей, которые невозможно создать.
+        """
+        references = self._get_references()
+
+        queries = []
+        for name, target in references.items():
+            codes = list({obj_in[name] for obj_in in objs_in if obj_in.get(name) is not None})
+            if codes:
+                codes_param = bindparam(f"{name}_codes", codes, type_=ARRAY(PG_UUID(as_uuid=True)))
+                queries.append(select(literal(name), target.code).where(target.code == any_(codes_param)))
+
+        found = set()
+        if queries:
+            result = await db.execute(union_all(*queries))
+            found = {(name, code) for name, code in result}
+
+        errors = {}
+        for index, obj_in in enumerate(objs_in):
+            for name, target in references.items():
+                if obj_in.get(name) is not None and (name, obj_in[name]) not in found:
+                    errors[index] = f"{target.__name__} not found."
+                    break
+
+        # * Дубликаты отклоняются до проверок наследников: ограничения, которые учитывают записи
+        # * запроса (например, остатки книг), не должны расходоваться на записи, пропускаемые ON CONFLICT
+        for index, detail in (await self._find_bulk_duplicates(db, objs_in)).items():
+            errors.setdefault(index, detail)
+        return errors
+
+    async def _find_bulk_duplicates(self, db: AsyncSession, objs_in: Sequence[dict]) -> Dict[int, str]:
+        """Находит данные массового создания, нарушающие ограничения уникальности: повторы внутри
+        переданных данных (первое вхождение создается) и совпадения с существующими записями.
+        Существующие записи проверяются одним запросом на каждое ограничение.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            objs_in (Sequence[dict]): Данные для создания сущностей.
+
+        Returns:
+            Dict[int, str]: Ошибки по индексам дублирующих записей.
+        """
+        table = self.model.__table__
+        detail = f"{self.model.__name__} with this data already exists."
+
+        errors = {}
+        for constraint in table.constraints:
+            if not isinstance(constraint, UniqueConstraint):
+                continue
+
+            columns = list(constraint.columns)
+            keys: Dict[tuple, int] = {}
+            for index, obj_in in enumerate(objs_in):
+                key = tuple(obj_in.get(column.key) for column in columns)
+                # * NULL не нарушает уникальность
+                if None in key:
+                    continue
+                if key in keys:
+                    errors[index] = detail
+                else:
+                    keys[key] = index
+
+            if not keys:
+                continue
+
+            existing = func.unnest(
+                *(
+                    bindparam(f"{column.key}_keys", [key[position] for key in keys], type_=ARRAY(column.type))
+                    for position, column in enumerate(columns)
+                )
+            ).table_valued(*(column.key for column in columns)).render_derived()
+            query = select(*columns).select_from(
+                table.join(existing, and_(*(column == existing.c[column.key] for column in columns)))
+            )
+            result = await db.execute(query)
+            for row in result:
+                errors[keys[tuple(row)]] = detail
+
+        return errors
+
+    async def _after_bulk_create(self, db: AsyncSession, items: List[Dict[str, Any]]) -> None:
+        """Вызывается после вставки записей массового создания, до фиксации транзакции.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            items (List[Dict[str, Any]]): Созданные записи.
+        """
+
     async def delete(self, db: AsyncSession, code: Union[str, UUID]) -> _AM:
         """Удаляет сущность и возвращает ее инстанс.
 
@@ -85,6 +469,7 @@ class BaseCRUD(Generic[_AM]):
         db_obj = await self.get(db, code)
         await db.delete(db_obj)
         await db.commit()
+        self._after_write()
         return db_obj
 
     async def update(self, db: AsyncSession, code: Union[str, UUID], obj_in: dict) -> _AM:
@@ -103,9 +488,75 @@ class BaseCRUD(Generic[_AM]):
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        self._after_write()
         return db_obj
 
 
+@event.listens_for(Session, "after_flush")
+def _collect_cache_evictions(session: Session, flush_context: Any) -> None:
+    """Запоминает измененные и удаленные при сбросе сессии сущности, в том числе
+    каскадно и через другие CRUD. Их снимки удаляются из кэшей после фиксации транзакции.
+    """
+    evictions = session.info.setdefault("entity_cache_evictions", set())
+    for obj in (*session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table in entity_caches:
+            evictions.add((table, obj.code))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_cache_evictions(session: Session) -> None:
+    """Удаляет из кэшей снимки сущностей, измененных зафиксированной транзакцией."""
+    for table, code in session.info.pop("entity_cache_evictions", ()):
+        entity_caches[table].pop(code)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_evictions(session: Session) -> None:
+    """Отменяет удаление снимков: изменения откаченной транзакции не сохранены в БД."""
+    session.info.pop("entity_cache_evictions", None)
+
+
+def track_bulk_writes(session: Session, table: str, codes: Iterable[UUID]) -> None:
+    """Запоминает сущности, записанные запросами в обход ORM (массовые операции):
+    сброс сессии их не видит. После фиксации транзакции их снимки удаляются из кэшей,
+    а другие процессы получают уведомления об изменении.
+
+    Args:
+        session (Session): Сессия с открытой транзакцией.
+        table (str): Название таблицы сущностей.
+        codes (Iterable[UUID]): UUID (коды) сущностей.
+    """
+    entities = {(table, code) for code in codes}
+    session.info.setdefault(BULK_WRITES_KEY, set()).update(entities)
+    if table in entity_caches:
+        session.info.setdefault("entity_cache_evictions", set()).update(entities)
+
+
+def invalidate_entity(table: str, code: UUID) -> None:
+    """Сбрасывает закэшированные данные сущности, измененной другим процессом:
+    снимок сущности и, если сущность влияет на отчеты, версию данных отчетов.
+
+    Args:
+        table (str): Название таблицы сущности.
+        code (UUID): UUID (код) сущности.
+    """
+    crud = tracked_entities.get(table)
+    if crud is None:
+        return
+    if crud.cache is not None:
+        crud.cache.pop(code)
+    if crud.affects_reports:
+        report_data_version.bump()
+
+
+def invalidate_all() -> None:
+    """Сбрасывает все кэши сущностей и версию данных отчетов."""
+    for cache in entity_caches.values():
+        cache.clear()
+    report_data_version.bump()
+
+
 class WithHTTPExceptions(BaseCRUD[_AM]):
     """Класс предоставляет переопределенную функции CRUD операций,
     имеющую дополнительные вызовы HTTP исключений в определенных ситуациях,
@@ -117,6 +568,7 @@ class WithHTTPExceptions(BaseCRUD[_AM]):
         db: AsyncSession,
         code: Union[str, UUID],
         raise_404: bool = True,
+        include: Sequence[str] = (),
     ) -> _AM:
         """Возвращает сущность по ее коду (code).
         вызывает HTTP исключение в случае ее отсутствия.
@@ -125,14 +577,17 @@ class WithHTTPExceptions(BaseCRUD[_AM]):
             db (AsyncSession): Асинхронная сессия БД.
             code (Union[str, UUID]): UUID (код) сущности.
             raise_404 (bool, optional): Вызывать ли HTTP404 если сущность не найдена. Defaults to True.
+            include (Sequence[str], optional): Подгружаемые связанные сущности. Defaults to ().
 
         Raises:
             HTTPException: 404. Сущность отсутствует в БД.
+            HTTPException: 400. Связь отсутствует у модели.
 
         Returns:
             _AM: Инстанс модели SLQAlchemy.
         """
-        result = await db.execute(select(self.model).filter(self.model.code == code))
+        query = select(self.model).filter(self.model.code == code).options(*self._get_load_options(include))
+        result = await db.execute(query)
         db_obj = result.scalar_one_or_none()
         if db_obj is None:
             if raise_404:
@@ -142,6 +597,34 @@ class WithHTTPExceptions(BaseCRUD[_AM]):
                 )
         return db_obj
 
+    async def get_cached(
+        self,
+        db: AsyncSession,
+        code: Union[str, UUID],
+        raise_404: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """Возвращает снимок сущности по ее коду из кэша сущностей или из БД.
+        Вызывает HTTP исключение в случае ее отсутствия.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            code (Union[str, UUID]): UUID (код) сущности.
+            raise_404 (bool, optional): Вызывать ли HTTP404 если сущность не найдена. Defaults to True.
+
+        Raises:
+            HTTPException: 404. Сущность отсутствует в БД.
+
+        Returns:
+            Optional[Dict[str, Any]]: Снимок сущности.
+        """
+        snapshot = await super().get_cached(db, code)
+        if snapshot is None and raise_404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{self.model.__name__} not found.",
+            )
+        return snapshot
+
     async def create(
         self,
         db: AsyncSession,
@@ -182,8 +665,47 @@ class WithHTTPExceptions(BaseCRUD[_AM]):
                 detail=f"An error ocured while creating {self.model.__name__}.",
             )
 
+        self._after_write()
         return db_obj
 
+    async def bulk_create(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[dict],
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+        """Создает сущности в одной транзакции (см. `BaseCRUD.bulk_create`).
+        Записи, которые невозможно создать, возвращаются как ошибки, остальные ошибки
+        откатывают транзакцию целиком.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            objs_in (Sequence[dict]): Данные для создания сущностей.
+
+        Raises:
+            HTTPException: 400. Нарушено ограничение целостности вне вставляемых записей.
+            HTTPException: 500. Ошибка при создании.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]: Созданные записи и ошибки вида
+                (индекс записи в переданных данных, описание).
+        """
+        try:
+            return await super().bulk_create(db, objs_in)
+
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{self.model.__name__} data violates integrity constraints.",
+            )
+
+        except Exception:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"An error ocured while creating {self.model.__name__}.",
+            )
+
     async def delete(
         self,
         db: AsyncSession,
@@ -216,6 +738,8 @@ class WithHTTPExceptions(BaseCRUD[_AM]):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"An error ocured while deleting {self.model.__name__}.",
             )
+
+        self._after_write()
         return db_obj
 
     async def update(
@@ -255,13 +779,27 @@ class WithHTTPExceptions(BaseCRUD[_AM]):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"An error ocured while updating {self.model.__name__}.",
             )
+
+        self._after_write()
         return db_obj
 
 
-class WithParameterizedListing(BaseCRUD[_AM]):
+class WithParameterizedListing(
+    WithExport,
+    WithListingVersion,
+    WithKeysetPagination,
+    WithListingSearch,
+    BaseCRUD[_AM],
+):
     """Класс предоставляет переопределенную функцию листинга,
     имеющую дополнительные параметры сортировки, поиска и пагинации,
     в отличие от базовго CRUD класса.
+
+    Этот класс наследуется от:
+    - `WithExport`: Выгрузка листинга через серверный курсор или `COPY`.
+    - `WithListingVersion`: Версия страницы листинга для условных запросов.
+    - `WithKeysetPagination`: Сортировка и пагинация смещением или курсором.
+    - `WithListingSearch`: Условия поиска и составного фильтра листинга.
     """
 
     async def get_all(
@@ -270,6 +808,7 @@ class WithParameterizedListing(BaseCRUD[_AM]):
         search: Optional[ListingSearch] = None,
         sort: Optional[ListingSort] = None,
         pagination: Optional[ListingPagination] = None,
+        include: Sequence[str] = (),
     ) -> List[_AM]:
         """Возвращает листинг сущностей в БД, с примененным к нему
         поиску, сортировке и пагинации.
@@ -279,59 +818,153 @@ class WithParameterizedListing(BaseCRUD[_AM]):
             search (Optional[ListingSearch], optional): Данные для поиска. Defaults to None.
             sort (Optional[ListingSort], optional): Данные для сортировки. Defaults to None.
             pagination (Optional[ListingPagination], optional): Данные для пагинации. Defaults to None.
+            include (Sequence[str], optional): Подгружаемые связанные сущности. Defaults to ().
+
+        Raises:
+            HTTPException: 400. Связь отсутствует у модели.
 
         Returns:
             List[_AM]: Список инстансов моделей SLQAlchemy.
         """
-        query = select(self.model)
-
-        # Если задан поиск по полю
-        if search and search.search_by:
-            column = getattr(self.model, search.search_by)
-            opreator = search.search_mode.get_operator()
-            condition = self.__create_condition(
-                column=column,
-                operator=opreator,
-                search_value=search.search_value,
-            )
-            query = query.where(condition)
+        query = select(self.model).options(*self._get_load_options(include))
+        query = self._apply_listing(query, search, sort, pagination)
+        await use_custom_plans(db)
+        result = await db.execute(query)
+        return result.scalars().all()
 
-        # Если задана сортировка по полю
-        if sort and sort.sort_by:
-            ordering = (
-                desc(sort.sort_by) if sort.sort_order == SortOrder.DESC else asc(sort.sort_by)
-            )
-            query = query.order_by(ordering)
+    async def get_rows(
+        self,
+        db: AsyncSession,
+        search: Optional[ListingSearch] = None,
+        sort: Optional[ListingSort] = None,
+        pagination: Optional[ListingPagination] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Возвращает листинг сущностей в БД в виде словарей, с примененным к нему
+        поиску, сортировке и пагинации. Инстансы моделей не создаются, сессия
+        не отслеживает полученные записи.
 
-        # Если задана пагинация
-        if pagination:
-            query = query.offset(pagination.skip).limit(pagination.limit)
+        Выбираются только колонки переданных полей (или все неотложенные колонки).
+        Код сущности и поле сортировки выбираются всегда - они нужны для курсора
+        следующей страницы.
 
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            search (Optional[ListingSearch], optional): Данные для поиска. Defaults to None.
+            sort (Optional[ListingSort], optional): Данные для сортировки. Defaults to None.
+            pagination (Optional[ListingPagination], optional): Данные для пагинации. Defaults to None.
+            fields (Optional[Sequence[str]], optional): Выбираемые поля. Defaults to None.
+
+        Raises:
+            HTTPException: 400. Поле не является колонкой сущности.
+
+        Returns:
+            List[Dict[str, Any]]: Список записей листинга.
+        """
+        query = self.get_rows_query(search, sort, pagination, fields)
+        await use_custom_plans(db)
         result = await db.execute(query)
-        return result.scalars().all()
 
-    @staticmethod
-    def __create_condition(
-        column: Column, operator: str, search_value: Union[str, int, float, date]
-    ):
-        if operator == "ILIKE":
-            if not isinstance(column.type, String):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Cannot use this search mode on non-string field",
+        # * Строки сразу приводятся к словарям: pydantic-core валидирует словарь в разы
+        # * быстрее, чем читает поля через интерфейс Mapping у RowMapping
+        keys = tuple(result.keys())
+        return [dict(zip(keys, row)) for row in result]
+
+    def get_rows_query(
+        self,
+        search: Optional[ListingSearch] = None,
+        sort: Optional[ListingSort] = None,
+        pagination: Optional[ListingPagination] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Select:
+        """Возвращает запрос листинга с выбранными колонками (см. `get_rows`).
+        Параметры проверяются при построении запроса.
+
+        Args:
+            search (Optional[ListingSearch], optional): Данные для поиска. Defaults to None.
+            sort (Optional[ListingSort], optional): Данные для сортировки. Defaults to None.
+            pagination (Optional[ListingPagination], optional): Данные для пагинации. Defaults to None.
+            fields (Optional[Sequence[str]], optional): Выбираемые поля. Defaults to None.
+
+        Raises:
+            HTTPException: 400. Поле не является колонкой сущности.
+            HTTPException: 400. Некорректные параметры поиска или курсор.
+
+        Returns:
+            Select: Запрос листинга.
+        """
+        columns = self.__get_columns(fields, sort)
+        return self._apply_listing(select(*columns), search, sort, pagination)
+
+    async def count(
+        self,
+        db: AsyncSession,
+        search: Optional[ListingSearch] = None,
+        mode: CountMode = CountMode.EXACT,
+    ) -> Optional[int]:
+        """Возвращает общее кол-во записей листинга с примененным к нему поиском.
+
+        В оценочном режиме БД не пересчитывает записи: для листинга без поиска
+        используется статистика таблицы (`pg_class.reltuples`), для листинга
+        с поиском или фильтром - оценка кол-ва строк планировщиком запроса.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            search (Optional[ListingSearch], optional): Данные для поиска. Defaults to None.
+            mode (CountMode, optional): Режим подсчета. Defaults to CountMode.EXACT.
+
+        Returns:
+            Optional[int]: Кол-во записей или None, если подсчет не запрошен.
+        """
+        if mode == CountMode.NONE:
+            return None
+
+        if mode == CountMode.ESTIMATED:
+            # * Статистика таблицы. Отрицательна, если таблица еще не анализировалась
+            if not (search and (search.search_by or search.filter)):
+                result = await db.execute(
+                    text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                    {"table": self.model.__tablename__},
                 )
-            return getattr(column, operator.lower())(f"%{search_value}%")
+                estimate = result.scalar_one_or_none()
+                if estimate is not None and estimate >= 0:
+                    return int(estimate)
 
-        elif operator != "=" and isinstance(column.type, String):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot use this search mode on non-numeric field",
-            )
+            await use_custom_plans(db)
+            result = await db.execute(Explain(self._apply_search(select(self.model), search)))
+            plan = result.scalar_one()
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+        query = self._apply_search(select(func.count()).select_from(self.model), search)
+        await use_custom_plans(db)
+        result = await db.execute(query)
+        return result.scalar_one()
+
+    def __get_columns(self, fields: Optional[Sequence[str]], sort: Optional[ListingSort]) -> List[Column]:
+        """Возвращает колонки таблицы для выборки указанных полей.
+
+        Args:
+            fields (Optional[Sequence[str]]): Выбираемые поля. Если не переданы -
+                выбираются все колонки, кроме отложенных.
+            sort (Optional[ListingSort]): Данные для сортировки.
 
-        elif operator in ("<", ">", "<=", ">=") and isinstance(search_value, str):
+        Raises:
+            HTTPException: 400. Поле не является колонкой сущности.
+
+        Returns:
+            List[Column]: Колонки таблицы сущности.
+        """
+        if not fields:
+            fields = [prop.key for prop in inspect(self.model).column_attrs if not prop.deferred]
+
+        sort_by, _ = self._get_sort_key(sort)
+        names = dict.fromkeys(["code", *fields, *([sort_by] if sort_by else [])])
+
+        table_columns = self.model.__table__.columns
+        unknown = [name for name in names if name not in table_columns]
+        if unknown:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot use this search mode with non-numeric or non-date search value",
+                detail=f"Unknown fields: {', '.join(unknown)}",
             )
-
-        return column.op(operator)(search_value)
+        return [table_columns[name] for name in names]
@@ -1,6 +1,11 @@
+from typing import List
+
+from db import use_custom_plans
 from db.models import Book
 from fastapi import HTTPException, status
+from sqlalchemy import Row, func, literal_column, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .authors import author
 from .base import WithHTTPExceptions, WithParameterizedListing
@@ -22,6 +27,13 @@ class BookCRUD(WithParameterizedListing[Book], WithHTTPExceptions[Book]):
       которые возникают при исполнении CRUD операций.
     """
 
+    affects_reports = True
+    cache_entities = True
+
+    # Конфигурация полнотекстового поиска. Должна совпадать с конфигурацией,
+    # с которой триггеры БД строят `search_vector`
+    SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
     async def create(self, db, obj_in):
         """Создает сущность и возвращает ее инстанс.
         Проверяет существование связонных сущностей.
@@ -39,15 +51,14 @@ class BookCRUD(WithParameterizedListing[Book], WithHTTPExceptions[Book]):
         Returns:
             Book: Созданый инстанс модели Book.
         """
-        # * Переменные сокращены с целью предотвращения конфликтов имен
-        a = await author.get(db, code=obj_in.pop("author_code"))
-        p = await publisher.get(db, code=obj_in.pop("publisher_code"))
+        # * Существование автора и издательства проверяется по кэшу сущностей:
+        # * книге нужны только их коды, инстансы моделей не загружаются
+        await author.get_cached(db, code=obj_in["author_code"])
+        await publisher.get_cached(db, code=obj_in["publisher_code"])
 
         try:
             # * Создаем книгу
             db_obj = self.model(**obj_in)
-            db_obj.author = a
-            db_obj.publisher = p
 
             db.add(db_obj)
             await db.commit()
@@ -69,6 +80,7 @@ class BookCRUD(WithParameterizedListing[Book], WithHTTPExceptions[Book]):
                 detail=f"An error ocured while creating {self.model.__name__}.",
             )
 
+        self._after_write()
         return db_obj
 
     async def delete(self, db, code, raise_404=True) -> Book:
@@ -116,7 +128,37 @@ class BookCRUD(WithParameterizedListing[Book], WithHTTPExceptions[Book]):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"An error ocured while deleting {self.model.__name__}.",
             )
+
+        self._after_write()
         return db_obj
 
+    async def search(self, db: AsyncSession, text: str, limit: int = 20, skip: int = 0) -> List[Row]:
+        """Выполняет полнотекстовый поиск книг по названию, ФИО автора и
+        названию издательства. Результаты упорядочены по релевантности:
+        совпадение в названии весит больше совпадения в авторе, а то - в издательстве.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            text (str): Поисковый запрос в формате `websearch_to_tsquery`.
+            limit (int, optional): Кол-во результатов. Defaults to 20.
+            skip (int, optional): Кол-во пропускаемых результатов. Defaults to 0.
+
+        Returns:
+            List[Row]: Строки вида (инстанс модели Book, релевантность).
+        """
+        ts_query = func.websearch_to_tsquery(self.SEARCH_CONFIG, text)
+        rank = func.ts_rank(Book.search_vector, ts_query).label("rank")
+
+        query = (
+            select(Book, rank)
+            .where(Book.search_vector.bool_op("@@")(ts_query))
+            .order_by(rank.desc(), Book.code)
+            .offset(skip)
+            .limit(limit)
+        )
+        await use_custom_plans(db)
+        result = await db.execute(query)
+        return result.all()
+
 
 book = BookCRUD(Book)
@@ -0,0 +1,86 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from db import use_custom_plans
+from sqlalchemy import Select
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def compile_copy_query(query: Select, dialect: Dialect) -> Tuple[str, List[Any]]:
+    """Компилирует запрос для `COPY (...) TO STDOUT` драйвера asyncpg.
+    Параметры передаются позиционно ($1, $2, ...) с явным приведением типов,
+    IN списки раскрываются при компиляции.
+
+    Args:
+        query (Select): Запрос выгрузки.
+        dialect (Dialect): Диалект соединения.
+
+    Returns:
+        Tuple[str, List[Any]]: Текст запроса и значения его параметров по порядку.
+    """
+    compiled = query.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    return str(compiled), [compiled.params[name] for name in compiled.positiontup]
+
+
+class WithExport:
+    """Класс предоставляет выгрузку листинга без загрузки всей выборки в память:
+    пачками через серверный курсор или в CSV командой `COPY`.
+    Подмешивается к CRUD классу, модель берется из `self.model`.
+    """
+
+    async def stream_rows(
+        self,
+        db: AsyncSession,
+        query: Select,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Отдает записи запроса листинга пачками через серверный курсор,
+        не загружая всю выборку в память.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            query (Select): Запрос, полученный через `get_rows_query`.
+            batch_size (int, optional): Кол-во строк, забираемых из курсора за раз. Defaults to 1000.
+
+        Yields:
+            List[Dict[str, Any]]: Очередная пачка записей листинга.
+        """
+        await use_custom_plans(db)
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        keys = tuple(result.keys())
+        async for rows in result.partitions():
+            yield [dict(zip(keys, row)) for row in rows]
+
+    async def copy_rows(
+        self,
+        db: AsyncSession,
+        query: Select,
+        output: Callable[[bytes], Awaitable[None]],
+        fields: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Выгружает записи запроса листинга в CSV командой `COPY (...) TO STDOUT`.
+        Строки форматирует сама БД: данные передаются в `output` как есть,
+        без построения обьектов Python для каждой записи.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            query (Select): Запрос, полученный через `get_rows_query`.
+            output (Callable[[bytes], Awaitable[None]]): Приемник очередного блока CSV.
+            fields (Optional[Sequence[str]], optional): Выгружаемые поля. Defaults to None.
+        """
+        # * Служебные колонки запроса (код, поле сортировки) в выгрузку не попадают
+        if fields:
+            table_columns = self.model.__table__.columns
+            query = query.with_only_columns(*[table_columns[name] for name in fields])
+
+        connection = await db.connection()
+        statement, params = compile_copy_query(query, connection.dialect)
+
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_from_query(
+            statement,
+            *params,
+            output=output,
+            format="csv",
+            header=True,
+        )
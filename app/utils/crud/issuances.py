@@ -1,11 +1,21 @@
-from db.models import Issuance
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+from db.models import Author, Book, Issuance, Reader
 from fastapi import HTTPException, status
+from sqlalchemy import Float, Integer, Row, Select, and_, any_, bindparam, case, cast, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .books import book
-from .base import WithHTTPExceptions, WithParameterizedListing
+from .base import WithHTTPExceptions, WithParameterizedListing, track_bulk_writes
 from .readers import reader
 
+# Максимальное кол-во непогашенных выдач одного читателя
+MAX_READER_ISSUANCES = 5
 
 # ! Если настолько сложные взаимодействия не будут интересовать в рамках CRUD -
 # ! удалите все переопределенные методы и оставьте pass в теле класса.
@@ -23,6 +33,9 @@ class IssuanceCRUD(WithParameterizedListing[Issuance], WithHTTPExceptions[Issuan
       которые возникают при исполнении CRUD операций.
     """
 
+    affects_reports = True
+    cache_entities = True
+
     async def create(self, db, obj_in) -> Issuance:
         """Создает сущность и возвращает ее инстанс.
         Дополнительно проверяет существование связанных
@@ -49,7 +62,7 @@ class IssuanceCRUD(WithParameterizedListing[Issuance], WithHTTPExceptions[Issuan
         b = await book.get(db, code=obj_in.pop("book_code"))
 
         # * Если читатель уже имеет 5 непогашеных выдач
-        if len(await r.awaitable_attrs.issuances) >= 5:
+        if len(await r.awaitable_attrs.issuances) >= MAX_READER_ISSUANCES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="The number of issuances for this reader has been exceeded.",
@@ -91,8 +104,88 @@ class IssuanceCRUD(WithParameterizedListing[Issuance], WithHTTPExceptions[Issuan
                 detail=f"An error ocured while creating {self.model.__name__}.",
             )
 
+        self._after_write()
         return db_obj
 
+    async def _check_bulk_items(self, db: AsyncSession, objs_in: Sequence[dict]) -> Dict[int, str]:
+        """Проверяет данные массового создания: существование читателей и книг,
+        допустимое кол-во выдач для читателя и наличие книг в библиотеке.
+        Выдачи распределяются по порядку переданных данных, с учетом выдач из этого же запроса.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            objs_in (Sequence[dict]): Данные для создания выдач.
+
+        Returns:
+            Dict[int, str]: Ошибки по индексам выдач, которые невозможно создать.
+        """
+        errors = await super()._check_bulk_items(db, objs_in)
+
+        uuid_array = ARRAY(PG_UUID(as_uuid=True))
+        reader_codes = bindparam("reader_codes", list({obj_in["reader_code"] for obj_in in objs_in}), type_=uuid_array)
+        book_codes = bindparam("book_codes", list({obj_in["book_code"] for obj_in in objs_in}), type_=uuid_array)
+
+        # * Читатели и остатки книг блокируются до конца транзакции (в порядке кодов, чтобы
+        # * параллельные запросы не взаимоблокировались): параллельные выдачи не превысят
+        # * лимит читателя и не уведут остатки в минус
+        result = await db.execute(
+            select(Reader.code).where(Reader.code == any_(reader_codes)).order_by(Reader.code).with_for_update()
+        )
+        readers = set(result.scalars())
+        result = await db.execute(
+            select(Book.code, Book.amount).where(Book.code == any_(book_codes)).order_by(Book.code).with_for_update()
+        )
+        amounts = dict(result.all())
+
+        result = await db.execute(
+            select(Issuance.reader_code, func.count())
+            .where(Issuance.reader_code == any_(reader_codes))
+            .group_by(Issuance.reader_code)
+        )
+        issued = dict(result.all())
+
+        for index, obj_in in enumerate(objs_in):
+            if index in errors:
+                continue
+
+            # ! Читатель или книга могли быть удалены между проверкой связей и блокировкой
+            reader_code, book_code = obj_in["reader_code"], obj_in["book_code"]
+            if reader_code not in readers:
+                errors[index] = f"{Reader.__name__} not found."
+            elif book_code not in amounts:
+                errors[index] = f"{Book.__name__} not found."
+            elif issued.get(reader_code, 0) >= MAX_READER_ISSUANCES:
+                errors[index] = "The number of issuances for this reader has been exceeded."
+            elif amounts[book_code] < 1:
+                errors[index] = "It is impossible to create issuance. There are not enough books."
+            else:
+                issued[reader_code] = issued.get(reader_code, 0) + 1
+                amounts[book_code] -= 1
+
+        return errors
+
+    async def _after_bulk_create(self, db: AsyncSession, items: List[Dict[str, Any]]) -> None:
+        """Забирает выданные книги "с полки" одним запросом.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            items (List[Dict[str, Any]]): Созданные выдачи.
+        """
+        taken = Counter(item["book_code"] for item in items)
+        books = func.unnest(
+            bindparam("book_codes", list(taken), type_=ARRAY(PG_UUID(as_uuid=True))),
+            bindparam("taken", list(taken.values()), type_=ARRAY(Integer)),
+        ).table_valued("code", "taken").render_derived()
+
+        # * Инстансы книг в сессии не синхронизируются: сессия запроса их не переиспользует
+        await db.execute(
+            update(Book)
+            .where(Book.code == books.c.code)
+            .values(amount=Book.amount - books.c.taken)
+            .execution_options(synchronize_session=False)
+        )
+        track_bulk_writes(db.sync_session, Book.__tablename__, taken)
+
     async def delete(self, db, code, raise_404=True) -> Issuance:
         """Удаляет сущность и возвращает ее инстанс.
         В случае успешного удаления - возвращает книгу в библиотеку.
@@ -136,7 +229,96 @@ class IssuanceCRUD(WithParameterizedListing[Issuance], WithHTTPExceptions[Issuan
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"An error ocured while deleting {self.model.__name__}.",
             )
+
+        self._after_write()
         return db_obj
 
+    def get_expired_report_query(self, report_date: date) -> Select:
+        """Возвращает запрос данных для отчета по удержаным книгам.
+        Выдачи соединяются с читателями, книгами и авторами, а итоги по читателю
+        и по библиотеке считаются оконными функциями на стороне БД.
+
+        Строки упорядочены по читателю и имеют вид:
+        (код читателя, ФИО, телефон, автор, название книги, цена в тыс. руб.,
+        дата выдачи ДД.ММ.ГГГГ, итого книг у читателя, итого по библиотеке).
+
+        Args:
+            report_date (date): Дата, на которую выдача считается просроченной.
+
+        Returns:
+            Select: Запрос SQLAlchemy.
+        """
+        # * Цена в тыс. руб. округляется до 3 знаков половиной к четному, как Decimal в Python:
+        # * round() в Postgres округляет половину от нуля. Тысячные доли цены в тыс. руб. -
+        # * это целые рубли, поэтому до четного округляется сама цена (она неотрицательна)
+        whole_price = func.trunc(Book.price)
+        price = case(
+            (and_(Book.price - whole_price == Decimal("0.5"), func.mod(whole_price, 2) == 0), whole_price),
+            else_=func.round(Book.price),
+        )
+
+        return (
+            select(
+                Reader.code,
+                Reader.full_name,
+                Reader.phone,
+                Author.name,
+                Book.title,
+                cast(price / 1000, Float),
+                func.to_char(Issuance.issuanced_at, "DD.MM.YYYY"),
+                func.count().over(partition_by=Reader.code),
+                func.count().over(),
+            )
+            .select_from(Issuance)
+            .join(Reader, Issuance.reader_code == Reader.code)
+            .join(Book, Issuance.book_code == Book.code)
+            .join(Author, Book.author_code == Author.code)
+            .where(Issuance.expires_at <= report_date)
+            .order_by(Reader.full_name, Reader.code, Issuance.issuanced_at)
+        )
+
+    async def get_expired_report_rows(
+        self,
+        db: AsyncSession,
+        report_date: date,
+    ) -> List[Tuple[Any, ...]]:
+        """Возвращает предаггрегированные данные для отчета по удержаным книгам
+        одним запросом. Кол-во обращений к БД не зависит от кол-ва выдач.
+        Формат строк описан в `get_expired_report_query`.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            report_date (date): Дата, на которую выдача считается просроченной.
+
+        Returns:
+            List[Tuple[Any, ...]]: Список строк отчета.
+        """
+        # * Строки приводятся к обычным кортежам, чтобы их можно было передать в пул рендеринга
+        result = await db.execute(self.get_expired_report_query(report_date))
+        return [tuple(row) for row in result]
+
+    async def stream_expired_report_rows(
+        self,
+        db: AsyncSession,
+        report_date: date,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Row]:
+        """Построчно отдает данные для отчета по удержаным книгам через
+        серверный курсор, не загружая всю выборку в память.
+        Формат строк описан в `get_expired_report_query`.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            report_date (date): Дата, на которую выдача считается просроченной.
+            batch_size (int, optional): Кол-во строк, забираемых из курсора за раз. Defaults to 1000.
+
+        Yields:
+            Row: Строка отчета.
+        """
+        query = self.get_expired_report_query(report_date)
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for row in result:
+            yield row
+
 
 issuance = IssuanceCRUD(Issuance)
@@ -0,0 +1,202 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
+from decimal import Decimal
+from typing import Any, Mapping, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Column, Select, and_, asc, desc, or_, tuple_
+
+from ..query_params import ListingPagination, ListingSearch, ListingSort, SortOrder
+
+
+class WithKeysetPagination:
+    """Класс предоставляет сортировку и пагинацию листинга: смещением или курсором (keyset).
+    Подмешивается к CRUD классу, модель берется из `self.model`,
+    условия поиска - из `self._apply_search` (см. `WithListingSearch`).
+    """
+
+    def _apply_listing(
+        self,
+        query: Select,
+        search: Optional[ListingSearch] = None,
+        sort: Optional[ListingSort] = None,
+        pagination: Optional[ListingPagination] = None,
+    ) -> Select:
+        """Применяет к запросу листинга поиск, сортировку и пагинацию.
+
+        Args:
+            query (Select): Запрос листинга.
+            search (Optional[ListingSearch], optional): Данные для поиска. Defaults to None.
+            sort (Optional[ListingSort], optional): Данные для сортировки. Defaults to None.
+            pagination (Optional[ListingPagination], optional): Данные для пагинации. Defaults to None.
+
+        Raises:
+            HTTPException: 400. Курсор передан вместе со смещением.
+
+        Returns:
+            Select: Запрос листинга.
+        """
+        query = self._apply_search(query, search)
+
+        column = getattr(self.model, sort.sort_by) if sort and sort.sort_by else None
+        descending = bool(sort and sort.sort_order == SortOrder.DESC)
+
+        # Если передан курсор - страница начинается сразу после последней записи прошлой страницы
+        if pagination and pagination.cursor:
+            if pagination.skip:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cannot use skip together with cursor",
+                )
+            value, code = self.__decode_cursor(pagination.cursor, column, sort)
+            query = query.where(self.__create_keyset_condition(column, descending, value, code))
+
+        # * Код сущности замыкает сортировку, чтобы порядок записей был однозначным
+        query = query.order_by(*self.__create_ordering(column, descending))
+
+        # Если задана пагинация
+        if pagination:
+            if not pagination.cursor:
+                query = query.offset(pagination.skip)
+            query = query.limit(pagination.limit)
+
+        return query
+
+    def get_next_cursor(
+        self,
+        items: Sequence[Any],
+        sort: Optional[ListingSort] = None,
+        pagination: Optional[ListingPagination] = None,
+    ) -> Optional[str]:
+        """Возвращает курсор следующей страницы листинга.
+
+        Курсор кодирует значение поля сортировки и код последней записи страницы.
+        Если страница неполная - следующей страницы нет.
+
+        Args:
+            items (Sequence[Any]): Записи текущей страницы (инстансы моделей или словари), полученные
+                через `get_all` или `get_rows`.
+            sort (Optional[ListingSort], optional): Данные для сортировки. Defaults to None.
+            pagination (Optional[ListingPagination], optional): Данные для пагинации. Defaults to None.
+
+        Returns:
+            Optional[str]: Курсор следующей страницы или None.
+        """
+        if not pagination or not items or len(items) < pagination.limit:
+            return None
+
+        last = items[-1]
+        sort_by, sort_order = self._get_sort_key(sort)
+        value = self.__get_item_value(last, sort_by) if sort_by else None
+        if isinstance(value, date):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            value = str(value)
+
+        code = self.__get_item_value(last, "code")
+        payload = {"sort_by": sort_by, "sort_order": sort_order, "value": value, "code": str(code)}
+        return urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    @staticmethod
+    def __get_item_value(item: Any, name: str) -> Any:
+        """Возвращает значение поля записи листинга: инстанса модели или словаря."""
+        return item[name] if isinstance(item, Mapping) else getattr(item, name)
+
+    @staticmethod
+    def _get_sort_key(sort: Optional[ListingSort]) -> tuple:
+        """Возвращает поле и порядок сортировки в виде строк."""
+        if not sort:
+            return None, SortOrder.ASC.value
+        sort_by = getattr(sort.sort_by, "value", sort.sort_by)
+        return sort_by, SortOrder(sort.sort_order).value
+
+    def __decode_cursor(
+        self,
+        cursor: str,
+        column: Optional[Column],
+        sort: Optional[ListingSort],
+    ) -> tuple:
+        """Разбирает курсор страницы.
+
+        Args:
+            cursor (str): Курсор, полученный через `get_next_cursor`.
+            column (Optional[Column]): Колонка сортировки.
+            sort (Optional[ListingSort]): Данные для сортировки.
+
+        Raises:
+            HTTPException: 400. Курсор поврежден или выдан для другой сортировки.
+
+        Returns:
+            tuple: Значение поля сортировки и код последней записи.
+        """
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            code = UUID(payload["code"])
+            value = payload["value"]
+            sort_key = (payload["sort_by"], payload["sort_order"])
+        # * AttributeError - код в курсоре не является строкой
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+        if sort_key != self._get_sort_key(sort):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor does not match the listing sort",
+            )
+
+        if value is not None and column is not None:
+            python_type = column.type.python_type
+            try:
+                value = date.fromisoformat(value) if python_type is date else python_type(value)
+            except (ValueError, TypeError, ArithmeticError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor",
+                )
+
+        return value, code
+
+    def __create_ordering(self, column: Optional[Column], descending: bool) -> list:
+        """Возвращает сортировку листинга: поле сортировки и код сущности.
+        Пустые значения идут последними при сортировке по возрастанию
+        и первыми при сортировке по убыванию (как в индексах Postgres).
+        """
+        if column is None:
+            return [desc(self.model.code) if descending else asc(self.model.code)]
+        if descending:
+            return [desc(column).nulls_first(), desc(self.model.code)]
+        return [asc(column).nulls_last(), asc(self.model.code)]
+
+    def __create_keyset_condition(
+        self,
+        column: Optional[Column],
+        descending: bool,
+        value: Any,
+        code: UUID,
+    ):
+        """Возвращает условие выборки записей, идущих после записи курсора,
+        в порядке `__create_ordering`.
+        """
+        code_column = self.model.code
+
+        if column is None:
+            return code_column < code if descending else code_column > code
+
+        # * Пустые значения не сравниваются оператором, поэтому обрабатываются отдельно
+        if value is None:
+            if descending:
+                return or_(and_(column.is_(None), code_column < code), column.is_not(None))
+            return and_(column.is_(None), code_column > code)
+
+        if descending:
+            return tuple_(column, code_column) < tuple_(value, code)
+
+        condition = tuple_(column, code_column) > tuple_(value, code)
+        if column.nullable:
+            condition = or_(condition, column.is_(None))
+        return condition
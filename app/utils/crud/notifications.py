@@ -0,0 +1,213 @@
+import asyncio
+import logging
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+import asyncpg
+from configs import configs
+from db import engine
+from sqlalchemy import Connection, Text, bindparam, event, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from .base import BULK_WRITES_KEY, invalidate_all, invalidate_entity, tracked_entities
+
+logger = logging.getLogger(__name__)
+
+# Канал уведомлений об изменении сущностей
+CHANNEL = "bookshelf_entities"
+
+# Идентификатор процесса. Процесс пропускает собственные уведомления:
+# его кэши уже очищены при фиксации транзакции
+PROCESS_ID = uuid4().hex
+
+# Кол-во сущностей в одном уведомлении. Размер уведомления ограничен 8000 байт
+NOTIFY_BATCH_SIZE = 100
+
+
+def encode_notifications(entities: Iterable[Tuple[str, UUID]]) -> List[str]:
+    """Формирует уведомления об изменении сущностей вида
+    `<процесс>|<таблица>:<код>,<таблица>:<код>,...`.
+
+    Args:
+        entities (Iterable[Tuple[str, UUID]]): Пары (таблица, код) измененных сущностей.
+
+    Returns:
+        List[str]: Уведомления, каждое не более NOTIFY_BATCH_SIZE сущностей.
+    """
+    items = [f"{table}:{code}" for table, code in entities]
+    return [
+        f"{PROCESS_ID}|{','.join(items[start:start + NOTIFY_BATCH_SIZE])}"
+        for start in range(0, len(items), NOTIFY_BATCH_SIZE)
+    ]
+
+
+def decode_notification(payload: str) -> Optional[List[Tuple[str, UUID]]]:
+    """Разбирает уведомление об изменении сущностей.
+
+    Args:
+        payload (str): Текст уведомления.
+
+    Returns:
+        Optional[List[Tuple[str, UUID]]]: Пары (таблица, код) или None, если уведомление
+            отправлено текущим процессом.
+    """
+    sender, _, items = payload.partition("|")
+    if sender == PROCESS_ID:
+        return None
+
+    entities = []
+    for item in filter(None, items.split(",")):
+        table, _, code = item.partition(":")
+        entities.append((table, UUID(code)))
+    return entities
+
+
+def publish_changes(connection: Connection, entities: Iterable[Tuple[str, UUID]]) -> None:
+    """Отправляет уведомления об изменении сущностей в транзакции соединения.
+    Postgres доставляет их подписчикам только после фиксации транзакции.
+
+    Args:
+        connection (Connection): Соединение с открытой транзакцией.
+        entities (Iterable[Tuple[str, UUID]]): Пары (таблица, код) измененных сущностей.
+    """
+    if not configs.entity_cache.NOTIFY:
+        return
+    payloads = encode_notifications(entities)
+    if not payloads:
+        return
+
+    # * Все уведомления отправляются одним запросом, независимо от их кол-ва
+    payloads_param = bindparam("payloads", payloads, type_=ARRAY(Text))
+    notifications = func.unnest(payloads_param).table_valued("payload").render_derived()
+    connection.execute(select(func.pg_notify(CHANNEL, notifications.c.payload)).select_from(notifications))
+
+
+@event.listens_for(Session, "after_flush")
+def _publish_flushed_changes(session: Session, flush_context: Any) -> None:
+    """Уведомляет другие процессы о созданных, измененных и удаленных при сбросе сессии сущностях."""
+    entities = {
+        (obj.__tablename__, obj.code)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if getattr(obj, "__tablename__", None) in tracked_entities
+    }
+    if entities:
+        publish_changes(session.connection(), sorted(entities))
+
+
+@event.listens_for(Session, "before_commit")
+def _publish_bulk_changes(session: Session) -> None:
+    """Уведомляет другие процессы о сущностях, записанных массовыми операциями в обход ORM."""
+    entities = session.info.pop(BULK_WRITES_KEY, None)
+    if entities:
+        publish_changes(session.connection(), sorted(entities))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bulk_changes(session: Session) -> None:
+    """Отменяет уведомления: изменения откаченной транзакции не сохранены в БД."""
+    session.info.pop(BULK_WRITES_KEY, None)
+
+
+class EntityChangeListener:
+    """Фоновый подписчик на уведомления об изменении сущностей.
+
+    Слушает канал на отдельном соединении asyncpg (вне пула движка) и сбрасывает
+    закэшированные данные сущностей, измененных другими процессами сервиса.
+    При потере соединения переподключается. Уведомления, отправленные без подписки,
+    теряются, поэтому после каждого подключения кэши сбрасываются целиком.
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[str, UUID], None],
+        on_reset: Callable[[], None],
+        reconnect_interval: float = 5.0,
+        ping_interval: float = 30.0,
+    ):
+        """
+        Args:
+            on_change (Callable[[str, UUID], None]): Обработчик изменения сущности (таблица, код).
+            on_reset (Callable[[], None]): Обработчик сброса всех кэшей.
+            reconnect_interval (float, optional): Пауза перед переподключением в секундах. Defaults to 5.0.
+            ping_interval (float, optional): Интервал проверки соединения в секундах. Defaults to 30.0.
+        """
+        self.on_change = on_change
+        self.on_reset = on_reset
+        self.reconnect_interval = reconnect_interval
+        self.ping_interval = ping_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Запускает подписчика в текущем event loop'е."""
+        if configs.entity_cache.NOTIFY:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает подписчика."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        # * Драйвер указывается только для SQLAlchemy, asyncpg принимает обычный DSN
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except Exception:
+                logger.exception("Entity change listener failed to connect.")
+                await asyncio.sleep(self.reconnect_interval)
+                continue
+
+            try:
+                await self._listen(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Entity change listener lost connection.")
+            finally:
+                await self._close(connection)
+
+            await asyncio.sleep(self.reconnect_interval)
+
+    async def _listen(self, connection: asyncpg.Connection) -> None:
+        """Подписывается на канал и ждет уведомления, пока соединение живо."""
+        closed = asyncio.Event()
+        connection.add_termination_listener(lambda _: closed.set())
+        await connection.add_listener(CHANNEL, self._on_notification)
+        self.on_reset()
+
+        while not closed.is_set():
+            try:
+                await asyncio.wait_for(closed.wait(), self.ping_interval)
+            except asyncio.TimeoutError:
+                # * Обрыв соединения без активности обнаруживается только запросом
+                await connection.execute("SELECT 1")
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            entities = decode_notification(payload)
+        except ValueError:
+            logger.warning("Malformed entity change notification: %s", payload)
+            return
+
+        for table, code in entities or ():
+            self.on_change(table, code)
+
+    @staticmethod
+    async def _close(connection: asyncpg.Connection) -> None:
+        try:
+            await connection.close(timeout=1)
+        except Exception:
+            connection.terminate()
+
+
+entity_change_listener = EntityChangeListener(
+    invalidate_entity,
+    invalidate_all,
+    reconnect_interval=configs.entity_cache.RECONNECT_INTERVAL,
+)
@@ -13,7 +13,9 @@ class PublisherCRUD(WithParameterizedListing[Publisher], WithHTTPExceptions[Publ
       которые возникают при исполнении CRUD операций.
     """
 
-    pass
+    # Удаление издательства каскадно удаляет книги и выдачи
+    affects_reports = True
+    cache_entities = True
 
 
 publisher = PublisherCRUD(Publisher)
@@ -13,7 +13,8 @@ class ReaderCRUD(WithParameterizedListing[Reader], WithHTTPExceptions[Reader]):
       которые возникают при исполнении CRUD операций.
     """
 
-    pass
+    affects_reports = True
+    cache_entities = True
 
 
 reader = ReaderCRUD(Reader)
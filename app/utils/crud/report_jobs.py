@@ -0,0 +1,178 @@
+from datetime import timedelta
+from typing import Optional, Union
+from uuid import UUID
+
+from db.models import ReportJob, ReportJobStatus
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import WithHTTPExceptions
+
+
+class ReportJobCRUD(WithHTTPExceptions[ReportJob]):
+    """Класс, предоставляющий CRUD операции для сущности ReportJob.
+
+    Этот класс наследуется от:
+    - `WithHTTPExceptions[ReportJob]`: Добавляет вызов HTTP-исключений при определенных ситуациях,
+      которые возникают при исполнении CRUD операций.
+
+    Дополнительно предоставляет операции очереди задач: захват задачи
+    обработчиком, сохранение результата и удаление устаревших результатов.
+    """
+
+    async def claim(self, db: AsyncSession, timeout: timedelta) -> Optional[ReportJob]:
+        """Захватывает самую старую ожидающую задачу и переводит ее в работу.
+        Строки, заблокированные другими обработчиками, пропускаются (SKIP LOCKED),
+        поэтому задачи могут разбирать любые реплики сервиса одновременно.
+        Задачи, зависшие в работе дольше timeout, захватываются повторно.
+
+        Каждый захват увеличивает номер попытки задачи. Возвращаемая задача
+        отсоединена от сессии и служит токеном захвата: завершить ее может
+        только обработчик, владеющий текущей попыткой.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            timeout (timedelta): Время, после которого задача в работе считается зависшей.
+
+        Returns:
+            Optional[ReportJob]: Захваченная задача или None, если задач нет.
+        """
+        query = (
+            select(self.model)
+            .where(
+                or_(
+                    self.model.status == ReportJobStatus.PENDING,
+                    and_(
+                        self.model.status == ReportJobStatus.RUNNING,
+                        self.model.started_at < func.now() - timeout,
+                    ),
+                )
+            )
+            .order_by(self.model.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(query)
+        db_obj = result.scalar_one_or_none()
+        if db_obj is None:
+            await db.rollback()
+            return None
+
+        db_obj.status = ReportJobStatus.RUNNING
+        db_obj.started_at = func.now()
+        db_obj.attempt = self.model.attempt + 1
+        db_obj.error = None
+        await db.commit()
+        await db.refresh(db_obj)
+        # * Откат транзакции обработчиком не должен сбрасывать загруженные поля задачи
+        db.expunge(db_obj)
+        return db_obj
+
+    async def complete(self, db: AsyncSession, db_obj: ReportJob, content: bytes) -> Optional[ReportJob]:
+        """Сохраняет готовый файл отчета и завершает задачу.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            db_obj (ReportJob): Задача, полученная из `claim`.
+            content (bytes): Файл отчета.
+
+        Returns:
+            Optional[ReportJob]: Завершенная задача или None, если задача уже захвачена повторно.
+        """
+        return await self._finish(db, db_obj, ReportJobStatus.DONE, content=content)
+
+    async def fail(self, db: AsyncSession, db_obj: ReportJob, error: str) -> Optional[ReportJob]:
+        """Завершает задачу с ошибкой.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            db_obj (ReportJob): Задача, полученная из `claim`.
+            error (str): Описание ошибки.
+
+        Returns:
+            Optional[ReportJob]: Завершенная задача или None, если задача уже захвачена повторно.
+        """
+        return await self._finish(db, db_obj, ReportJobStatus.FAILED, error=error)
+
+    async def release(self, db: AsyncSession, db_obj: ReportJob) -> Optional[ReportJob]:
+        """Возвращает задачу в очередь, не дожидаясь истечения времени работы.
+        Используется при остановке обработчика.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            db_obj (ReportJob): Задача, полученная из `claim`.
+
+        Returns:
+            Optional[ReportJob]: Задача или None, если задача уже захвачена повторно.
+        """
+        return await self._finish(db, db_obj, ReportJobStatus.PENDING, finished_at=None, started_at=None)
+
+    async def purge(self, db: AsyncSession, retention: timedelta) -> int:
+        """Удаляет задачи, завершенные раньше чем retention назад, вместе с файлами отчетов.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            retention (timedelta): Время хранения завершенных задач.
+
+        Returns:
+            int: Кол-во удаленных задач.
+        """
+        query = delete(self.model).where(
+            self.model.status.in_([ReportJobStatus.DONE, ReportJobStatus.FAILED]),
+            self.model.finished_at < func.now() - retention,
+        )
+        result = await db.execute(query)
+        await db.commit()
+        return result.rowcount
+
+    async def get_content(self, db: AsyncSession, code: Union[str, UUID]) -> ReportJob:
+        """Возвращает задачу вместе с файлом отчета.
+        Вызывает HTTP исключение в случае ее отсутствия.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            code (Union[str, UUID]): UUID (код) задачи.
+
+        Returns:
+            ReportJob: Инстанс модели SLQAlchemy с загруженным файлом.
+        """
+        db_obj = await self.get(db, code)
+        await db.refresh(db_obj, attribute_names=["content"])
+        return db_obj
+
+    async def _finish(
+        self,
+        db: AsyncSession,
+        db_obj: ReportJob,
+        status: ReportJobStatus,
+        **fields,
+    ) -> ReportJob:
+        """Переводит задачу в состояние status, сохраняя переданные поля.
+        Изменение применяется, только если задача все еще в работе по той же попытке:
+        задачу, захваченную повторно после таймаута, завершает новый обработчик.
+        """
+        values = {"finished_at": func.now(), **fields}
+        query = (
+            update(self.model)
+            .where(
+                self.model.code == db_obj.code,
+                self.model.status == ReportJobStatus.RUNNING,
+                self.model.attempt == db_obj.attempt,
+            )
+            .values(status=status, **values)
+            .returning(self.model.finished_at)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(query)
+        row = result.one_or_none()
+        await db.commit()
+        if row is None:
+            return None
+
+        db_obj.status = status
+        for field, value in {**values, "finished_at": row.finished_at}.items():
+            setattr(db_obj, field, value)
+        return db_obj
+
+
+report_job = ReportJobCRUD(ReportJob)
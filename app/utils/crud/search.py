@@ -0,0 +1,121 @@
+import re
+from datetime import date
+from decimal import Decimal
+from typing import Any, Optional, Union
+
+from fastapi import HTTPException, status
+from sqlalchemy import Column, Select, String, and_, or_
+
+from ..filters import FilterExpression, FilterGroup, parse_filter
+from ..query_params import ListingSearch, coerce_search_value
+
+
+class WithListingSearch:
+    """Класс предоставляет условия поиска и составного фильтра листинга.
+    Подмешивается к CRUD классу, модель берется из `self.model`.
+    """
+
+    def _apply_search(self, query: Select, search: Optional[ListingSearch] = None) -> Select:
+        """Применяет к запросу условия поиска листинга.
+
+        Args:
+            query (Select): Запрос листинга.
+            search (Optional[ListingSearch], optional): Данные для поиска. Defaults to None.
+
+        Returns:
+            Select: Запрос с условиями поиска.
+        """
+        # Если задан поиск по полю
+        if search and search.search_by:
+            column = getattr(self.model, search.search_by)
+            opreator = search.search_mode.get_operator()
+            condition = self.__create_condition(
+                column=column,
+                operator=opreator,
+                search_value=search.search_value,
+            )
+            query = query.where(condition)
+
+        # Если задан составной фильтр
+        if search and search.filter:
+            expression = parse_filter(search.filter, search.get_search_fields())
+            query = query.where(self.__compile_filter(expression))
+
+        return query
+
+    def __compile_filter(self, expression: FilterExpression):
+        """Собирает из дерева фильтра одно SQL условие.
+        Каждое условие проходит те же проверки типов, что и одиночный поиск.
+        """
+        if isinstance(expression, FilterGroup):
+            conditions = [self.__compile_filter(item) for item in expression.items]
+            return and_(*conditions) if expression.operator == "AND" else or_(*conditions)
+
+        column = self.model.__table__.columns.get(expression.field)
+        if column is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot filter by '{expression.field}'",
+            )
+        column = getattr(self.model, expression.field)
+
+        if expression.operator == "IN":
+            return column.in_([self.__coerce_value(column, value) for value in expression.values])
+
+        if expression.operator == "BETWEEN":
+            # * Диапазон проверяется как пара условий >= и <=
+            for value in expression.values:
+                self.__create_condition(column=column, operator=">=", search_value=value)
+            return column.between(*(self.__coerce_value(column, value) for value in expression.values))
+
+        return self.__create_condition(
+            column=column,
+            operator=expression.operator,
+            search_value=expression.values[0],
+        )
+
+    @staticmethod
+    def __coerce_value(column: Column, value: Union[str, int, float, date]) -> Any:
+        """Приводит значение условия к типу колонки.
+
+        Raises:
+            HTTPException: 400. Значение не соответствует типу поля.
+        """
+        try:
+            return coerce_search_value(value, column.type.python_type)
+        except ValueError as error:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid value for '{column.key}': {error}",
+            )
+
+    def __create_condition(
+        self, column: Column, operator: str, search_value: Union[str, int, float, date]
+    ):
+        if operator == "ILIKE":
+            if not isinstance(column.type, String):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cannot use this search mode on non-string field",
+                )
+            # * Шаблон собирается целиком и сравнивается с самой колонкой (без lower()),
+            # * чтобы условие обслуживалось триграммным индексом. Символы шаблона экранируются
+            pattern = re.sub(r"([\\%_])", r"\\\1", str(search_value))
+            return column.ilike(f"%{pattern}%", escape="\\")
+
+        elif operator != "=" and isinstance(column.type, String):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot use this search mode on non-numeric field",
+            )
+
+        if search_value is not None:
+            search_value = self.__coerce_value(column, search_value)
+
+        if operator in ("<", ">", "<=", ">=") and not isinstance(search_value, (int, float, Decimal, date)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot use this search mode with non-numeric or non-date search value",
+            )
+
+        return column.op(operator)(search_value)
@@ -0,0 +1,52 @@
+from typing import Optional, Sequence
+
+from db import use_custom_plans
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..query_params import ListingPagination, ListingSearch, ListingSort
+
+
+class WithListingVersion:
+    """Класс предоставляет версию страницы листинга для условных запросов.
+    Подмешивается к CRUD классу: страница выбирается запросом `self._get_version_query`
+    с поиском, сортировкой и пагинацией `self._apply_listing` (см. `WithKeysetPagination`).
+    """
+
+    async def get_listing_version(
+        self,
+        db: AsyncSession,
+        search: Optional[ListingSearch] = None,
+        sort: Optional[ListingSort] = None,
+        pagination: Optional[ListingPagination] = None,
+        include: Sequence[str] = (),
+    ) -> str:
+        """Возвращает версию страницы листинга без загрузки данных записей.
+
+        Страница выбирается тем же запросом, что и листинг, но БД возвращает
+        только хэш пар (код, версия) записей страницы. Хэш меняется при изменении,
+        появлении или исчезновении любой записи страницы.
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД.
+            search (Optional[ListingSearch], optional): Данные для поиска. Defaults to None.
+            sort (Optional[ListingSort], optional): Данные для сортировки. Defaults to None.
+            pagination (Optional[ListingPagination], optional): Данные для пагинации. Defaults to None.
+            include (Sequence[str], optional): Встраиваемые связанные сущности. Defaults to ().
+
+        Raises:
+            HTTPException: 400. Связь отсутствует у модели.
+            HTTPException: 400. Курсор поврежден или передан вместе со смещением.
+
+        Returns:
+            str: Хэш версий записей страницы.
+        """
+        page = self._apply_listing(self._get_version_query(include), search, sort, pagination).subquery()
+        versions = func.string_agg(
+            func.concat(page.c.code, ":", page.c.version),
+            aggregate_order_by(literal_column("','"), page.c.code),
+        )
+        await use_custom_plans(db)
+        result = await db.execute(select(func.coalesce(func.md5(versions), "")))
+        return result.scalar_one()
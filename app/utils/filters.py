@@ -0,0 +1,183 @@
+import re
+from typing import Iterator, List, Optional, Set, Tuple, Union
+
+from fastapi import HTTPException, status
+
+from .query_params import SearchMode
+
+# Максимальное кол-во условий и вложенность выражения фильтра
+MAX_FILTER_PREDICATES = 20
+MAX_FILTER_DEPTH = 4
+
+# Лексемы выражения: скобки, запятая, строка в одинарных кавычках ('' - экранированная кавычка), слово
+_TOKEN_RE = re.compile(r"\s*(?:(?P<punct>[(),])|'(?P<string>(?:[^']|'')*)'|(?P<word>[^(),'\s][^(),']*))")
+
+# Операторы диапазона и множества в дополнение к режимам поиска
+RANGE_OPERATORS = {"between": "BETWEEN", "in": "IN"}
+
+
+class FilterPredicate:
+    """Условие фильтра: поле, оператор и значения."""
+
+    def __init__(self, field: str, operator: str, values: List[str]):
+        self.field = field
+        self.operator = operator
+        self.values = values
+
+
+class FilterGroup:
+    """Группа условий фильтра, объединенных через AND или OR."""
+
+    def __init__(self, operator: str, items: List[Union["FilterGroup", FilterPredicate]]):
+        self.operator = operator
+        self.items = items
+
+
+FilterExpression = Union[FilterGroup, FilterPredicate]
+
+
+def parse_filter(expression: str, fields: Optional[Set[str]] = None) -> FilterExpression:
+    """Разбирает выражение фильтра листинга.
+
+    Грамматика:
+        выражение := группа | условие
+        группа    := and(выражение, ...) | or(выражение, ...)
+        условие   := поле.режим.значение
+                   | поле.between.(от, до)
+                   | поле.in.(значение, ...)
+
+    Режим - один из режимов поиска (`SearchMode`). Значения, содержащие
+    запятые, скобки или пробелы по краям, заключаются в одинарные кавычки.
+    Значения остаются строками: к типу поля они приводятся при сборке запроса.
+
+    Пример: `and(author_code.equal.<uuid>,publishing_year.greater_than_or_equal.2000,price.less_than.500)`
+
+    Args:
+        expression (str): Выражение фильтра.
+        fields (Optional[Set[str]], optional): Допустимые поля. Defaults to None (любые).
+
+    Raises:
+        HTTPException: 400. Синтаксическая ошибка или недопустимое поле/режим.
+
+    Returns:
+        FilterExpression: Дерево выражения фильтра.
+    """
+    parser = _FilterParser(expression, fields)
+    node = parser.parse_expression(depth=1)
+    if parser.peek() is not None:
+        parser.fail("unexpected trailing input")
+    return node
+
+
+class _FilterParser:
+    """Рекурсивный разбор выражения фильтра."""
+
+    def __init__(self, expression: str, fields: Optional[Set[str]]):
+        self.tokens = list(self._tokenize(expression))
+        self.position = 0
+        self.fields = fields
+        self.predicates = 0
+
+    def parse_expression(self, depth: int) -> FilterExpression:
+        if depth > MAX_FILTER_DEPTH:
+            self.fail(f"nesting is deeper than {MAX_FILTER_DEPTH}")
+
+        kind, value = self.next()
+        if kind != "word":
+            self.fail("expected a group or a predicate")
+
+        # Группа условий
+        if value.lower() in ("and", "or") and self.peek() == ("punct", "("):
+            self.next()
+            items = [self.parse_expression(depth + 1)]
+            while self.peek() == ("punct", ","):
+                self.next()
+                items.append(self.parse_expression(depth + 1))
+            self.expect(")")
+            return FilterGroup(value.upper(), items)
+
+        return self.parse_predicate(value)
+
+    def parse_predicate(self, word: str) -> FilterPredicate:
+        self.predicates += 1
+        if self.predicates > MAX_FILTER_PREDICATES:
+            self.fail(f"more than {MAX_FILTER_PREDICATES} predicates")
+
+        parts = word.split(".", 2)
+        if len(parts) != 3:
+            self.fail(f"expected field.mode.value, got '{word}'")
+        field, mode, raw_value = parts
+
+        if self.fields is not None and field not in self.fields:
+            self.fail(f"cannot filter by '{field}'")
+
+        if mode in RANGE_OPERATORS:
+            operator = RANGE_OPERATORS[mode]
+            if raw_value or self.peek() != ("punct", "("):
+                self.fail(f"'{mode}' expects a list of values in parentheses")
+            self.next()
+            values = [self.parse_value()]
+            while self.peek() == ("punct", ","):
+                self.next()
+                values.append(self.parse_value())
+            self.expect(")")
+
+            if operator == "BETWEEN" and len(values) != 2:
+                self.fail("'between' expects exactly two values")
+            return FilterPredicate(field, operator, values)
+
+        try:
+            operator = SearchMode(mode).get_operator()
+        except ValueError:
+            self.fail(f"unknown mode '{mode}'")
+
+        # * Значение в кавычках идет отдельной лексемой
+        if not raw_value and self.peek() is not None and self.peek()[0] == "string":
+            return FilterPredicate(field, operator, [self.next()[1]])
+        return FilterPredicate(field, operator, [raw_value.strip()])
+
+    def parse_value(self) -> str:
+        kind, value = self.next()
+        if kind == "string":
+            return value
+        if kind != "word":
+            self.fail("expected a value")
+        return value.strip()
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def next(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            self.fail("unexpected end of expression")
+        self.position += 1
+        return token
+
+    def expect(self, punct: str) -> None:
+        if self.next() != ("punct", punct):
+            self.fail(f"expected '{punct}'")
+
+    def fail(self, reason: str):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid filter: {reason}",
+        )
+
+    def _tokenize(self, expression: str) -> Iterator[Tuple[str, str]]:
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = _TOKEN_RE.match(expression, position)
+            if match is None or match.end() == position:
+                self.fail(f"unexpected character at position {position}")
+            position = match.end()
+
+            if match.group("punct") is not None:
+                yield "punct", match.group("punct")
+            elif match.group("string") is not None:
+                yield "string", match.group("string").replace("''", "'")
+            else:
+                yield "word", match.group("word").rstrip()
@@ -0,0 +1,144 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+
+
+def set_listing_headers(
+    request: Request,
+    response: Response,
+    next_cursor: Optional[str] = None,
+    total: Optional[int] = None,
+) -> None:
+    """Устанавливает заголовки пагинации ответа листинга.
+
+    - `X-Next-Cursor`: курсор следующей страницы.
+    - `X-Total-Count`: общее кол-во записей листинга (точное или оценочное).
+    - `Link`: ссылки на первую и следующую страницы (RFC 8288).
+
+    Args:
+        request (Request): Запрос листинга.
+        response (Response): Ответ листинга.
+        next_cursor (Optional[str], optional): Курсор следующей страницы. Defaults to None.
+        total (Optional[int], optional): Общее кол-во записей. Defaults to None.
+    """
+    first_url = request.url.remove_query_params(["cursor", "skip"])
+    links = [f'<{first_url}>; rel="first"']
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        links.append(f'<{first_url.include_query_params(cursor=next_cursor)}>; rel="next"')
+
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+    response.headers["Link"] = ", ".join(links)
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    last_modified: Optional[datetime],
+    *version: Any,
+) -> Optional[Response]:
+    """Устанавливает валидаторы ответа и проверяет условные заголовки запроса.
+
+    - `ETag`: сильный тег, вычисляемый из версии представления.
+    - `Last-Modified`: время последнего изменения (с точностью до секунды).
+    - `Cache-Control: no-cache`: клиент хранит ответ, но перепроверяет его при каждом запросе.
+
+    `If-None-Match` имеет приоритет над `If-Modified-Since` (RFC 9110).
+
+    Args:
+        request (Request): Запрос.
+        response (Response): Ответ. Заголовки-валидаторы устанавливаются в нем.
+        last_modified (Optional[datetime]): Время последнего изменения представления.
+        *version (Any): Дополнительные данные версии представления, например хэш страницы листинга.
+
+    Returns:
+        Optional[Response]: Ответ 304, если у клиента актуальное представление, иначе None.
+    """
+    # * Версия неизвестна (например, запись отсутствует) - ответ не кэшируется
+    if last_modified is None and not version:
+        return None
+
+    parts = [last_modified.isoformat() if last_modified else "", *map(str, version)]
+    etag = f'"{blake2b("|".join(parts).encode(), digest_size=16).hexdigest()}"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        # * Для GET теги сравниваются слабым сравнением: префикс W/ не учитывается
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        not_modified = "*" in tags or etag in tags
+    else:
+        # * Last-Modified передается с точностью до секунды
+        since = parse_http_date(request.headers.get("If-Modified-Since"))
+        not_modified = bool(since and last_modified and last_modified.replace(microsecond=0) <= since)
+
+    if not not_modified:
+        return None
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dependency_headers(response))
+
+
+def listing_conditional_response(
+    request: Request,
+    response: Response,
+    digest: str,
+    total: Optional[int] = None,
+) -> Optional[Response]:
+    """Устанавливает валидатор ответа листинга и проверяет `If-None-Match`.
+
+    Листинг проверяется только по `ETag` из хэша версий записей страницы:
+    время последнего изменения страницы может не сдвинуться, когда страница меняется
+    (запись удалена или на страницу сдвинулась более старая запись), поэтому
+    `Last-Modified` не отдается, а `If-Modified-Since` не учитывается.
+    Общее кол-во записей входит в тег: ответ 304 не обновляет `X-Total-Count` у клиента.
+
+    Args:
+        request (Request): Запрос листинга.
+        response (Response): Ответ листинга. Заголовки-валидаторы устанавливаются в нем.
+        digest (str): Хэш версий записей страницы (см. `get_listing_version`).
+        total (Optional[int], optional): Общее кол-во записей листинга. Defaults to None.
+
+    Returns:
+        Optional[Response]: Ответ 304, если у клиента актуальная страница, иначе None.
+    """
+    return conditional_response(request, response, None, digest, total)
+
+
+def dependency_headers(response: Response) -> Dict[str, str]:
+    """Возвращает заголовки, установленные на ответе зависимости (параметр `response: Response`).
+    FastAPI применяет их только к ответу, который он формирует сам, поэтому обработчик,
+    возвращающий собственный Response, переносит их через эту функцию.
+
+    Args:
+        response (Response): Ответ зависимости.
+
+    Returns:
+        Dict[str, str]: Заголовки для возвращаемого ответа.
+    """
+    return dict(response.headers)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    """Разбирает дату HTTP заголовка. Некорректная дата игнорируется.
+
+    Args:
+        value (Optional[str]): Значение заголовка.
+
+    Returns:
+        Optional[datetime]: Дата в UTC или None.
+    """
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
@@ -1,22 +1,72 @@
 from datetime import date, datetime
 from enum import Enum
-from typing import Annotated, Generic, Optional, TypeVar, Union
+from typing import Annotated, Any, Generic, List, Optional, Sequence, Set, Type, TypeVar, Union
 
-from fastapi import Query
+from fastapi import HTTPException, Query, status
 from pydantic import BaseModel, field_validator
 
 
+class CountMode(str, Enum):
+    """Перечисление режимов подсчета общего кол-ва записей листинга."""
+
+    NONE = "none"
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+
+
+class ExportFormat(str, Enum):
+    """Перечисление форматов выгрузки записей."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 class ListingPagination(BaseModel):
     """Предоставляет группу query-параметров для пагинации в листинге."""
 
     skip: Annotated[int, Query(0, ge=0, example=0, description="Skipping entries")]
     limit: Annotated[int, Query(50, le=200, example=50, description="Total entries")]
+    cursor: Annotated[
+        Optional[str],
+        Query(None, description="Opaque cursor of the next page (X-Next-Cursor header)"),
+    ]
+    count: Annotated[
+        CountMode,
+        Query(CountMode.NONE, description="Total count mode (X-Total-Count header)"),
+    ]
 
 
 # SearchFields
 _SF = TypeVar("_SF", bound=Union[str, Enum])
 
 
+def coerce_search_value(value: Any, python_type: type) -> Any:
+    """Приводит значение поиска к типу поля. Значение разбирается из своего
+    строкового представления, поэтому число не приводится к полю другого
+    числового типа с потерей точности (2000.5 для целочисленного поля).
+
+    Args:
+        value (Any): Значение поиска.
+        python_type (type): Тип значений поля (`column.type.python_type`).
+
+    Raises:
+        ValueError: Значение не соответствует типу поля.
+
+    Returns:
+        Any: Приведенное значение.
+    """
+    text = value if isinstance(value, str) else str(value)
+    if python_type is str:
+        return text
+
+    try:
+        if python_type in (date, datetime):
+            return python_type.fromisoformat(text)
+        return python_type(text)
+    except (ValueError, TypeError, ArithmeticError) as error:
+        raise ValueError(f"expected {python_type.__name__}, got '{text}'") from error
+
+
 class SearchMode(str, Enum):
     """Перечисление доступных режимов поиска."""
 
@@ -47,6 +97,15 @@ class ListingSearch(BaseModel, Generic[_SF]):
     search_value: Annotated[
         Optional[Union[str, int, float, date]], Query(None, description="Search value")
     ]
+    filter: Annotated[
+        Optional[str],
+        Query(
+            None,
+            description="Compound filter expression: and(...), or(...), field.mode.value, "
+            "field.between.(from,to), field.in.(value,...)",
+            example="and(publishing_year.greater_than_or_equal.2000,price.less_than.500)",
+        ),
+    ]
 
     @field_validator("search_value")
     def cast_search_value(cls, v):
@@ -65,6 +124,16 @@ class ListingSearch(BaseModel, Generic[_SF]):
 
         return v
 
+    @classmethod
+    def get_search_fields(cls) -> Optional[Set[str]]:
+        """Возвращает поля, по которым разрешен поиск (значения перечисления `_SF`).
+        Если листинг параметризован не перечислением - ограничений нет.
+        """
+        args = cls.__pydantic_generic_metadata__["args"]
+        if args and isinstance(args[0], type) and issubclass(args[0], Enum):
+            return {field.value for field in args[0]}
+        return None
+
 
 # OrderingFeilds
 _OF = TypeVar("_OF", bound=Union[str, Enum])
@@ -84,6 +153,109 @@ class ListingSort(BaseModel, Generic[_OF]):
     sort_order: Annotated[SortOrder, Query(SortOrder.ASC, description="Sorting order")]
 
 
+# ResponseSchema
+_RS = TypeVar("_RS", bound=BaseModel)
+
+
+class ListingFields(BaseModel, Generic[_RS]):
+    """Предоставляет query-параметр для выбора полей, возвращаемых в листинге.
+    Допустимые поля - поля схемы ответа `_RS`. Код сущности возвращается всегда.
+    """
+
+    fields: Annotated[
+        Optional[str],
+        Query(None, description="Comma-separated response fields", example="code,title"),
+    ]
+
+    @classmethod
+    def get_schema(cls) -> Type[BaseModel]:
+        """Возвращает схему ответа, которой параметризован листинг."""
+        return cls.__pydantic_generic_metadata__["args"][0]
+
+    def get_fields(self) -> Optional[List[str]]:
+        """Возвращает запрошенные поля в порядке их объявления в схеме ответа.
+
+        Raises:
+            HTTPException: 400. Запрошено поле, отсутствующее в схеме ответа.
+
+        Returns:
+            Optional[List[str]]: Список полей или None, если запрошены все поля.
+        """
+        if not self.fields:
+            return None
+
+        schema_fields = self.get_schema().model_fields
+        requested = {field.strip() for field in self.fields.split(",") if field.strip()}
+
+        unknown = requested - schema_fields.keys()
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+
+        requested.add("code")
+        return [field for field in schema_fields if field in requested]
+
+
+# IncludeFields
+_IF = TypeVar("_IF", bound=Union[str, Enum])
+
+
+class RelatedInclude(BaseModel, Generic[_IF]):
+    """Предоставляет query-параметр для встраивания связанных сущностей в ответ.
+    Допустимые связи - значения перечисления `_IF`.
+    """
+
+    include: Annotated[
+        Optional[str],
+        Query(None, description="Comma-separated related entities", example="author,publisher"),
+    ]
+
+    @classmethod
+    def get_include_fields(cls) -> Set[str]:
+        """Возвращает связи, которые разрешено встраивать (значения перечисления `_IF`)."""
+        return {field.value for field in cls.__pydantic_generic_metadata__["args"][0]}
+
+    def get_relations(self) -> List[str]:
+        """Возвращает запрошенные связи в порядке их перечисления в параметре.
+
+        Raises:
+            HTTPException: 400. Запрошена связь, которую нельзя встроить.
+
+        Returns:
+            List[str]: Список связей.
+        """
+        if not self.include:
+            return []
+
+        relations = list(dict.fromkeys(name.strip() for name in self.include.split(",") if name.strip()))
+
+        unknown = [name for name in relations if name not in self.get_include_fields()]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown relations: {', '.join(unknown)}",
+            )
+        return relations
+
+    def get_response_fields(
+        self,
+        schema: Type[BaseModel],
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """Возвращает поля ответа: выбранные (или все) поля схемы и встраиваемые связи.
+
+        Args:
+            schema (Type[BaseModel]): Схема ответа без связанных сущностей.
+            fields (Optional[Sequence[str]], optional): Выбранные поля схемы. Defaults to None.
+
+        Returns:
+            List[str]: Поля ответа.
+        """
+        return [*(fields or schema.model_fields), *self.get_relations()]
+
+
 class DateSearch(BaseModel):
     """Предоставляет группу query-параметров для поиска по дате в роуте."""
 
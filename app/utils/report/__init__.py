@@ -1,3 +1,17 @@
-from .report import ExpiredIssuancesReport
+from .executor import ReportExecutor, ReportSlot, report_executor
+from .formats import ReportFormat, iter_csv, iter_ndjson
+from .jobs import ReportJobWorker, report_job_worker
+from .report import ExpiredIssuancesReport, render_report
 
-__all__ = ("ExpiredIssuancesReport",)
+__all__ = (
+    "ExpiredIssuancesReport",
+    "ReportExecutor",
+    "ReportFormat",
+    "ReportJobWorker",
+    "ReportSlot",
+    "iter_csv",
+    "iter_ndjson",
+    "render_report",
+    "report_executor",
+    "report_job_worker",
+)
@@ -1,17 +1,23 @@
-from typing import Any, Dict, List
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from openpyxl.cell import Cell
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
 
+from .compat import WriteOnlyWorksheet, stream_merged_cells
 from .styles import CellStyle
 
 
 class ReportBuilder:
     """Класс-билдер xslx отчета. Предоставляет методы для взаимодействия с листом ws."""
 
-    def __init__(self, worksheet: Worksheet):
+    def __init__(self, worksheet: Worksheet, title: str = "Отчет по срокам возврата"):
         self.ws = worksheet
-        self.ws.title = "Отчет по срокам возврата"
+        self.ws.title = title
         self.current_row = 1
+        self._style_arrays: Dict[str, StyleArray] = {}
 
     def add_row(self, data: List[Any], style: CellStyle = None) -> None:
         """Добавляет строку в текущий лист, повышая индекс текущей строки.
@@ -22,7 +28,7 @@ class ReportBuilder:
         """
         self.ws.append(data)
         if style:
-            self._apply_style_to_row(self.current_row, style)
+            self._apply_style_to_row(self.current_row, len(data), style)
         self.current_row += 1
 
     def merge_cells(self, start_col: int, end_col: int) -> None:
@@ -56,12 +62,111 @@ class ReportBuilder:
         for col, width in config.items():
             self.ws.column_dimensions[col].width = width
 
-    def _apply_style_to_row(self, row: int, style: CellStyle) -> None:
-        """Применяет стили ко всей строке.
+    def close(self) -> None:
+        """Завершает работу с листом. Лист в памяти не требует завершения."""
+        pass
+
+    def _apply_style_to_row(self, row: int, columns: int, style: CellStyle) -> None:
+        """Применяет стили к заполненным ячейкам строки.
+        Границы объединенных ячеек достраиваются листом при объединении.
 
         Args:
             row (int): Номер строки.
+            columns (int): Кол-во заполненных колонок.
             style (CellStyle): Стили строки.
         """
-        for col in range(1, self.ws.max_column + 1):
+        self._get_style_array(style)
+        for col in range(1, columns + 1):
             style.apply(self.ws.cell(row=row, column=col))
+
+    def _get_style_array(self, style: CellStyle) -> StyleArray:
+        """Возвращает набор индексов стилей книги для указанного стиля.
+        Стиль регистрируется в книге один раз, после чего переиспользуется.
+
+        Args:
+            style (CellStyle): Стили ячеек.
+
+        Returns:
+            StyleArray: Набор индексов стилей.
+        """
+        style_array = self._style_arrays.get(style.name)
+        if style_array is None:
+            style_array = self._style_arrays[style.name] = style.register(self.ws.parent)
+        return style_array
+
+
+class StreamingReportBuilder(ReportBuilder):
+    """Класс-билдер xslx отчета для write-only листа.
+
+    Строки не хранятся в памяти: каждая строка собирается из заранее
+    стилизованных ячеек и сразу сбрасывается во временный файл листа.
+    Последняя добавленная строка удерживается до добавления следующей,
+    чтобы методы секций (объединение ячеек, высота строки) могли
+    применяться к ней так же, как в обычном билдере.
+
+    Ширина колонок должна быть задана до добавления первой строки.
+    """
+
+    def __init__(self, worksheet: WriteOnlyWorksheet, title: str = "Отчет по срокам возврата"):
+        super().__init__(worksheet, title)
+        self._pending: Optional[List[Any]] = None
+        self._pending_style: Optional[StyleArray] = None
+        self._pending_height: Optional[int] = None
+        # Объединенные ячейки хранятся компактно: номера строк по каждому диапазону колонок
+        self._merged: Dict[Tuple[int, int], array] = {}
+
+    def add_row(self, data: List[Any], style: CellStyle = None) -> None:
+        self._flush()
+
+        if style:
+            self._pending_style = self._get_style_array(style)
+            data = [Cell(self.ws, 1, 1, value, self._pending_style) for value in data]
+
+        self._pending = data
+        self.current_row += 1
+
+    def merge_cells(self, start_col: int, end_col: int) -> None:
+        rows = self._merged.setdefault((start_col, end_col), array("I"))
+        rows.append(self.current_row - 1)
+
+        # * Лист в write-only режиме не достраивает границы объединения,
+        # * поэтому стилизованная строка дополняется пустыми ячейками до конца диапазона
+        if self._pending_style is not None and len(self._pending) < end_col:
+            self._pending.extend(
+                Cell(self.ws, 1, 1, None, self._pending_style) for _ in range(end_col - len(self._pending))
+            )
+
+    def set_row_height(self, height: int) -> None:
+        self._pending_height = height
+
+    def close(self) -> None:
+        """Сбрасывает последнюю строку и подготавливает лист к сохранению."""
+        self._flush()
+
+        # * Объединения записываются при сохранении из компактного хранилища
+        count = sum(len(rows) for rows in self._merged.values())
+        stream_merged_cells(self.ws, count, self._iter_merged())
+
+    def _flush(self) -> None:
+        """Записывает удерживаемую строку в лист."""
+        if self._pending is None:
+            return
+
+        row = self.current_row - 1
+        if self._pending_height:
+            self.ws.row_dimensions[row].height = self._pending_height
+
+        self.ws.append(self._pending)
+
+        # * Размеры строки уже записаны вместе с ней
+        self.ws.row_dimensions.pop(row, None)
+        self._pending = None
+        self._pending_style = None
+        self._pending_height = None
+
+    def _iter_merged(self) -> Iterator[str]:
+        """Возвращает диапазоны объединенных ячеек листа."""
+        for (start_col, end_col), rows in self._merged.items():
+            start, end = get_column_letter(start_col), get_column_letter(end_col)
+            for row in rows:
+                yield f"{start}{row}:{end}{row}"
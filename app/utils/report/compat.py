@@ -0,0 +1,53 @@
+from typing import Iterable
+
+from openpyxl import Workbook
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+from openpyxl.worksheet.merge import MergeCell
+
+# ! Модуль собирает все обращения к закрытому API openpyxl, на которые опирается
+# ! построение отчета. Они проверены на версии OPENPYXL_VERSION, закрепленной в pyproject.toml.
+# ! При обновлении openpyxl функции модуля сверяются с новой версией (см. tests/test_report_builder.py)
+OPENPYXL_VERSION = "3.1.5"
+
+
+def register_style_array(wb: Workbook, name: str) -> StyleArray:
+    """Заводит в таблице стилей книги набор индексов именованного стиля.
+    Ячейки, созданные с этим набором, не изменяют общие таблицы стилей при записи.
+
+    Args:
+        wb (Workbook): Книга отчета.
+        name (str): Название зарегистрированного именованного стиля.
+
+    Returns:
+        StyleArray: Набор индексов стилей книги.
+    """
+    style_array = wb._named_styles[name].as_tuple()
+    wb._cell_styles.add(style_array)
+    return style_array
+
+
+def stream_merged_cells(ws: WriteOnlyWorksheet, count: int, ranges: Iterable[str]) -> None:
+    """Подменяет запись объединенных ячеек write-only листа потоковой записью диапазонов.
+    Стандартный writer собирает все объединения в один список объектов.
+    Диапазоны читаются при сохранении книги.
+
+    Args:
+        ws (WriteOnlyWorksheet): Лист, все строки которого уже добавлены.
+        count (int): Кол-во диапазонов.
+        ranges (Iterable[str]): Диапазоны вида "A1:E1".
+    """
+    ws._get_writer()
+    writer = ws._writer
+
+    def write_merged_cells() -> None:
+        if not count:
+            return
+
+        xf = writer.xf.send(True)
+        with xf.element("mergeCells", count=str(count)):
+            for ref in ranges:
+                xf.write(MergeCell(ref).to_tree())
+        writer.xf.send(None)
+
+    writer.write_merged_cells = write_merged_cells
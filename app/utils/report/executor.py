@@ -0,0 +1,159 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+from functools import partial
+from io import BytesIO
+from multiprocessing import get_context
+from tempfile import NamedTemporaryFile
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from configs import configs
+
+from .report import render_report
+from .stream import CHUNK_SIZE, iter_file
+
+
+class ReportSlot:
+    """Место в очереди пула рендеринга, занятое отчетом.
+    Освобождается один раз, сколько бы раз ни вызывался `release`.
+    """
+
+    def __init__(self, executor: "ReportExecutor"):
+        self._executor = executor
+        self._released = False
+
+    def release(self) -> None:
+        """Освобождает место в очереди пула."""
+        if not self._released:
+            self._released = True
+            self._executor.pending -= 1
+
+
+class ReportExecutor:
+    """Пул рендеринга отчетов.
+
+    Построение и сохранение отчета выполняется вне event loop'а в пуле потоков
+    или процессов. В пул передаются только дата отчета и строки-кортежи.
+    Кол-во отчетов, одновременно находящихся в работе и в очереди,
+    ограничено размером пула и глубиной очереди.
+    """
+
+    def __init__(self, kind: str = "thread", pool_size: int = 2, queue_depth: int = 4):
+        self.kind = kind
+        self.pool_size = pool_size
+        self.capacity = pool_size + queue_depth
+        self.pending = 0
+        self._pool: Optional[Executor] = None
+
+    @property
+    def saturated(self) -> bool:
+        """Заполнена ли очередь пула."""
+        return self.pending >= self.capacity
+
+    def reserve(self) -> Optional[ReportSlot]:
+        """Занимает место в очереди пула при приеме запроса, до начала построения отчета.
+
+        Returns:
+            Optional[ReportSlot]: Занятое место или None, если очередь пула заполнена.
+        """
+        if self.saturated:
+            return None
+        return self._acquire()
+
+    def stream(self, report_date: date, rows: List[Tuple[Any, ...]], slot: ReportSlot) -> AsyncIterator[bytes]:
+        """Строит отчет в пуле и отдает xlsx файл чанками.
+        Место в очереди освобождается по окончании или прерывании потока.
+
+        Args:
+            report_date (date): Дата отчета.
+            rows (List[Tuple[Any, ...]]): Строки с данными по удержаным книгам.
+            slot (ReportSlot): Место в очереди, занятое через `reserve`.
+
+        Returns:
+            AsyncIterator[bytes]: Асинхронный итератор чанков Excel-файла.
+        """
+        if self.kind == "process":
+            return self._stream_from_process(report_date, rows, slot)
+        return self._stream_from_thread(report_date, rows, slot)
+
+    async def render(self, report_date: date, rows: List[Tuple[Any, ...]]) -> bytes:
+        """Строит отчет в пуле и возвращает xlsx файл целиком.
+
+        Args:
+            report_date (date): Дата отчета.
+            rows (List[Tuple[Any, ...]]): Строки с данными по удержаным книгам.
+
+        Returns:
+            bytes: Excel-файл.
+        """
+        loop = asyncio.get_running_loop()
+        slot = self._acquire()
+        try:
+            return await loop.run_in_executor(self._get_pool(), _render_bytes, report_date, rows)
+        finally:
+            slot.release()
+
+    def shutdown(self) -> None:
+        """Останавливает пул, освобождает ресурсы."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _acquire(self) -> ReportSlot:
+        """Занимает место в очереди пула без проверки ее заполненности."""
+        self.pending += 1
+        return ReportSlot(self)
+
+    async def _stream_from_thread(self, report_date, rows, slot: ReportSlot) -> AsyncIterator[bytes]:
+        # * Файл отдается по мере записи через ограниченную очередь чанков
+        try:
+            save = partial(render_report, report_date, rows)
+            async for chunk in iter_file(save, executor=self._get_pool()):
+                yield chunk
+        finally:
+            slot.release()
+
+    async def _stream_from_process(self, report_date, rows, slot: ReportSlot) -> AsyncIterator[bytes]:
+        # * Процесс пишет отчет во временный файл, который затем отдается чанками
+        loop = asyncio.get_running_loop()
+        try:
+            with NamedTemporaryFile(suffix=".xlsx") as tmp:
+                try:
+                    await loop.run_in_executor(self._get_pool(), render_report, report_date, rows, tmp.name)
+                finally:
+                    slot.release()
+
+                # * Файл читается в пуле потоков по умолчанию, чтение с диска не блокирует event loop
+                while chunk := await loop.run_in_executor(None, tmp.read, CHUNK_SIZE):
+                    yield chunk
+        finally:
+            slot.release()
+
+    def _get_pool(self) -> Executor:
+        """Лениво создает пул при первом обращении."""
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.pool_size,
+                    mp_context=get_context("spawn"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.pool_size,
+                    thread_name_prefix="report",
+                )
+        return self._pool
+
+
+def _render_bytes(report_date: date, rows: List[Tuple[Any, ...]]) -> bytes:
+    """Строит отчет и возвращает его в виде байтов. Выполняется в пуле."""
+    file = BytesIO()
+    render_report(report_date, rows, file)
+    return file.getvalue()
+
+
+report_executor = ReportExecutor(
+    kind=configs.reports.POOL_KIND,
+    pool_size=configs.reports.POOL_SIZE,
+    queue_depth=configs.reports.QUEUE_DEPTH,
+)
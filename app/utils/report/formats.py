@@ -0,0 +1,100 @@
+import csv
+import json
+from enum import Enum
+from io import StringIO
+from typing import Any, AsyncIterator, Sequence
+
+from .sections import TableHeaderSection
+
+# Кол-во строк, собираемых в один чанк потока
+ROWS_PER_CHUNK = 500
+
+
+class ReportFormat(str, Enum):
+    """Перечисление доступных форматов отчета."""
+
+    XLSX = "xlsx"
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+    @property
+    def media_type(self) -> str:
+        """Возвращает MIME тип формата."""
+        return {
+            ReportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            ReportFormat.CSV: "text/csv; charset=utf-8",
+            ReportFormat.NDJSON: "application/x-ndjson",
+        }[self]
+
+
+# Колонки плоского отчета: читатель, колонки таблицы отчета и итоги
+CSV_HEADERS = [
+    "Читатель",
+    *TableHeaderSection.HEADERS,
+    "Итого книг у читателя",
+    "Итого по библиотеке",
+]
+
+NDJSON_FIELDS = (
+    "reader",
+    "phone",
+    "author",
+    "title",
+    "price",
+    "issuanced_at",
+    "reader_total",
+    "library_total",
+)
+
+
+async def iter_csv(rows: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    """Построчно преобразует строки отчета в CSV.
+
+    Args:
+        rows (AsyncIterator[Sequence[Any]]): Строки отчета в формате
+            `IssuanceCRUD.get_expired_report_query`.
+
+    Yields:
+        bytes: Очередной чанк CSV файла.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADERS)
+
+    count = 0
+    async for row in rows:
+        writer.writerow(row[1:])
+        count += 1
+        if count % ROWS_PER_CHUNK == 0:
+            yield _drain(buffer)
+
+    yield _drain(buffer)
+
+
+async def iter_ndjson(rows: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    """Построчно преобразует строки отчета в NDJSON (один JSON обьект на строку).
+
+    Args:
+        rows (AsyncIterator[Sequence[Any]]): Строки отчета в формате
+            `IssuanceCRUD.get_expired_report_query`.
+
+    Yields:
+        bytes: Очередной чанк NDJSON файла.
+    """
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps(dict(zip(NDJSON_FIELDS, row[1:])), ensure_ascii=False))
+        if len(lines) == ROWS_PER_CHUNK:
+            yield ("\n".join(lines) + "\n").encode()
+            lines.clear()
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def _drain(buffer: StringIO) -> bytes:
+    """Забирает накопленное содержимое буфера."""
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import List
+
+from configs import configs
+from db import LocalAsyncSession
+
+from ..crud import issuance, report_job
+from .executor import report_executor
+
+logger = logging.getLogger(__name__)
+
+# Минимальный интервал между удалениями устаревших задач в секундах
+CLEANUP_INTERVAL = 60.0
+
+
+class ReportJobWorker:
+    """Фоновый обработчик задач построения отчетов.
+
+    Обработчики забирают задачи из таблицы report_jobs, строят отчет в пуле
+    рендеринга и сохраняют готовый файл в БД. Таблица служит общей очередью,
+    поэтому задачи могут выполняться на любой реплике сервиса.
+    В простое обработчики удаляют задачи, завершенные раньше чем retention назад.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        poll_interval: float = 5.0,
+        timeout: int = 600,
+        retention: int = 7 * 24 * 60 * 60,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.timeout = timedelta(seconds=timeout)
+        self.retention = timedelta(seconds=retention)
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._cleaned_at = float("-inf")
+
+    def start(self) -> None:
+        """Запускает обработчики в текущем event loop'е."""
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Останавливает обработчики."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self) -> None:
+        """Будит ожидающие обработчики, не дожидаясь очередного опроса очереди."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self._process_next()
+            except Exception:
+                logger.exception("Report job processing failed.")
+                processed = False
+
+            # * Если очередь пуста - удаляем устаревшие задачи и ждем новую задачу или следующий опрос
+            if not processed:
+                try:
+                    await self._cleanup()
+                except Exception:
+                    logger.exception("Report job cleanup failed.")
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def _process_next(self) -> bool:
+        """Обрабатывает одну задачу из очереди.
+
+        Returns:
+            bool: Была ли найдена задача.
+        """
+        async with LocalAsyncSession() as db:
+            job = await report_job.claim(db, self.timeout)
+        if job is None:
+            return False
+
+        try:
+            # * Данные читаются в отдельной короткой сессии: транзакция чтения не должна
+            # * держать соединение пула и снимок БД, пока отчет строится в пуле рендеринга
+            async with LocalAsyncSession() as db:
+                rows = await issuance.get_expired_report_rows(db, job.report_date)
+            content = await report_executor.render(job.report_date, rows)
+
+        except asyncio.CancelledError:
+            # ! Соединение прерванной сессии может быть в неопределенном состоянии,
+            # ! поэтому задача возвращается в очередь через новую сессию
+            async with LocalAsyncSession() as db:
+                await report_job.release(db, job)
+            raise
+
+        except Exception as error:
+            async with LocalAsyncSession() as db:
+                finished = await report_job.fail(db, job, repr(error))
+
+        else:
+            async with LocalAsyncSession() as db:
+                finished = await report_job.complete(db, job, content)
+
+        if finished is None:
+            logger.warning(
+                "Report job %s was claimed again, attempt %s result discarded.", job.code, job.attempt
+            )
+        return True
+
+    async def _cleanup(self) -> None:
+        """Удаляет устаревшие завершенные задачи не чаще раза в CLEANUP_INTERVAL секунд."""
+        loop = asyncio.get_running_loop()
+        if loop.time() - self._cleaned_at < CLEANUP_INTERVAL:
+            return
+
+        self._cleaned_at = loop.time()
+        async with LocalAsyncSession() as db:
+            await report_job.purge(db, self.retention)
+
+
+report_job_worker = ReportJobWorker(
+    workers=configs.reports.JOB_WORKERS,
+    poll_interval=configs.reports.JOB_POLL_INTERVAL,
+    timeout=configs.reports.JOB_TIMEOUT,
+    retention=configs.reports.JOB_RETENTION,
+)
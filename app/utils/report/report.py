@@ -1,14 +1,39 @@
+from concurrent.futures import Executor
 from datetime import date
 from io import BytesIO
-from typing import Any, Dict, List
+from itertools import chain, groupby
+from operator import itemgetter
+from typing import IO, Any, AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Union
 
+from configs import configs
 from openpyxl import Workbook
-from .builder import ReportBuilder
+from .builder import ReportBuilder, StreamingReportBuilder
+from .stream import iter_file
 from .sections import Section, TitleSection, ReaderSection, TableHeaderSection, LibraryTotalSection
+from .styles import REPORT_STYLES
+
+
+# Максимальное кол-во строк на листе xlsx
+EXCEL_MAX_ROWS = 1_048_576
+
+# Кол-во строк, которые занимают секции на листе
+SHEET_HEADER_ROWS = 2  # Заголовок отчета и заголовок таблицы
+READER_EXTRA_ROWS = 2  # Строка читателя и итого по читателю
+LIBRARY_TOTAL_ROWS = 1  # Итого по библиотеке
 
 
 class ExpiredIssuancesReport:
-    """Класс, создающий отчет по удержаным книгам у читателей и по всей бибилотеке."""
+    """Класс, создающий отчет по удержаным книгам у читателей и по всей бибилотеке.
+
+    Если отчет не помещается на один лист, читатели распределяются по нескольким
+    листам (секция читателя не разрывается между листами), а итог по библиотеке
+    выносится на отдельный лист.
+    """
+
+    # Название основного листа
+    TITLE = "Отчет по срокам возврата"
+    # Название листа с итогами, если отчет занимает несколько листов
+    SUMMARY_TITLE = "Итого по библиотеке"
 
     # Ширина колонок
     COLUMN_CONFIG = {
@@ -19,43 +44,118 @@ class ExpiredIssuancesReport:
         "E": 20,  # Дата
     }
 
-    def __init__(self, report_date: date):
+    def __init__(self, report_date: date, write_only: bool = False, sheet_max_rows: int = EXCEL_MAX_ROWS):
+        """
+        Args:
+            report_date (date): Дата отчета.
+            write_only (bool, optional): Строить отчет в write-only режиме. Строки сразу
+                сбрасываются во временный файл, и потребление памяти не зависит от размера
+                отчета. Defaults to False.
+            sheet_max_rows (int, optional): Максимальное кол-во строк на одном листе.
+                Не может превышать ограничение формата xlsx. Defaults to EXCEL_MAX_ROWS.
+        """
         self.report_date = report_date
-        self.wb = Workbook()
-        self.builder = ReportBuilder(self.wb.active)
-        self.sections: List[Section] = []
+        self.write_only = write_only
+        self.sheet_max_rows = min(sheet_max_rows, EXCEL_MAX_ROWS)
+        self.wb = Workbook(write_only=write_only)
+        # Листы создаются по мере необходимости, лист книги по умолчанию не используется
+        if not write_only:
+            self.wb.remove(self.wb.active)
+
+        # * Стили регистрируются заранее: листы не изменяют общие таблицы стилей книги
+        # * и могут строиться независимо друг от друга
+        for style in REPORT_STYLES:
+            style.register(self.wb)
+
+        self.builder = self.create_builder(self.TITLE)
+
+    def create_builder(self, title: str) -> ReportBuilder:
+        """Создает новый лист отчета и билдер для него.
+
+        Args:
+            title (str): Название листа.
+
+        Returns:
+            ReportBuilder: Билдер листа.
+        """
+        builder_class = StreamingReportBuilder if self.write_only else ReportBuilder
+        builder = builder_class(self.wb.create_sheet(title), title)
+
+        # В write-only режиме ширина колонок задается до первой строки
+        builder.set_columns_width(self.COLUMN_CONFIG)
+        return builder
+
+    def render_sections(self, builder: ReportBuilder, sections: Iterable[Section]) -> None:
+        """Размещает секции на листе билдера поочередно и завершает лист.
+
+        Args:
+            builder (ReportBuilder): Билдер листа.
+            sections (Iterable[Section]): Секции листа.
+        """
+        for section in sections:
+            section.render(builder)
+        builder.close()
 
-    def add_section(self, section: Section):
-        """Добавляет секцию к очереди на рендер.
+    def sheet_sections(self, rows: Iterable[Sequence[Any]]) -> Iterator[Section]:
+        """Создает секции листа с таблицей читателей.
 
         Args:
-            section (Section): Секция листа.
+            rows (Iterable[Sequence[Any]]): Строки с данными по удержаным книгам читателей листа.
+
+        Yields:
+            Section: Очередная секция листа.
         """
-        self.sections.append(section)
+        yield TitleSection(self.report_date)
+        yield TableHeaderSection(self.COLUMN_CONFIG)
+
+        for _, reader_rows in groupby(rows, key=itemgetter(0)):
+            reader_rows = list(reader_rows)
+            _, reader_name, *_, reader_total, _ = reader_rows[0]
+            books = [row[2:7] for row in reader_rows]
+            yield ReaderSection(reader_name, books, reader_total)
+
+    def construct_report(self, rows: Sequence[Sequence[Any]], executor: Optional[Executor] = None) -> None:
+        """Формирует отчет из предаггрегированных данных по удержаным книгам.
 
-    def render_sections(self) -> None:
-        """Начинает размещение всех секций на лист ws поочередно."""
-        for section in self.sections:
-            section.render(self.builder)
+        Строки должны быть упорядочены по читателю и иметь вид:
+        (код читателя, ФИО, телефон, автор, название книги, цена в тыс. руб.,
+        дата выдачи, итого книг у читателя, итого по библиотеке).
 
-    def construct_report(self, data: Dict[str, Dict[str, List[List[Any]]]]) -> None:
-        """Формирует отчет из данных по удержаным книгам.
+        Листы отчета не зависят друг от друга. В write-only режиме их можно
+        строить параллельно, передав пул исполнителей.
 
         Args:
-            data (Dict[str, Dict[str, List[List[Any]]]]): Аггрегированые данные по удержаным книгам.
+            rows (Sequence[Sequence[Any]]): Строки с данными по удержаным книгам.
+            executor (Optional[Executor], optional): Пул, в котором строятся листы. Defaults to None.
+
+        Raises:
+            ValueError: Параллельное построение листов в памяти не поддерживается.
         """
-        self.add_section(TitleSection(self.report_date))
-        self.add_section(TableHeaderSection(self.COLUMN_CONFIG))
+        if executor is not None and not self.write_only:
+            raise ValueError("Parallel sheet rendering requires write-only mode")
+
+        library_total = rows[0][-1] if rows else 0
+        partitions = partition_rows(rows, self.sheet_max_rows - LIBRARY_TOTAL_ROWS)
+
+        # * Отчет помещается на один лист: итог по библиотеке размещается под таблицей
+        if len(partitions) == 1:
+            sections = chain(self.sheet_sections(partitions[0]), [LibraryTotalSection(library_total)])
+            self.render_sections(self.builder, sections)
+            return
 
-        library_total = 0
-        for reader_data in data.values():
-            print(reader_data)
-            library_total += len(reader_data["books"])
-            self.add_section(ReaderSection(reader_data["name"], reader_data["books"]))
+        builders = [self.builder]
+        builders += [self.create_builder(f"{self.TITLE} {index}") for index in range(2, len(partitions) + 1)]
+        sheets = [self.sheet_sections(partition) for partition in partitions]
 
-        self.add_section(LibraryTotalSection(library_total))
+        if executor is None:
+            for builder, sections in zip(builders, sheets):
+                self.render_sections(builder, sections)
+        else:
+            # * Ошибки построения листов пробрасываются при получении результатов
+            list(executor.map(self.render_sections, builders, sheets))
 
-        self.render_sections()
+        summary = self.create_builder(self.SUMMARY_TITLE)
+        self.render_sections(summary, [TitleSection(self.report_date), LibraryTotalSection(library_total)])
 
     def get_filestream(self) -> BytesIO:
         """Возвращает поток данных Excel-файла.
@@ -67,3 +167,64 @@ class ExpiredIssuancesReport:
         self.wb.save(file_stream)
         file_stream.seek(0)
         return file_stream
+
+    def stream_file(self) -> AsyncIterator[bytes]:
+        """Возвращает асинхронный поток данных Excel-файла.
+        Файл сохраняется в рабочем потоке и отдается чанками по мере записи,
+        не собираясь целиком в памяти.
+
+        Returns:
+            AsyncIterator[bytes]: Асинхронный итератор чанков Excel-файла.
+        """
+        return iter_file(self.wb.save)
+
+
+def render_report(report_date: date, rows: List[Sequence[Any]], file: Union[str, IO[bytes]]) -> None:
+    """Строит отчет по удержаным книгам и сохраняет его в файл.
+    Выполняется в пуле рендеринга отчетов, поэтому принимает только простые данные.
+
+    Args:
+        report_date (date): Дата отчета.
+        rows (List[Sequence[Any]]): Строки с данными по удержаным книгам.
+        file (Union[str, IO[bytes]]): Путь к файлу или поток для записи.
+    """
+    report = ExpiredIssuancesReport(
+        report_date,
+        write_only=True,
+        sheet_max_rows=configs.reports.SHEET_MAX_ROWS,
+    )
+    report.construct_report(rows)
+    report.wb.save(file)
+
+
+def partition_rows(rows: Sequence[Sequence[Any]], max_rows: int) -> List[Sequence[Any]]:
+    """Разбивает строки отчета на части, каждая из которых помещается на один лист.
+    Строки одного читателя всегда попадают в одну часть. Если читатель сам по себе
+    не помещается в ограничение, он занимает отдельный лист.
+
+    Args:
+        rows (Sequence[Sequence[Any]]): Строки с данными по удержаным книгам, упорядоченные по читателю.
+        max_rows (int): Максимальное кол-во строк на листе.
+
+    Returns:
+        List[Sequence[Any]]: Части строк отчета по листам.
+    """
+    partitions = []
+    start = position = 0
+    sheet_rows = SHEET_HEADER_ROWS
+
+    for _, reader_rows in groupby(rows, key=itemgetter(0)):
+        books = sum(1 for _ in reader_rows)
+        section_rows = books + READER_EXTRA_ROWS
+
+        # * Читатель не помещается на текущий лист - начинаем новый
+        if position > start and sheet_rows + section_rows > max_rows:
+            partitions.append(rows[start:position])
+            start = position
+            sheet_rows = SHEET_HEADER_ROWS
+
+        sheet_rows += section_rows
+        position += books
+
+    partitions.append(rows[start:])
+    return partitions
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import date
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from .builder import ReportBuilder
 from .styles import TITLE_STYLE, TOTAL_STYLE, HEADER_STYLE, BOOK_STYLE, READER_STYLE
@@ -57,9 +57,10 @@ class ReaderSection(Section):
     по удержаным книгам и суммарное кол-во книг.
     """
 
-    def __init__(self, reader_name: str, books: List[List[Any]]):
+    def __init__(self, reader_name: str, books: List[List[Any]], total: Optional[int] = None):
         self.reader_name = reader_name
         self.books = books
+        self.total = len(books) if total is None else total
 
     def render(self, builder: ReportBuilder):
         # Заголовок читателя
@@ -71,7 +72,7 @@ class ReaderSection(Section):
             builder.add_row(book, BOOK_STYLE)
 
         # Итого по читателю
-        builder.add_row(["Итого книг у читателя:", len(self.books), "", "", ""], TOTAL_STYLE)
+        builder.add_row(["Итого книг у читателя:", self.total, "", "", ""], TOTAL_STYLE)
         builder.merge_cells(2, 5)
         builder.set_row_height(20)
 
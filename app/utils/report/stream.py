@@ -0,0 +1,115 @@
+import asyncio
+from typing import IO, AsyncIterator, Callable, Optional
+
+# Размер одного чанка потока
+CHUNK_SIZE = 64 * 1024
+
+# Кол-во чанков, которые могут ожидать отправки
+MAX_PENDING_CHUNKS = 8
+
+
+class SaveCancelled(Exception):
+    """Исключение прерывания сохранения книги. Возникает, когда поток больше не читают."""
+
+    pass
+
+
+class ChunkWriter:
+    """Файлоподобный обьект, передающий записанные байты в asyncio очередь чанками.
+
+    Используется из рабочего потока: запись блокируется, пока в очереди
+    нет места, поэтому в памяти одновременно находится ограниченное кол-во чанков.
+    Не поддерживает seek и tell, поэтому zip-контейнер пишется последовательно.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.loop = loop
+        self.queue = queue
+        self.chunk_size = chunk_size
+        self.cancelled = False
+        self._interrupted = False
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """Отправляет остаток буфера и признак окончания потока."""
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        self._put(None)
+
+    def fail(self, error: BaseException) -> None:
+        """Передает ошибку сохранения читающей стороне."""
+        if not self.cancelled:
+            self._put(error)
+
+    def _put(self, item) -> None:
+        if self.cancelled:
+            # * Прерываем сохранение один раз, дальнейшие записи (например,
+            # * при закрытии zip-архива) просто отбрасываются
+            if not self._interrupted:
+                self._interrupted = True
+                raise SaveCancelled()
+            return
+        asyncio.run_coroutine_threadsafe(self.queue.put(item), self.loop).result()
+
+
+async def iter_file(
+    save: Callable[[IO[bytes]], None],
+    chunk_size: int = CHUNK_SIZE,
+    executor=None,
+) -> AsyncIterator[bytes]:
+    """Выполняет запись файла в рабочем потоке и отдает файл чанками по мере записи.
+
+    Args:
+        save (Callable[[IO[bytes]], None]): Функция, записывающая файл в переданный поток.
+        chunk_size (int, optional): Размер чанка в байтах. Defaults to CHUNK_SIZE.
+        executor (optional): Пул потоков, в котором выполняется запись. Defaults to None.
+
+    Yields:
+        bytes: Очередной чанк файла.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(maxsize=MAX_PENDING_CHUNKS)
+    writer = ChunkWriter(loop, queue, chunk_size)
+
+    def run() -> None:
+        try:
+            save(writer)
+            writer.close()
+        except SaveCancelled:
+            pass
+        except BaseException as error:
+            writer.fail(error)
+
+    future = loop.run_in_executor(executor, run)
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield chunk
+
+    finally:
+        # * Если поток перестали читать - освобождаем рабочий поток
+        writer.cancelled = True
+        while not future.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait([future], timeout=0.01)
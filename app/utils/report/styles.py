@@ -1,30 +1,58 @@
-from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl import Workbook
 from openpyxl.cell import Cell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.styles.cell_style import StyleArray
+
+from .compat import register_style_array
 
 
 class CellStyle:
-    """Класс стилей секций."""
+    """Класс стилей секций.
+
+    Стиль регистрируется в книге как именованный (NamedStyle) один раз,
+    после чего ячейки ссылаются на него по имени.
+    """
 
-    def __init__(self, font: Font = None, alignment: Alignment = None, border: Border = None):
+    def __init__(self, name: str, font: Font = None, alignment: Alignment = None, border: Border = None):
+        self.name = name
         self.font = font
         self.alignment = alignment
         self.border = border
 
+    def register(self, wb: Workbook) -> StyleArray:
+        """Регистрирует стиль в книге, если он еще не зарегистрирован.
+
+        Args:
+            wb (Workbook): Книга отчета.
+
+        Returns:
+            StyleArray: Набор индексов стилей книги, на который ссылаются ячейки.
+        """
+        if self.name not in wb.named_styles:
+            # ! NamedStyle привязывается к книге, поэтому для каждой книги создается свой обьект
+            named_style = NamedStyle(name=self.name)
+            if self.font:
+                named_style.font = self.font
+            if self.alignment:
+                named_style.alignment = self.alignment
+            if self.border:
+                named_style.border = self.border
+            wb.add_named_style(named_style)
+
+        # * Набор индексов заводится в книге сразу, чтобы запись ячеек не изменяла общие таблицы стилей
+        return register_style_array(wb, self.name)
+
     def apply(self, cell: Cell):
-        """Применяет стили к указаной ячейке.
+        """Применяет стили к указаной ячейке. Стиль должен быть зарегистрирован в книге.
 
         Args:
             cell (Cell): Конкретная ячейка.
         """
-        if self.font:
-            cell.font = self.font
-        if self.alignment:
-            cell.alignment = self.alignment
-        if self.border:
-            cell.border = self.border
+        cell.style = self.name
 
 
 TITLE_STYLE = CellStyle(
+    name="report_title",
     font=Font(bold=True, size=14),
     alignment=Alignment(
         horizontal="left",
@@ -34,6 +62,7 @@ TITLE_STYLE = CellStyle(
 )
 
 HEADER_STYLE = CellStyle(
+    name="report_header",
     font=Font(bold=True),
     alignment=Alignment(horizontal="center"),
     border=Border(
@@ -45,6 +74,7 @@ HEADER_STYLE = CellStyle(
 )
 
 READER_STYLE = CellStyle(
+    name="report_reader",
     font=Font(bold=True),
     alignment=Alignment(
         horizontal="left",
@@ -59,6 +89,7 @@ READER_STYLE = CellStyle(
 )
 
 BOOK_STYLE = CellStyle(
+    name="report_book",
     alignment=Alignment(
         horizontal="center",
         vertical="center",
@@ -72,6 +103,7 @@ BOOK_STYLE = CellStyle(
 )
 
 TOTAL_STYLE = CellStyle(
+    name="report_total",
     font=Font(bold=True),
     border=Border(
         left=Side(style="thin"),
@@ -84,3 +116,6 @@ TOTAL_STYLE = CellStyle(
         vertical="top",
     ),
 )
+
+# Все стили отчета. Регистрируются в книге до построения листов
+REPORT_STYLES = (TITLE_STYLE, HEADER_STYLE, READER_STYLE, BOOK_STYLE, TOTAL_STYLE)
@@ -0,0 +1,283 @@
+import asyncio
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Optional, Sequence, Tuple, Type
+
+from db import export_session
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .headers import dependency_headers, listing_conditional_response, set_listing_headers
+from .query_params import (
+    ExportFormat,
+    ListingFields,
+    ListingPagination,
+    ListingSearch,
+    ListingSort,
+    RelatedInclude,
+)
+
+if TYPE_CHECKING:
+    from .crud.base import WithParameterizedListing
+
+# MIME тип выгрузки: один JSON обьект на строку
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# MIME тип выгрузки в CSV
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+
+# Кол-во записей, забираемых из курсора БД и отправляемых одним чанком выгрузки
+EXPORT_BATCH_SIZE = 1000
+
+# Кол-во блоков CSV, ожидающих отправки клиенту. При заполнении очереди
+# чтение из БД приостанавливается до отправки накопленных данных
+EXPORT_QUEUE_SIZE = 16
+
+
+@lru_cache(maxsize=128)
+def get_partial_schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Создает схему, содержащую только указанные поля исходной схемы.
+    Ограничения и типы полей сохраняются. Схемы кэшируются по набору полей.
+
+    Args:
+        schema (Type[BaseModel]): Исходная схема ответа.
+        fields (Tuple[str, ...]): Поля новой схемы.
+
+    Returns:
+        Type[BaseModel]: Схема с выбранными полями.
+    """
+    definitions = {name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    return create_model(
+        f"Partial{schema.__name__}",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=128)
+def get_listing_adapter(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> TypeAdapter:
+    """Возвращает адаптер списка записей листинга. Построение валидатора и
+    сериализатора выполняется один раз на схему и набор полей.
+
+    Args:
+        schema (Type[BaseModel]): Схема ответа листинга.
+        fields (Optional[Tuple[str, ...]], optional): Возвращаемые поля. Defaults to None.
+
+    Returns:
+        TypeAdapter: Адаптер списка записей.
+    """
+    item_schema = get_partial_schema(schema, fields) if fields else schema
+    return TypeAdapter(List[item_schema])
+
+
+@lru_cache(maxsize=128)
+def get_item_adapter(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> TypeAdapter:
+    """Возвращает адаптер одной записи. Построение валидатора и сериализатора
+    выполняется один раз на схему и набор полей.
+
+    Args:
+        schema (Type[BaseModel]): Схема записи.
+        fields (Optional[Tuple[str, ...]], optional): Возвращаемые поля. Defaults to None.
+
+    Returns:
+        TypeAdapter: Адаптер записи.
+    """
+    return TypeAdapter(get_partial_schema(schema, fields) if fields else schema)
+
+
+def listing_response(
+    schema: Type[BaseModel],
+    rows: Sequence[Any],
+    response: Response,
+    fields: Optional[Sequence[str]] = None,
+) -> Response:
+    """Формирует JSON ответ листинга.
+
+    Записи валидируются один раз и сериализуются в JSON средствами pydantic-core,
+    минуя повторную валидацию и кодирование ответа FastAPI.
+
+    Args:
+        schema (Type[BaseModel]): Схема ответа листинга.
+        rows (Sequence[Any]): Записи листинга: словари или инстансы моделей.
+        response (Response): Ответ листинга. Установленные в нем заголовки переносятся.
+        fields (Optional[Sequence[str]], optional): Возвращаемые поля. Defaults to None.
+
+    Returns:
+        Response: Ответ со списком записей.
+    """
+    adapter = get_listing_adapter(schema, tuple(fields) if fields else None)
+    content = adapter.dump_json(adapter.validate_python(rows))
+    return Response(content, media_type="application/json", headers=dependency_headers(response))
+
+
+async def parameterized_listing_response(
+    crud: "WithParameterizedListing",
+    db: AsyncSession,
+    request: Request,
+    response: Response,
+    schema: Type[BaseModel],
+    search: ListingSearch,
+    sort: ListingSort,
+    pagination: ListingPagination,
+    fields: ListingFields,
+    include: Optional[RelatedInclude] = None,
+) -> Response:
+    """Формирует ответ листинга с поиском, сортировкой, пагинацией, выбором полей
+    и встраиванием связанных сущностей.
+
+    Курсор следующей страницы и общее кол-во записей передаются в заголовках.
+    Если у клиента актуальная страница (`If-None-Match`), возвращается ответ 304.
+
+    Args:
+        crud (WithParameterizedListing): CRUD сущности.
+        db (AsyncSession): Асинхронная сессия БД.
+        request (Request): Запрос листинга.
+        response (Response): Ответ зависимости. Установленные в нем заголовки переносятся.
+        schema (Type[BaseModel]): Схема ответа листинга (со связанными сущностями, если они встраиваются).
+        search (ListingSearch): Данные для поиска.
+        sort (ListingSort): Данные для сортировки.
+        pagination (ListingPagination): Данные для пагинации.
+        fields (ListingFields): Выбор возвращаемых полей.
+        include (Optional[RelatedInclude], optional): Встраиваемые связанные сущности. Defaults to None.
+
+    Raises:
+        HTTPException: 400. Некорректные параметры листинга.
+
+    Returns:
+        Response: Ответ со списком записей или ответ 304.
+    """
+    selected_fields = fields.get_fields()
+    relations = include.get_relations() if include else []
+
+    # * Общее кол-во входит в версию листинга: ответ 304 не должен сочетать
+    # * сохраненную клиентом страницу с устаревшим итогом
+    total = await crud.count(db, search, pagination.count)
+
+    # * Версия страницы проверяется до загрузки записей: актуальному клиенту тело не формируется
+    digest = await crud.get_listing_version(db, search, sort, pagination, relations)
+    if not_modified := listing_conditional_response(request, response, digest, total):
+        return not_modified
+
+    # * Связанные сущности подгружаются к инстансам моделей, без них листинг строится без ORM
+    if relations:
+        result = await crud.get_all(db, search, sort, pagination, relations)
+    else:
+        result = await crud.get_rows(db, search, sort, pagination, selected_fields)
+
+    # * Данные пагинации передаются в заголовках, тело ответа остается списком
+    next_cursor = crud.get_next_cursor(result, sort, pagination)
+    set_listing_headers(request, response, next_cursor, total)
+
+    # * Поля связей, которые не встраиваются, в ответ не попадают
+    if include is not None:
+        selected_fields = include.get_response_fields(fields.get_schema(), selected_fields)
+    return listing_response(schema, result, response, selected_fields)
+
+
+def item_response(
+    schema: Type[BaseModel],
+    obj: Any,
+    response: Response,
+    fields: Optional[Sequence[str]] = None,
+) -> Response:
+    """Формирует JSON ответ с одной записью.
+
+    Args:
+        schema (Type[BaseModel]): Схема ответа.
+        obj (Any): Запись: словарь или инстанс модели.
+        response (Response): Ответ зависимости. Установленные в нем заголовки переносятся.
+        fields (Optional[Sequence[str]], optional): Возвращаемые поля. Defaults to None.
+
+    Returns:
+        Response: Ответ с записью.
+    """
+    item_schema = get_partial_schema(schema, tuple(fields)) if fields else schema
+    content = item_schema.model_validate(obj).model_dump_json()
+    return Response(content, media_type="application/json", headers=dependency_headers(response))
+
+
+def export_response(
+    crud: "WithParameterizedListing",
+    query: Select,
+    schema: Type[BaseModel],
+    filename: str,
+    fields: Optional[Sequence[str]] = None,
+    export_format: ExportFormat = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    """Формирует потоковый ответ с выгрузкой всех записей запроса.
+
+    Данные отправляются по мере чтения из БД, поэтому потребление памяти
+    не зависит от размера выгрузки.
+
+    Args:
+        crud (WithParameterizedListing): CRUD сущности.
+        query (Select): Запрос выгрузки, полученный через `get_rows_query`.
+        schema (Type[BaseModel]): Схема записи.
+        filename (str): Имя файла выгрузки без расширения.
+        fields (Optional[Sequence[str]], optional): Возвращаемые поля. Defaults to None.
+        export_format (ExportFormat, optional): Формат выгрузки. Defaults to ExportFormat.NDJSON.
+
+    Returns:
+        StreamingResponse: Потоковый ответ с выгрузкой.
+    """
+    if export_format == ExportFormat.CSV:
+        return StreamingResponse(
+            _stream_csv(crud, query, fields),
+            media_type=CSV_MEDIA_TYPE,
+            headers={"Content-Disposition": f"attachment; filename={filename}.csv"},
+        )
+
+    adapter = get_item_adapter(schema, tuple(fields) if fields else None)
+
+    async def stream() -> AsyncIterator[bytes]:
+        async with export_session() as db:
+            async for rows in crud.stream_rows(db, query, EXPORT_BATCH_SIZE):
+                yield b"".join(adapter.dump_json(adapter.validate_python(row)) + b"\n" for row in rows)
+
+    return StreamingResponse(
+        stream(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}.ndjson"},
+    )
+
+
+async def _stream_csv(
+    crud: "WithParameterizedListing",
+    query: Select,
+    fields: Optional[Sequence[str]] = None,
+) -> AsyncIterator[bytes]:
+    """Передает клиенту блоки CSV, формируемые командой COPY, без разбора на записи."""
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=EXPORT_QUEUE_SIZE)
+
+    async def output(chunk: bytearray) -> None:
+        # * Драйвер передает блок в изменяемом буфере: в очередь кладется его копия
+        await chunks.put(bytes(chunk))
+
+    async def copy() -> None:
+        try:
+            async with export_session() as db:
+                await crud.copy_rows(db, query, output, fields)
+        except BaseException:
+            # * Признак конца выгрузки не должен ждать места в очереди: при ошибке
+            # * ответ все равно прерывается, поэтому неотправленные блоки отбрасываются
+            while not chunks.empty():
+                chunks.get_nowait()
+            chunks.put_nowait(None)
+            raise
+        await chunks.put(None)
+
+    task = asyncio.create_task(copy())
+    try:
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+        # Ошибка выгрузки прерывает ответ
+        await task
+    finally:
+        # * Клиент отключился до конца выгрузки: COPY отменяется
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
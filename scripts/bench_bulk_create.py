@@ -0,0 +1,87 @@
+import sys
+import os
+
+# Разрешение имотра
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+
+from bench_common import cleanup, request, seed
+from db import engine
+
+from time import perf_counter, process_time
+import asyncio
+import json
+
+# Кол-во создаваемых книг в каждом замере
+NUM_BOOKS = 2_000
+
+# Кол-во книг в одном запросе массового создания
+BULK_SIZE = 10_000
+
+# Заголовки запросов создания
+JSON_HEADERS = ((b"content-type", b"application/json"),)
+
+
+def make_books(codes: dict, prefix: str) -> list:
+    """Формирует данные для создания книг."""
+    return [
+        {
+            "author_code": str(codes["author"]),
+            "publisher_code": str(codes["publisher"]),
+            "title": f"{prefix} {i}",
+            "publishing_year": 1900 + i % 120,
+            "price": i % 1000,
+            "amount": 1,
+        }
+        for i in range(NUM_BOOKS)
+    ]
+
+
+async def create_one_by_one(books: list) -> int:
+    """Создает книги по одной: POST /api/books на каждую."""
+    for data in books:
+        await request("/api/books", method="POST", headers=JSON_HEADERS, body=json.dumps(data).encode())
+    return len(books)
+
+
+async def create_bulk(books: list) -> int:
+    """Создает книги массово: POST /api/books/bulk по BULK_SIZE книг."""
+    created = 0
+    for start in range(0, len(books), BULK_SIZE):
+        data = books[start : start + BULK_SIZE]
+        _, body = await request(
+            "/api/books/bulk", method="POST", headers=JSON_HEADERS, body=json.dumps(data).encode()
+        )
+        result = json.loads(body)
+        if result["errors"]:
+            raise RuntimeError(f"Unexpected errors: {result['errors'][:3]}")
+        created += len(result["items"])
+    return created
+
+
+async def main():
+    codes = await seed()
+    try:
+        # Прогрев: пул соединений, кэши схем и подготовленных выражений
+        await create_one_by_one(make_books(codes, "Прогрев")[:10])
+        await create_bulk(make_books(codes, "Прогрев bulk")[:10])
+
+        cases = {
+            "one by one": (create_one_by_one, "Книга"),
+            "bulk": (create_bulk, "Книга bulk"),
+        }
+        # * Процессорное время - работа приложения без ожидания БД
+        print(f"{'Способ':>10} | {'Книг':>6} | {'Время':>7} | {'Книг/с':>8} | {'CPU':>6}")
+        for name, (create, prefix) in cases.items():
+            books = make_books(codes, prefix)
+            started, cpu_started = perf_counter(), process_time()
+            created = await create(books)
+            elapsed, cpu = perf_counter() - started, process_time() - cpu_started
+            print(f"{name:>10} | {created:>6} | {elapsed:>6.2f}с | {created / elapsed:>8.0f} | {cpu:>5.2f}с")
+    finally:
+        await cleanup(codes)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,158 @@
+"""Общие части скриптов замеров: набор данных, ASGI клиент и цикл замера.
+Импортируется скриптами bench_*, которые добавляют app в путь импорта.
+"""
+
+from app import app
+from db import get_db
+from db.models import Author, Publisher
+from sqlalchemy import delete, text
+
+from time import perf_counter, process_time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from uuid import uuid4
+import asyncio
+
+# Кол-во запросов в замере. Лучший из повторов идет в результат
+REQUESTS = 300
+REPEATS = 5
+
+# Книги набора данных: уникальное название, год издания и цена по номеру книги
+BOOKS_QUERY = """
+INSERT INTO books (code, publisher_code, author_code, title, publishing_year, price, amount)
+SELECT gen_random_uuid(), :publisher, :author, 'Книга ' || md5(i::text), 1900 + i % 120, i % 1000, 1
+FROM generate_series(1, :count) AS i
+"""
+
+
+async def seed(num_books: int = 0, books_query: str = BOOKS_QUERY, analyze: bool = False, **params) -> dict:
+    """Создает автора, издательство и набор их книг средствами БД.
+
+    Args:
+        num_books (int, optional): Кол-во книг. Defaults to 0.
+        books_query (str, optional): Запрос создания книг с параметрами :publisher, :author
+            и :count. Defaults to BOOKS_QUERY.
+        analyze (bool, optional): Обновить статистику таблицы книг. Defaults to False.
+        **params: Дополнительные параметры запроса создания книг.
+
+    Returns:
+        dict: Коды автора и издательства.
+    """
+    author = Author(code=uuid4(), name=f"Bench Author {uuid4()}")
+    publisher = Publisher(code=uuid4(), name=f"Bench Publisher {uuid4()}")
+
+    async for session in get_db():
+        session.add_all([author, publisher])
+        await session.commit()
+
+        if num_books:
+            await session.execute(
+                text(books_query),
+                {"publisher": publisher.code, "author": author.code, "count": num_books, **params},
+            )
+            await session.commit()
+
+        # * Статистика нужна планировщику для выбора индекса
+        if analyze:
+            await session.execute(text("ANALYZE books"))
+            await session.commit()
+
+    return {"author": author.code, "publisher": publisher.code}
+
+
+async def cleanup(codes: dict):
+    """Удаляет созданный набор данных. Книги удаляются каскадно."""
+    async for session in get_db():
+        await session.execute(delete(Author).where(Author.code == codes["author"]))
+        await session.execute(delete(Publisher).where(Publisher.code == codes["publisher"]))
+        await session.commit()
+
+
+async def request(
+    path: str,
+    query: str = "",
+    method: str = "GET",
+    headers: Sequence[Tuple[bytes, bytes]] = (),
+    body: bytes = b"",
+    expected: int = 200,
+    on_body: Optional[Callable[[bytes], None]] = None,
+) -> Tuple[Dict[bytes, bytes], bytes]:
+    """Выполняет запрос к приложению напрямую через ASGI, без сетевого стека.
+
+    Args:
+        path (str): Путь запроса.
+        query (str, optional): Строка запроса. Defaults to "".
+        method (str, optional): Метод запроса. Defaults to "GET".
+        headers (Sequence[Tuple[bytes, bytes]], optional): Дополнительные заголовки. Defaults to ().
+        body (bytes, optional): Тело запроса. Defaults to b"".
+        expected (int, optional): Ожидаемый статус ответа. Defaults to 200.
+        on_body (Optional[Callable[[bytes], None]], optional): Приемник чанков тела ответа.
+            Если передан - тело не сохраняется. Defaults to None.
+
+    Raises:
+        RuntimeError: Статус ответа отличается от ожидаемого.
+
+    Returns:
+        Tuple[Dict[bytes, bytes], bytes]: Заголовки и тело ответа.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench"), *headers],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    start, chunks = {}, []
+    received = asyncio.Event()
+
+    async def receive():
+        # * Потоковый ответ ждет отключения клиента: после тела запроса новых сообщений нет
+        if received.is_set():
+            await asyncio.Future()
+        received.set()
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+        if message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if on_body:
+                on_body(chunk)
+            else:
+                chunks.append(chunk)
+
+    await app(scope, receive, send)
+    content = b"".join(chunks)
+    if start["status"] != expected:
+        raise RuntimeError(f"Unexpected status {start['status']}: {content[:200]}")
+    return dict(start["headers"]), content
+
+
+async def measure(
+    path: str,
+    query: str = "",
+    headers: Sequence[Tuple[bytes, bytes]] = (),
+    expected: int = 200,
+) -> tuple:
+    """Замеряет GET запрос: пропускную способность в запросах в секунду и
+    процессорное время приложения на один запрос (без ожидания ответа БД).
+    """
+    # Прогрев: пул соединений, кэши схем и подготовленных выражений
+    for _ in range(10):
+        await request(path, query, headers=headers, expected=expected)
+
+    best_rps, best_cpu = 0.0, float("inf")
+    for _ in range(REPEATS):
+        started, cpu_started = perf_counter(), process_time()
+        for _ in range(REQUESTS):
+            await request(path, query, headers=headers, expected=expected)
+        best_rps = max(best_rps, REQUESTS / (perf_counter() - started))
+        best_cpu = min(best_cpu, (process_time() - cpu_started) / REQUESTS)
+    return best_rps, best_cpu
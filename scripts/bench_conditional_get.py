@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Разрешение имотра
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+
+from bench_common import cleanup, measure, request, seed
+from db import engine
+
+import asyncio
+
+# Кол-во книг в наборе данных
+NUM_BOOKS = 5_000
+
+# Размер страницы листинга
+PAGE_SIZE = 200
+
+
+async def main():
+    codes = await seed(NUM_BOOKS)
+    try:
+        _, body = await request("/api/books", "limit=1")
+        book_code = body.split(b'"code":"')[1].split(b'"')[0].decode()
+
+        # Листинг и карточка книги: полный ответ и повторная проверка актуальности клиентом
+        cases = {
+            "listing": ("/api/books", f"limit={PAGE_SIZE}"),
+            "detail": (f"/api/books/{book_code}", "include=author,publisher"),
+        }
+
+        print(f"{'Запрос':>8} | {'Ответ':>5} | {'Запросов/с':>10} | {'CPU на запрос':>13} | {'Тело':>7}")
+        for name, (path, query) in cases.items():
+            headers, body = await request(path, query)
+            for status, condition in ((200, ()), (304, ((b"if-none-match", headers[b"etag"]),))):
+                rps, cpu = await measure(path, query, condition, expected=status)
+                size = len(body) if status == 200 else 0
+                print(f"{name:>8} | {status:>5} | {rps:>10.1f} | {cpu * 1000:>11.2f}ms | {size:>7}")
+    finally:
+        await cleanup(codes)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
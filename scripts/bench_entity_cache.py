@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Разрешение имотра
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+
+from bench_common import cleanup, measure, request, seed
+from db import engine
+from utils.crud import author as author_crud, book as book_crud
+
+import asyncio
+
+# Кол-во книг в наборе данных
+NUM_BOOKS = 5_000
+
+
+async def main():
+    codes = await seed(NUM_BOOKS)
+    try:
+        _, body = await request("/api/books")
+        book_code = body.split(b'"code":"')[1].split(b'"')[0].decode()
+
+        # Карточки часто запрашиваемых сущностей
+        cases = {
+            "book": (book_crud, f"/api/books/{book_code}"),
+            "author": (author_crud, f"/api/authors/{codes['author']}"),
+        }
+
+        print(f"{'Запрос':>8} | {'Кэш':>5} | {'Запросов/с':>10} | {'CPU на запрос':>13}")
+        for name, (crud, path) in cases.items():
+            cache = crud.cache
+            for enabled in (False, True):
+                # * Без кэша каждое чтение по коду выполняется запросом к БД
+                crud.cache = cache if enabled else None
+                rps, cpu = await measure(path)
+                print(f"{name:>8} | {'да' if enabled else 'нет':>5} | {rps:>10.1f} | {cpu * 1000:>11.2f}ms")
+            crud.cache = cache
+    finally:
+        await cleanup(codes)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+import sys
+import os
+
+# Разрешение имотра
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+
+from bench_common import cleanup, request, seed
+from db import engine
+
+from time import perf_counter, process_time
+import asyncio
+import tracemalloc
+
+# Кол-во книг в наборе данных
+NUM_BOOKS = 50_000
+
+# Размер страницы листинга при выгрузке постранично
+PAGE_SIZE = 200
+
+# Форматы выгрузки
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Объемы выгрузки для замера памяти: часть таблицы (по году издания) и вся таблица
+MEMORY_CASES = {
+    "10%": "search_by=publishing_year&search_mode=less_than&search_value=1912",
+    "100%": "",
+}
+
+
+async def export(query: str) -> tuple:
+    """Выгружает книги одним запросом. Тело ответа не сохраняется:
+    считаются только его размер и кол-во строк.
+
+    Returns:
+        tuple: Размер тела в байтах и кол-во строк.
+    """
+    size = lines = 0
+
+    def count(chunk: bytes) -> None:
+        nonlocal size, lines
+        size += len(chunk)
+        lines += chunk.count(b"\n")
+
+    await request("/api/books/export", query, on_body=count)
+    return size, lines
+
+
+async def export_by_pages() -> tuple:
+    """Выгружает все книги циклом по страницам листинга со смещением."""
+    requests = size = skip = 0
+    while True:
+        _, page = await request("/api/books", f"skip={skip}&limit={PAGE_SIZE}")
+        requests += 1
+        size += len(page)
+        skip += PAGE_SIZE
+        if len(page) <= 2:  # Пустой список
+            return requests, size
+
+
+async def main():
+    codes = await seed(NUM_BOOKS, analyze=True)
+    try:
+        # Прогрев: пул соединений, кэши схем и подготовленных выражений
+        await request("/api/books", "limit=1")
+
+        started = perf_counter()
+        requests, size = await export_by_pages()
+        print(f"Постранично: {requests} запросов, {size / 2**20:.1f} МБ за {perf_counter() - started:.1f}с")
+
+        # * Процессорное время - работа приложения без ожидания БД
+        for export_format in EXPORT_FORMATS:
+            started, cpu_started = perf_counter(), process_time()
+            size, lines = await export(f"format={export_format}")
+            print(
+                f"Выгрузка {export_format:>6}: 1 запрос, {lines} строк, {size / 2**20:.1f} МБ "
+                f"за {perf_counter() - started:.2f}с (CPU {process_time() - cpu_started:.2f}с)"
+            )
+
+        # * Пиковое потребление памяти выгрузкой не должно зависеть от ее объема
+        for export_format in EXPORT_FORMATS:
+            for name, query in MEMORY_CASES.items():
+                tracemalloc.start()
+                _, lines = await export(f"format={export_format}&{query}")
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"Память выгрузки {export_format:>6} {name:>4} ({lines} строк): пик {peak / 2**20:.1f} МБ")
+    finally:
+        await cleanup(codes)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+import sys
+import os
+
+# Разрешение имотра
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+
+from bench_common import cleanup, measure, seed
+from db import engine
+
+import asyncio
+
+# Кол-во книг в наборе данных
+NUM_BOOKS = 5_000
+
+# Размер страницы листинга
+PAGE_SIZE = 200
+
+# Запросы листинга: полный ответ и выборочные поля
+CASES = {
+    "full": f"limit={PAGE_SIZE}",
+    "fields": f"limit={PAGE_SIZE}&fields=code,title",
+}
+
+
+async def main():
+    codes = await seed(NUM_BOOKS)
+    try:
+        print(f"{'Запрос':>8} | {'Запросов/с':>10} | {'Строк/с':>9} | {'CPU на запрос':>13}")
+        for name, query in CASES.items():
+            rps, cpu = await measure("/api/books", query)
+            print(f"{name:>8} | {rps:>10.1f} | {rps * PAGE_SIZE:>9.0f} | {cpu * 1000:>11.2f}ms")
+    finally:
+        await cleanup(codes)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
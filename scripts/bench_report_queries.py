@@ -0,0 +1,137 @@
+import sys
+import os
+
+# Разрешение имотра
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+
+from db import engine, get_db
+from db.models import Author, Publisher, Reader, Book, Issuance  # noqa
+from sqlalchemy import delete, event
+from utils import ListingSearch
+from utils.crud import issuance
+
+from datetime import date, timedelta
+from time import perf_counter
+from uuid import uuid4
+import asyncio
+
+# Размеры наборов данных (кол-во просроченных выдач)
+SIZES = [100, 1_000, 10_000]
+
+# Дата отчета. Все созданные выдачи просрочены на эту дату
+REPORT_DATE = date.today()
+
+
+class QueryCounter:
+    """Считает кол-во запросов, отправленных в БД."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+async def seed(size: int) -> dict:
+    """Создает набор просроченных выдач и возвращает коды созданных сущностей."""
+    author = Author(code=uuid4(), name=f"Bench Author {uuid4()}")
+    publisher = Publisher(code=uuid4(), name=f"Bench Publisher {uuid4()}")
+    books = [
+        Book(
+            code=uuid4(),
+            title=f"Bench Book {i}",
+            author_code=author.code,
+            publisher_code=publisher.code,
+            price=100,
+            amount=size,
+        )
+        for i in range(max(size // 10, 1))
+    ]
+    readers = [
+        Reader(code=uuid4(), full_name=f"Bench Reader {i}", phone=f"+0(000){i // 10000:03d}-{i // 100 % 100:02d}-{i % 100:02d}")
+        for i in range(max(size // 5, 1))
+    ]
+    issuances = [
+        Issuance(
+            book_code=books[i % len(books)].code,
+            reader_code=readers[i % len(readers)].code,
+            issuanced_at=REPORT_DATE - timedelta(days=30),
+            expires_at=REPORT_DATE - timedelta(days=9),
+        )
+        for i in range(size)
+    ]
+
+    async for session in get_db():
+        session.add_all([author, publisher])
+        await session.flush()
+        session.add_all(books + readers)
+        await session.flush()
+        session.add_all(issuances)
+        await session.commit()
+
+    return {"author": author.code, "publisher": publisher.code, "readers": [r.code for r in readers]}
+
+
+async def cleanup(codes: dict):
+    """Удаляет созданный набор данных."""
+    async for session in get_db():
+        await session.execute(delete(Reader).where(Reader.code.in_(codes["readers"])))
+        await session.execute(delete(Author).where(Author.code == codes["author"]))
+        await session.execute(delete(Publisher).where(Publisher.code == codes["publisher"]))
+        await session.commit()
+
+
+async def legacy_fetch():
+    """Прежний способ получения данных: листинг и ленивые подгрузки на каждую выдачу."""
+    async for session in get_db():
+        expired_issuances = await issuance.get_all(
+            session,
+            search=ListingSearch[str](
+                search_by="expires_at",
+                search_mode="less_than_or_equal",
+                search_value=REPORT_DATE,
+            ),
+        )
+        for expired_issuance in expired_issuances:
+            await expired_issuance.awaitable_attrs.reader
+            book = await expired_issuance.awaitable_attrs.book
+            await book.awaitable_attrs.author
+
+
+async def report_fetch():
+    """Получение данных отчета одним запросом."""
+    async for session in get_db():
+        await issuance.get_expired_report_rows(session, REPORT_DATE)
+
+
+async def measure(fetch) -> tuple:
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        started = perf_counter()
+        await fetch()
+        elapsed = perf_counter() - started
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+    return counter.count, elapsed
+
+
+async def main():
+    print(f"{'Выдачи':>8} | {'Запросы (было)':>15} | {'Время (было)':>13} | {'Запросы':>8} | {'Время':>8}")
+    for size in SIZES:
+        codes = await seed(size)
+        try:
+            legacy_queries, legacy_time = await measure(legacy_fetch)
+            queries, elapsed = await measure(report_fetch)
+        finally:
+            await cleanup(codes)
+
+        print(
+            f"{size:>8} | {legacy_queries:>15} | {legacy_time:>12.3f}s | {queries:>8} | {elapsed:>7.3f}s"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
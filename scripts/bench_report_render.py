@@ -0,0 +1,87 @@
+import sys
+import os
+
+# Разрешение имотра
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+
+from utils.report import render_report
+from utils.report.report import ExpiredIssuancesReport
+
+from datetime import date
+from io import BytesIO
+from time import perf_counter
+from uuid import uuid4
+
+# Размеры отчетов (кол-во просроченных выдач) для каждого режима построения.
+# Построение в памяти растет нелинейно, поэтому для него используются меньшие размеры.
+SIZES = {
+    "write-only": [1_000, 10_000, 100_000],
+    "in-memory": [1_000, 5_000],
+}
+
+# Кол-во книг у одного читателя
+BOOKS_PER_READER = 5
+
+# Кол-во повторов замера. В результат идет лучший
+REPEATS = 3
+
+REPORT_DATE = date.today()
+
+
+def make_rows(size: int) -> list:
+    """Создает строки отчета в формате `IssuanceCRUD.get_expired_report_query`."""
+    rows = []
+    readers = max(size // BOOKS_PER_READER, 1)
+    for i in range(readers):
+        code = uuid4()
+        books = BOOKS_PER_READER if i < readers - 1 else size - BOOKS_PER_READER * (readers - 1)
+        for j in range(books):
+            rows.append(
+                (
+                    code,
+                    f"Читатель {i}",
+                    f"+7(900){i // 10000:03d}-{i // 100 % 100:02d}-{i % 100:02d}",
+                    f"Автор {j}",
+                    f"Книга {i}-{j}",
+                    round(100 + j / 1000, 3),
+                    REPORT_DATE.strftime("%d.%m.%Y"),
+                    books,
+                    size,
+                )
+            )
+    return rows
+
+
+def render_in_memory(rows: list) -> None:
+    report = ExpiredIssuancesReport(REPORT_DATE)
+    report.construct_report(rows)
+    report.get_filestream()
+
+
+def render_write_only(rows: list) -> None:
+    render_report(REPORT_DATE, rows, BytesIO())
+
+
+def measure(render, rows: list) -> float:
+    best = None
+    for _ in range(REPEATS):
+        started = perf_counter()
+        render(rows)
+        elapsed = perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    renders = {"write-only": render_write_only, "in-memory": render_in_memory}
+
+    print(f"{'Режим':>10} | {'Выдачи':>8} | {'Время':>8} | {'Строк/с':>9}")
+    for mode, sizes in SIZES.items():
+        for size in sizes:
+            rows = make_rows(size)
+            elapsed = measure(renders[mode], rows)
+            print(f"{mode:>10} | {size:>8} | {elapsed:>7.3f}s | {size / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import sys
+import os
+
+# Разрешение имотра
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+
+from bench_common import cleanup, seed
+from db import engine, get_db
+from sqlalchemy import text
+from utils import ListingPagination, ListingSearch
+from utils.crud import book
+
+from statistics import median
+from time import perf_counter
+import asyncio
+
+# Кол-во книг в наборе данных
+NUM_BOOKS = 1_000_000
+
+# Кол-во повторов каждого запроса. В результат идет медиана
+REPEATS = 5
+
+# Индекс, эффект которого измеряется
+INDEX_NAME = "book_title_trgm_idx"
+
+# Искомые подстроки: редкие и частые
+PATTERNS = ["a1b2", "3f9c7", "Война", "книга"]
+
+# Слова для названий книг
+WORDS = ["Война", "мир", "книга", "история", "сад", "море", "город", "ночь", "лес", "дом"]
+
+# Книги набора данных. Название: два слова из списка и уникальный хвост из md5
+BOOKS_QUERY = """
+INSERT INTO books (code, publisher_code, author_code, title, price, amount)
+SELECT gen_random_uuid(), :publisher, :author,
+       w[1 + i % 10] || ' ' || w[1 + (i / 10) % 10] || ' ' || md5(i::text),
+       100, 1
+FROM generate_series(1, :count) AS i, CAST(:words AS text[]) AS w
+"""
+
+
+async def measure(session, pattern: str) -> tuple:
+    """Замеряет страницу листинга и точный подсчет для поиска по подстроке."""
+    search = ListingSearch[str](search_by="title", search_mode="simmilar", search_value=pattern)
+    pagination = ListingPagination(skip=0, limit=50, cursor=None, count="none")
+
+    listing, counting = [], []
+    for _ in range(REPEATS):
+        started = perf_counter()
+        await book.get_all(session, search, pagination=pagination)
+        listing.append(perf_counter() - started)
+
+        started = perf_counter()
+        total = await book.count(session, search)
+        counting.append(perf_counter() - started)
+
+    return median(listing), median(counting), total
+
+
+async def run(drop_index: bool) -> dict:
+    """Выполняет замеры. Без индекса - внутри транзакции, которая затем откатывается."""
+    results = {}
+    async for session in get_db():
+        if drop_index:
+            await session.execute(text(f"DROP INDEX {INDEX_NAME}"))
+        try:
+            for pattern in PATTERNS:
+                results[pattern] = await measure(session, pattern)
+        finally:
+            await session.rollback()
+    return results
+
+
+async def main():
+    print(f"Создание {NUM_BOOKS} книг...")
+    codes = await seed(NUM_BOOKS, BOOKS_QUERY, analyze=True, words=WORDS)
+    try:
+        before = await run(drop_index=True)
+        after = await run(drop_index=False)
+    finally:
+        await cleanup(codes)
+
+    print(
+        f"{'Подстрока':>10} | {'Найдено':>8} | {'Страница (без)':>14} | {'Страница':>9} "
+        f"| {'Подсчет (без)':>13} | {'Подсчет':>9}"
+    )
+    for pattern in PATTERNS:
+        page_before, count_before, total = before[pattern]
+        page_after, count_after, _ = after[pattern]
+        print(
+            f"{pattern:>10} | {total:>8} | {page_before * 1000:>12.1f}ms | {page_after * 1000:>7.1f}ms "
+            f"| {count_before * 1000:>11.1f}ms | {count_after * 1000:>7.1f}ms"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Разрешение импорта модулей приложения
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../app")))
+
+# * Движок БД не подключается при импорте: обязательным настройкам достаточно значений по умолчанию
+os.environ.setdefault("BOOKSHELF_DB_POSTGRES_PASSWORD", "bookshelf")
+os.environ.setdefault("BOOKSHELF_DB_POSTGRES_HOST", "localhost")
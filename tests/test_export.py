@@ -0,0 +1,120 @@
+import asyncio
+import re
+from decimal import Decimal
+
+from db.models import Book
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from utils import ExportFormat, export_response
+from utils.crud import book
+from utils.crud.export import compile_copy_query
+
+
+class DriverConnection:
+    """Соединение asyncpg: запоминает аргументы `copy_from_query`."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def copy_from_query(self, query, *args, **kwargs):
+        self.calls.append((query, args, kwargs))
+
+
+class RawConnection:
+    def __init__(self, driver_connection):
+        self.driver_connection = driver_connection
+
+
+class Connection:
+    def __init__(self, driver_connection):
+        self.dialect = asyncpg_dialect()
+        self.raw_connection = RawConnection(driver_connection)
+
+    async def get_raw_connection(self):
+        return self.raw_connection
+
+
+class Session:
+    def __init__(self, driver_connection):
+        self.bind = Connection(driver_connection)
+
+    async def connection(self):
+        return self.bind
+
+
+class StalledCopyCRUD:
+    """CRUD, выгрузка которого отдает один блок и ждет, пока ее не отменят."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    async def copy_rows(self, db, query, output, fields=None):
+        await output(bytearray(b"code,title\n"))
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+class BookRow(BaseModel):
+    title: str
+
+
+def books_query():
+    return select(Book.code, Book.title, Book.price).where(
+        Book.price.in_([Decimal("100"), Decimal("200")]),
+        Book.title == "Book title 1",
+    )
+
+
+def bind(statement: str, params) -> str:
+    """Подставляет в запрос значения позиционных параметров ($1 - первый элемент списка)."""
+    return re.sub(r"\$(\d+)", lambda match: repr(params[int(match[1]) - 1]), statement)
+
+
+def test_compile_copy_query_binds_positionally():
+    statement, params = compile_copy_query(books_query(), asyncpg_dialect())
+
+    # * IN список раскрыт: каждый элемент - отдельный параметр
+    assert "POSTCOMPILE" not in statement
+    assert len(params) == len(set(re.findall(r"\$\d+", statement))) == 3
+    assert bind(statement, params).endswith(
+        "WHERE books.price IN (Decimal('100')::NUMERIC(10, 2), Decimal('200')::NUMERIC(10, 2))"
+        " AND books.title = 'Book title 1'::VARCHAR"
+    )
+
+
+def test_copy_rows_passes_params_to_driver():
+    driver = DriverConnection()
+
+    async def output(chunk):
+        pass
+
+    asyncio.run(book.copy_rows(Session(driver), books_query(), output, ["title"]))
+
+    [(statement, args, kwargs)] = driver.calls
+    # * В выгрузку попадают только запрошенные поля
+    assert statement.startswith("SELECT books.title \nFROM books")
+    assert bind(statement, args).endswith(
+        "WHERE books.price IN (Decimal('100')::NUMERIC(10, 2), Decimal('200')::NUMERIC(10, 2))"
+        " AND books.title = 'Book title 1'::VARCHAR"
+    )
+    assert kwargs == {"output": output, "format": "csv", "header": True}
+
+
+def test_export_response_cancels_copy_on_disconnect():
+    crud = StalledCopyCRUD()
+    response = export_response(crud, books_query(), BookRow, "books", export_format=ExportFormat.CSV)
+
+    async def consume_first_chunk():
+        body = response.body_iterator
+        chunk = await body.__anext__()
+        # * Клиент отключился: сервер закрывает генератор тела ответа
+        await body.aclose()
+        return chunk
+
+    assert asyncio.run(consume_first_chunk()) == b"code,title\n"
+    assert crud.cancelled
+    assert response.headers["Content-Disposition"] == "attachment; filename=books.csv"
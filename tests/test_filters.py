@@ -0,0 +1,120 @@
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+from fastapi import HTTPException
+from utils.filters import (
+    MAX_FILTER_DEPTH,
+    MAX_FILTER_PREDICATES,
+    FilterGroup,
+    FilterPredicate,
+    parse_filter,
+)
+from utils.query_params import coerce_search_value
+
+
+def assert_invalid(expression: str, reason: str, fields=None):
+    """Проверяет, что выражение отклоняется с ошибкой 400 и ожидаемой причиной."""
+    with pytest.raises(HTTPException) as error:
+        parse_filter(expression, fields)
+    assert error.value.status_code == 400
+    assert reason in error.value.detail
+
+
+def test_predicate():
+    node = parse_filter("price.less_than.500")
+    assert isinstance(node, FilterPredicate)
+    assert (node.field, node.operator, node.values) == ("price", "<", ["500"])
+
+
+def test_quoted_value():
+    node = parse_filter("title.equal.'Мир, труд (и) ''май'''")
+    assert node.values == ["Мир, труд (и) 'май'"]
+
+
+def test_nested_groups():
+    node = parse_filter("and(price.less_than.500,or(title.simmilar.мир,publishing_year.equal.2000))")
+    assert isinstance(node, FilterGroup) and node.operator == "AND"
+    inner = node.items[1]
+    assert isinstance(inner, FilterGroup) and inner.operator == "OR"
+    assert [item.operator for item in inner.items] == ["ILIKE", "="]
+
+
+def test_group_operator_is_case_insensitive():
+    assert parse_filter("OR(price.equal.1,price.equal.2)").operator == "OR"
+
+
+def test_between():
+    node = parse_filter("publishing_year.between.(1990, 2000)")
+    assert (node.operator, node.values) == ("BETWEEN", ["1990", "2000"])
+
+
+def test_in():
+    node = parse_filter("title.in.('a,b',c,'')")
+    assert (node.operator, node.values) == ("IN", ["a,b", "c", ""])
+
+
+def test_max_depth():
+    expression = "price.equal.1"
+    for _ in range(MAX_FILTER_DEPTH - 1):
+        expression = f"and({expression})"
+    assert isinstance(parse_filter(expression), FilterGroup)
+    assert_invalid(f"and({expression})", "nesting is deeper")
+
+
+def test_max_predicates():
+    predicates = ",".join(["price.equal.1"] * MAX_FILTER_PREDICATES)
+    assert len(parse_filter(f"or({predicates})").items) == MAX_FILTER_PREDICATES
+    assert_invalid(f"or({predicates},price.equal.1)", "more than")
+
+
+def test_allowed_fields():
+    assert parse_filter("price.equal.1", {"price"}).field == "price"
+    assert_invalid("amount.equal.1", "cannot filter by 'amount'", {"price"})
+
+
+@pytest.mark.parametrize(
+    "expression, reason",
+    [
+        ("", "unexpected end"),
+        ("price", "expected field.mode.value"),
+        ("price.like.1", "unknown mode 'like'"),
+        ("and(price.equal.1", "unexpected end"),
+        ("and(price.equal.1'x')", "expected ')'"),
+        ("and(price.equal.1))", "unexpected trailing input"),
+        ("and()", "expected a group or a predicate"),
+        ("price.between.(1)", "exactly two values"),
+        ("price.between.(1,2,3)", "exactly two values"),
+        ("price.in.1", "expects a list of values"),
+        ("price.in.(1,)", "expected a value"),
+        ("title.equal.'unterminated", "unexpected character"),
+    ],
+)
+def test_malformed(expression: str, reason: str):
+    assert_invalid(expression, reason)
+
+
+@pytest.mark.parametrize(
+    "value, python_type, expected",
+    [
+        ("007", str, "007"),
+        (1984, str, "1984"),
+        ("2000", int, 2000),
+        ("1.50", Decimal, Decimal("1.50")),
+        ("2024-01-31", date, date(2024, 1, 31)),
+        (date(2024, 1, 31), date, date(2024, 1, 31)),
+        ("00000000-0000-0000-0000-000000000001", UUID, UUID(int=1)),
+    ],
+)
+def test_coerce_search_value(value, python_type, expected):
+    assert coerce_search_value(value, python_type) == expected
+
+
+@pytest.mark.parametrize(
+    "value, python_type",
+    [("2001.5", int), (2001.5, int), ("abc", Decimal), ("5", date), ("x", UUID)],
+)
+def test_coerce_search_value_mismatch(value, python_type):
+    with pytest.raises(ValueError):
+        coerce_search_value(value, python_type)
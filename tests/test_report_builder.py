@@ -0,0 +1,76 @@
+from datetime import date, datetime
+from decimal import Decimal
+from io import BytesIO
+
+import openpyxl
+import pytest
+from openpyxl.utils.datetime import to_excel
+from utils.report import ExpiredIssuancesReport
+from utils.report.compat import OPENPYXL_VERSION
+
+
+def make_rows(readers: int, books: int) -> list:
+    """Формирует строки отчета: у каждого читателя books удержанных книг."""
+    total = readers * books
+    return [
+        (
+            f"reader-{reader}",
+            f"Читатель {reader}",
+            f"+7(900)000-00-{reader:02}",
+            f"Автор {book}",
+            f"Книга {book}",
+            Decimal("1.250"),
+            date(2024, 1, book + 1),
+            books,
+            total,
+        )
+        for reader in range(readers)
+        for book in range(books)
+    ]
+
+
+def cell_value(cell):
+    """Возвращает значение ячейки. Дата приводится к числу: лист в памяти
+    сбрасывает формат даты стилем ячейки и хранит ее как число."""
+    return to_excel(cell.value) if isinstance(cell.value, datetime) else cell.value
+
+
+def render(rows: list, write_only: bool) -> openpyxl.Workbook:
+    """Строит отчет и загружает сохраненный файл."""
+    report = ExpiredIssuancesReport(date(2024, 2, 1), write_only=write_only)
+    report.construct_report(rows)
+    return openpyxl.load_workbook(report.get_filestream())
+
+
+def test_openpyxl_version_is_pinned():
+    # * Адаптер закрытого API проверен только на закрепленной версии
+    assert openpyxl.__version__ == OPENPYXL_VERSION
+
+
+@pytest.mark.parametrize("readers, books", [(1, 1), (3, 4)])
+def test_streaming_report_matches_in_memory(readers: int, books: int):
+    rows = make_rows(readers, books)
+    expected, actual = render(rows, write_only=False).active, render(rows, write_only=True).active
+
+    merged = sorted(str(cell_range) for cell_range in actual.merged_cells.ranges)
+    assert merged == sorted(str(cell_range) for cell_range in expected.merged_cells.ranges)
+    # * Заголовок, строка и итог каждого читателя, итог по библиотеке
+    assert len(merged) == 1 + readers * 2 + 1
+
+    assert actual.max_row == expected.max_row
+    for expected_row, actual_row in zip(expected.iter_rows(), actual.iter_rows()):
+        assert [cell_value(cell) for cell in actual_row] == [cell_value(cell) for cell in expected_row]
+        assert [cell.style for cell in actual_row] == [cell.style for cell in expected_row]
+
+
+def test_report_without_merged_cells():
+    workbook = BytesIO()
+    report = ExpiredIssuancesReport(date(2024, 2, 1), write_only=True)
+    builder = report.builder
+    builder.add_row(["без объединения"])
+    builder.close()
+    report.wb.save(workbook)
+
+    sheet = openpyxl.load_workbook(workbook).active
+    assert not sheet.merged_cells.ranges
+    assert sheet["A1"].value == "без объединения"